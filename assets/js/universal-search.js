@@ -6,240 +6,20 @@ class UniversalSearch {
     // Determine base path dynamically
     this.basePath = this.getBasePath();
     
-    // Auto-generated siteContent: includes every project folder found under /projects and top-level pages
-    this.siteContent = [
-      // Projects (scanned from the projects/ directory)
-      {
-        title: "2048",
-        path: "Home › Games › 2048",
-        url: `${this.basePath}games/projects/2048/`,
-        type: "games",
-        description: "Classic 2048 sliding tile puzzle game.",
-        keywords: ["2048", "game", "puzzle", "tiles", "javascript"]
-      },
-      {
-        title: "Calculator",
-        path: "Home › Projects › Calculator",
-        url: `${this.basePath}projects/calculator/`,
-        type: "projects",
-        description: "A fully functional calculator built with JavaScript.",
-        keywords: ["calculator", "math", "javascript", "compute"]
-      },
-      {
-        title: "File Transfer",
-        path: "Home › Projects › File Transfer",
-        url: `${this.basePath}projects/File-Transfer/`,
-        type: "projects",
-        description: "Secure file transfer and sharing tool.",
-        keywords: ["file", "transfer", "share", "upload", "download"]
-      },
-      {
-        title: "Finance Check",
-        path: "Home › Projects › Finance Check",
-        url: `${this.basePath}projects/finance-check/`,
-        type: "projects",
-        description: "Personal finance tracking and budgeting tool.",
-        keywords: ["finance", "budget", "money", "expense", "tracking"]
-      },
-      {
-        title: "Git Account Info",
-        path: "Home › Projects › Git Account Info",
-        url: `${this.basePath}projects/git-account-info/`,
-        type: "projects",
-        description: "GitHub profile analyzer and repository information tool.",
-        keywords: ["git", "github", "profile", "analyzer", "repository", "account", "new"]
-      },
-      {
-        title: "Hangman",
-        path: "Home › Games › Hangman",
-        url: `${this.basePath}games/projects/hangman/`,
-        type: "games",
-        description: "Classic hangman word-guessing game implemented in JavaScript.",
-        keywords: ["hangman", "game", "word", "javascript"]
-      },
-      {
-        title: "Password Manager",
-        path: "Home › Projects › Password Manager",
-        url: `${this.basePath}projects/password-manager/`,
-        type: "projects",
-        description: "Secure password manager for storing and generating passwords.",
-        keywords: ["password", "manager", "security", "generator"]
-      },
-      {
-        title: "Resume Builder",
-        path: "Home › Projects › Resume Builder",
-        url: `${this.basePath}projects/resume-builder/`,
-        type: "projects",
-        description: "Create professional resumes with customizable templates.",
-        keywords: ["resume", "builder", "template", "cv"]
-      },
-      {
-        title: "Shared Calendar",
-        path: "Home › Projects › Shared Calendar",
-        url: `${this.basePath}projects/shared-calendar/`,
-        type: "projects",
-        description: "Shared calendar project with event management features.",
-        keywords: ["calendar", "shared", "events", "scheduling"]
-      },
-      {
-        title: "Template",
-        path: "Home › Projects › Template",
-        url: `${this.basePath}projects/template/`,
-        type: "projects",
-        description: "Project template with starter code and styles.",
-        keywords: ["template", "starter", "project", "boilerplate"]
-      },
-      {
-        title: "Text Editor",
-        path: "Home › Projects › Text Editor",
-        url: `${this.basePath}projects/text-editor/`,
-        type: "projects",
-        description: "A powerful online text editor with syntax highlighting.",
-        keywords: ["text", "editor", "syntax", "code"]
-      },
-      {
-        title: "Unit Converter",
-        path: "Home › Projects › Unit Converter",
-        url: `${this.basePath}projects/unit-converter/`,
-        type: "projects",
-        description: "Convert between different units of measurement.",
-        keywords: ["unit", "converter", "measurement", "convert"]
-      },
-      {
-        title: "Word Counter",
-        path: "Home › Projects › Word Counter",
-        url: `${this.basePath}projects/word-counter/`,
-        type: "projects",
-        description: "Count words, characters, and analyze text statistics.",
-        keywords: ["word", "counter", "text", "statistics"]
-      },
-      {
-        title: "Word Search",
-        path: "Home › Games › Word Search",
-        url: `${this.basePath}games/projects/word-search/`,
-        type: "games",
-        description: "Word search puzzle generator and solver.",
-        keywords: ["word", "search", "puzzle", "game"]
-      },
-      {
-        title: "Family Betting",
-        path: "Home › Games › Family Betting",
-        url: `${this.basePath}games/projects/family-betting/`,
-        type: "games",
-        description: "Family-friendly betting games including blackjack and poker.",
-        keywords: ["family", "betting", "games", "blackjack", "poker", "casino"]
-      },
-      {
-        title: "Team Manager",
-        path: "Home › Projects › Team Manager",
-        url: `${this.basePath}projects/Team-Manager/`,
-        type: "projects",
-        description: "Sports team management system with roster and tournament features.",
-        keywords: ["team", "manager", "sports", "roster", "tournament", "management"]
-      },
-      {
-        title: "Square Chase",
-        path: "Home › Games › Square Chase",
-        url: `${this.basePath}games/projects/Square-Chase/`,
-        type: "games",
-        description: "Interactive cursor-chasing game with dynamic zones and effects.",
-        keywords: ["square", "chase", "game", "cursor", "interactive", "zones"]
-      },
-
-      // Games (moved from projects/)
-      {
-        title: "Pong",
-        path: "Home › Games › Pong",
-        url: `${this.basePath}games/projects/pong/`,
-        type: "games",
-        description: "Classic arcade pong game. Bounce the ball and beat your opponent!",
-        keywords: ["pong", "game", "arcade", "classic", "paddle", "ball"]
-      },
-      {
-        title: "My Asteroids",
-        path: "Home › Games › My Asteroids",
-        url: `${this.basePath}games/projects/my-asteroids/`,
-        type: "games",
-        description: "Blast asteroids in space! Classic arcade action in the depths of space.",
-        keywords: ["asteroids", "game", "arcade", "space", "shoot", "classic"]
-      },
-      {
-        title: "Current Day Asteroids",
-        path: "Home › Games › Current Day Asteroids",
-        url: `${this.basePath}games/projects/current-day-astroids/`,
-        type: "games",
-        description: "Modern take on the classic asteroids game with updated graphics and gameplay.",
-        keywords: ["asteroids", "current", "modern", "game", "arcade", "space", "shoot", "shooter"]
-      },
-
-      // Top-level pages
-      {
-        title: "All Projects",
-        path: "Home › Projects",
-        url: `${this.basePath}projects/`,
-        type: "pages",
-        description: "Browse all projects and web applications.",
-        keywords: ["projects", "portfolio", "apps"]
-      },
-      {
-        title: "Games",
-        path: "Home › Games",
-        url: `${this.basePath}games/`,
-        type: "pages",
-        description: "Play a variety of browser-based games including classic arcade games and logic puzzles.",
-        keywords: ["games", "play", "arcade", "fun", "entertainment", "puzzles"]
-      },
-      {
-        title: "About Me",
-        path: "Home › About",
-        url: `${this.basePath}about-me/`,
-        type: "pages",
-        description: "Learn more about Dan Finn and his background.",
-        keywords: ["about", "dan", "finn", "bio"]
-      },
-      {
-        title: "Contact",
-        path: "Home › Contact",
-        url: `${this.basePath}contact/`,
-        type: "pages",
-        description: "Get in touch with Dan Finn.",
-        keywords: ["contact", "email", "get in touch"]
-      },
-      {
-        title: "Education",
-        path: "Home › Education",
-        url: `${this.basePath}education/`,
-        type: "pages",
-        description: "Information about educational background and courses.",
-        keywords: ["education", "school", "college"]
-      },
-      {
-        title: "Interests",
-        path: "Home › Interests",
-        url: `${this.basePath}interests/`,
-        type: "pages",
-        description: "Personal hobbies and interests.",
-        keywords: ["interests", "hobbies", "personal"]
-      },
-      {
-        title: "Resume",
-        path: "Home › Resume",
-        url: `${this.basePath}resume/`,
-        type: "pages",
-        description: "Download or view Dan Finn's professional resume.",
-        keywords: ["resume", "cv", "career"]
-      },
-      {
-        title: "Home",
-        path: "Home",
-        url: `${this.basePath}`,
-        type: "pages",
-        description: "Main website homepage.",
-        keywords: ["home", "main", "website"]
-      }
-    ];
+    // Curated dataset (title, path, description, keywords per project/page), generated by
+    // tools/common/site_content.py into assets/search/content.json; fetched on first focus
+    this.siteContent = [];
+    this.contentPromise = null;
 
     this.currentFilter = 'all';
+
+    // Full-text index built by tools/common/search_index.py; fetched lazily, shard by shard
+    this.indexUrl = `${this.basePath}assets/search/`;
+    this.index = null;
+    this.indexPromise = null;
+    this.shards = {};
+    this.searchSeq = 0;
+
     this.init();
   }
 
@@ -338,6 +118,9 @@ class UniversalSearch {
       if (e.key === 'Enter') this.performSearch();
     });
 
+    // Fetch the dataset the first time the box is focused (not on page load)
+    searchInput.addEventListener('focus', () => this.loadContent(), { once: true });
+
     // Search as you type
     let searchTimeout;
     searchInput.addEventListener('input', () => {
@@ -374,6 +157,7 @@ class UniversalSearch {
     const searchInput = document.getElementById('universal-search-input');
     
     modal.style.display = 'flex';
+    this.loadIndex();
     setTimeout(() => {
       modal.classList.add('active');
       searchInput.focus();
@@ -393,10 +177,11 @@ class UniversalSearch {
     }, 300);
   }
 
-  performSearch() {
+  async performSearch() {
     const searchInput = document.getElementById('universal-search-input');
     const resultsContainer = document.getElementById('universal-results-container');
     const searchTerm = searchInput.value.toLowerCase().trim();
+    const seq = ++this.searchSeq;
     
     if (searchTerm === '') {
       resultsContainer.innerHTML = '<div class="universal-no-results">Start typing to search...</div>';
@@ -404,15 +189,28 @@ class UniversalSearch {
     }
 
     // Filter content
-    let filteredContent = this.siteContent.filter(item => {
-      const matchesFilter = this.currentFilter === 'all' || item.type === this.currentFilter;
+    const siteContent = await this.loadContent();
+    if (seq !== this.searchSeq) return;
+    let filteredContent = siteContent.filter(item => {
       const matchesSearch = 
         item.title.toLowerCase().includes(searchTerm) ||
         item.description.toLowerCase().includes(searchTerm) ||
         item.keywords.some(keyword => keyword.toLowerCase().includes(searchTerm));
       
-      return matchesFilter && matchesSearch;
+      return matchesSearch;
+    });
+
+    // Add full-text hits for pages the curated list doesn't already cover
+    const indexHits = await this.searchIndex(searchTerm);
+    if (seq !== this.searchSeq) return; // a newer query has already rendered
+    const seen = new Set(filteredContent.map(item => item.url));
+    indexHits.forEach(item => {
+      if (!seen.has(item.url)) {
+        seen.add(item.url);
+        filteredContent.push(item);
+      }
     });
+    filteredContent = filteredContent.filter(item => this.currentFilter === 'all' || item.type === this.currentFilter);
 
     // Display results
     if (filteredContent.length === 0) {
@@ -433,6 +231,168 @@ class UniversalSearch {
     }
   }
 
+  // ---------------------------------------------------------------------------
+  // Curated dataset (format: tools/common/site_content.py)
+  // ---------------------------------------------------------------------------
+
+  loadContent() {
+    if (!this.contentPromise) {
+      this.contentPromise = fetch(`${this.indexUrl}content.json`)
+        .then(res => (res.ok ? res.json() : null))
+        .then(payload => {
+          if (!payload) return [];
+          this.siteContent = payload.items.map(row => {
+            const item = {};
+            payload.fields.forEach((field, i) => { item[field] = row[i]; });
+            item.url = `${this.basePath}${item.url}`;
+            return item;
+          });
+          return this.siteContent;
+        })
+        .catch(() => {
+          this.contentPromise = null; // try again on the next search
+          return [];
+        });
+    }
+    return this.contentPromise;
+  }
+
+  // ---------------------------------------------------------------------------
+  // Full-text index (format: tools/common/search_index.py)
+  // ---------------------------------------------------------------------------
+
+  loadIndex() {
+    if (!this.indexPromise) {
+      this.indexPromise = fetch(`${this.indexUrl}manifest.json`)
+        .then(res => (res.ok ? res.json() : null))
+        .then(manifest => {
+          if (manifest) {
+            manifest.stopSet = new Set(manifest.stop);
+            manifest.shardSet = new Set(manifest.shards);
+          }
+          this.index = manifest;
+          return manifest;
+        })
+        .catch(() => null); // no index deployed: curated results only
+    }
+    return this.indexPromise;
+  }
+
+  loadShard(prefix) {
+    if (!this.shards[prefix]) {
+      this.shards[prefix] = fetch(`${this.indexUrl}shard-${prefix}.json`)
+        .then(res => (res.ok ? res.json() : { terms: {} }))
+        .then(data => data.terms)
+        .catch(() => ({}));
+    }
+    return this.shards[prefix];
+  }
+
+  // Same rules as stem() in search_index.py
+  stem(word) {
+    if (word.length <= 3 || /^[0-9]+$/.test(word)) return word;
+    if (word.endsWith('ies') && word.length > 4) return word.slice(0, -3) + 'y';
+    if (word.endsWith('sses')) return word.slice(0, -2);
+    if (word.endsWith('s') && !/(ss|us|is)$/.test(word)) word = word.slice(0, -1);
+    for (const suffix of ['ing', 'ed']) {
+      if (word.endsWith(suffix) && word.length - suffix.length >= 3) {
+        word = word.slice(0, -suffix.length);
+        const last = word[word.length - 1];
+        if (last === word[word.length - 2] && !'lsz'.includes(last)) word = word.slice(0, -1);
+        return word;
+      }
+    }
+    if (word.endsWith('ly') && word.length > 5) return word.slice(0, -2);
+    return word;
+  }
+
+  tokenize(text) {
+    const stop = this.index.stopSet;
+    return (text.toLowerCase().match(/[a-z0-9]+/g) || [])
+      .filter(t => t.length > 1 && !stop.has(t))
+      .map(t => this.stem(t));
+  }
+
+  // Shards that can hold `term` (exact) or any term starting with it (prefix)
+  shardsFor(term, prefix) {
+    const { shards, shardSet } = this.index;
+    if (prefix) return shards.filter(s => term.startsWith(s) || s.startsWith(term));
+    for (let n = this.index.max_prefix; n > 0; n--) {
+      if (shardSet.has(term.slice(0, n))) return [term.slice(0, n)];
+    }
+    return [];
+  }
+
+  async searchIndex(query, limit = 20) {
+    const index = await this.loadIndex();
+    if (!index) return [];
+    const words = query.toLowerCase().match(/[a-z0-9]+/g) || [];
+    const terms = this.tokenize(query);
+    if (terms.length === 0) return [];
+
+    // the word being typed matches as a prefix, finished words exactly
+    const partial = words[words.length - 1];
+    const prefixTerm = partial.length > 1 && !index.stopSet.has(partial) ? this.stem(partial) : null;
+    const exact = prefixTerm ? terms.slice(0, -1) : terms;
+
+    const wanted = new Set();
+    exact.forEach(t => this.shardsFor(t, false).forEach(s => wanted.add(s)));
+    if (prefixTerm) this.shardsFor(prefixTerm, true).forEach(s => wanted.add(s));
+    const loaded = await Promise.all([...wanted].map(s => this.loadShard(s)));
+    const lookup = Object.assign({}, ...loaded);
+
+    // one posting list per query term (prefix term: merged over every expansion)
+    const groups = exact.map(t => [lookup[t]].filter(Boolean));
+    if (prefixTerm) {
+      groups.push(Object.keys(lookup).filter(t => t.startsWith(prefixTerm)).map(t => lookup[t]));
+    }
+
+    const { k1, b } = index.bm25;
+    const N = index.docs.length;
+    const scores = new Map();
+    const matched = new Map();
+    groups.forEach(lists => {
+      const best = new Map(); // doc -> highest-scoring expansion for this query term
+      lists.forEach(postings => {
+        const df = postings.length / 2;
+        const idf = Math.log(1 + (N - df + 0.5) / (df + 0.5));
+        let doc = 0;
+        for (let i = 0; i < postings.length; i += 2) {
+          doc += postings[i];
+          const tf = postings[i + 1];
+          const len = index.docs[doc][4];
+          const score = idf * (tf * (k1 + 1)) / (tf + k1 * (1 - b + b * len / (index.avg_len || 1)));
+          if (score > (best.get(doc) || 0)) best.set(doc, score);
+        }
+      });
+      best.forEach((score, doc) => {
+        scores.set(doc, (scores.get(doc) || 0) + score);
+        matched.set(doc, (matched.get(doc) || 0) + 1);
+      });
+    });
+
+    // pages matching every query term rank first
+    return [...scores.entries()]
+      .map(([doc, score]) => [doc, score * matched.get(doc) / groups.length])
+      .sort((a, b) => b[1] - a[1])
+      .slice(0, limit)
+      .map(([doc]) => this.indexResult(index.docs[doc]));
+  }
+
+  indexResult([path, title, type, snippet]) {
+    const url = `${this.basePath}${path.replace(/(^|\/)index\.html$/, '$1')}`;
+    const crumbs = path.split('/').slice(0, -1)
+      .map(part => part.replace(/-/g, ' ').replace(/\b\w/g, c => c.toUpperCase()));
+    return {
+      title,
+      path: ['Home', ...crumbs].join(' › '),
+      url,
+      type,
+      description: snippet,
+      keywords: []
+    };
+  }
+
   highlightText(text, searchTerm) {
     const regex = new RegExp(`(${searchTerm})`, 'gi');
     return text.replace(regex, '<span class="universal-highlight">$1</span>');
@@ -1,93 +1,274 @@
 #!/usr/bin/env python3
-"""Scan project HTML files for references to .js and .css assets and report usage.
-Generates JSON output at tools/asset-usage.json and prints a short summary.
+"""Scan project HTML, CSS and JS for every asset they reference and report usage.
+- Builds the transitive asset graph (tools/common/asset_graph.py): script/link/img,
+  srcset, CSS url() and @import, ES module imports, asset paths inside scripts
+- Reports which pages use each asset and the JS, CSS and images nothing references
+- Weighs every page: raw, gzip and (if the brotli package is installed) brotli
+  bytes of the page plus everything it loads, what it costs after the home page
+  is cached, and which pages exceed the transfer budget
+Generates JSON output at tools/asset_usage_scanner/asset-usage.json and prints a short summary.
 
-Run: python tools/asset_usage_scanner.py
+Run: python tools/asset_usage_scanner/asset_usage_scanner.py
+     python tools/asset_usage_scanner/asset_usage_scanner.py --format jsonl.gz   (stream one line per page)
+     python tools/asset_usage_scanner/asset_usage_scanner.py --budget 300         (flag pages over 300 KB)
+     python tools/asset_usage_scanner/asset_usage_scanner.py --out /tmp/assets.json   (report elsewhere)
 """
 import os
 import re
+import sys
+import gzip
 import json
+import argparse
 from pathlib import Path
 
+# shared helpers live in tools/common
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'common'))
+import site_model  # noqa: E402
+import report_writer  # noqa: E402
+import run_history  # noqa: E402
+import asset_graph  # noqa: E402
+
 # project root: two levels up from tools/asset_usage_scanner/asset_usage_scanner.py
 ROOT = Path(__file__).resolve().parents[2]
 OUT = Path(__file__).resolve().parent / 'asset-usage.json'
+WEIGHT_CACHE = ROOT / 'tools' / '.cache' / 'asset-weights.json'
+WEIGHT_CACHE_VERSION = 2
+
+try:
+    import brotli
+except ImportError:  # optional: brotli sizes are skipped without it
+    brotli = None
 
-HTML_PATTERN = re.compile(r"<script[^>]+src=[\"']([^\"']+\.js)[\"'][^>]*>|<link[^>]+href=[\"']([^\"']+\.css)[\"'][^>]*>", re.IGNORECASE)
+# page weights: transfer budget per page (cold cache) and the page visitors land on first
+BUDGET_KB = 500
+HOME_PAGE = 'index.html'
+# served compressed by the host; everything else (images, fonts, pdf) goes over the wire as-is
+TEXT_EXTS = ('.html', '.css', '.js', '.mjs', '.svg', '.json', '.txt', '.xml')
 
 
-def find_files():
+def find_files(index=None):
+    # index: site_model.FileIndex (one tree walk shared with other tools)
+    if index is None:
+        index = site_model.FileIndex()
     html_files = []
     js_files = set()
     css_files = set()
+    image_files = set()
 
-    skip_dirs = {'.venv', 'venv', 'node_modules', '.git', 'tools'}
-    for p in ROOT.rglob('*'):
-        if p.is_dir():
-            continue
-        rel = p.relative_to(ROOT).as_posix()
-        # skip files under known non-site folders
-        if any(part in skip_dirs for part in Path(rel).parts):
+    for rel in sorted(index.files):
+        # skip files under known non-site folders (tools, build output...), same set as every other tool
+        if any(part in site_model.SKIP_DIRS for part in rel.split('/')):
             continue
         if rel.endswith('.html'):
-            html_files.append(p)
-        elif rel.endswith('.js'):
+            html_files.append(ROOT / rel)
+        elif rel.endswith(asset_graph.JS_EXTS):
             js_files.add(rel)
-        elif rel.endswith('.css'):
+        elif rel.endswith(asset_graph.CSS_EXTS):
             css_files.add(rel)
+        elif rel.lower().endswith(asset_graph.IMAGE_EXTS):
+            image_files.add(rel)
 
-    return html_files, js_files, css_files
+    return html_files, js_files, css_files, image_files
 
 
-def scan():
-    html_files, js_files, css_files = find_files()
+def measure(path: Path) -> dict:
+    data = path.read_bytes()
+    weight = {'raw': len(data), 'gzip': len(data), 'brotli': len(data) if brotli else None}
+    if path.suffix.lower() in TEXT_EXTS:
+        weight['gzip'] = len(gzip.compress(data, compresslevel=9))
+        if brotli:
+            weight['brotli'] = len(brotli.compress(data))
+    return weight
+
+
+def load_weights(index, rels) -> dict:
+    """{rel: {'raw', 'gzip', 'brotli'}} for existing files, cached by mtime + size."""
+    # the encoders measured are part of the layout: brotli appearing or going away is a cache miss
+    try:
+        data = json.loads(WEIGHT_CACHE.read_text(encoding='utf-8'))
+    except Exception:
+        data = {}
+    if data.get('version') != WEIGHT_CACHE_VERSION or data.get('brotli') != bool(brotli):
+        data = {}
+    cached = data.get('files', {})
+    weights = {}
+    dirty = False
+    for rel in sorted(rels):
+        if rel not in index.files:
+            continue
+        path = index.root / rel
+        st = path.stat()
+        entry = cached.get(rel)
+        stale = not entry or entry['mtime_ns'] != st.st_mtime_ns or entry['size'] != st.st_size
+        if stale:
+            entry = dict(measure(path), mtime_ns=st.st_mtime_ns, size=st.st_size)
+            dirty = True
+        weights[rel] = entry
+    if dirty or weights.keys() != cached.keys():
+        save_weights(weights)
+    return weights
+
+
+def save_weights(weights: dict):
+    WEIGHT_CACHE.parent.mkdir(parents=True, exist_ok=True)
+    tmp = WEIGHT_CACHE.with_suffix('.tmp')
+    tmp.write_text(json.dumps({'version': WEIGHT_CACHE_VERSION, 'brotli': bool(brotli), 'files': weights},
+                              separators=(',', ':')), encoding='utf-8')
+    os.replace(tmp, WEIGHT_CACHE)
+
+
+def transfer_size(weight: dict) -> int:
+    # what a browser downloads: best encoding the host offers
+    return weight['brotli'] if weight['brotli'] is not None else weight['gzip']
+
+
+def page_weight(files, weights: dict, home_files: set, use_counts: dict) -> dict:
+    """Sum one page's files (the page itself + its asset closure).
+
+    after_home: bytes still to fetch when everything the home page loads is cached.
+    unique:     bytes no other page shares (what this page alone adds to the site).
+    """
+    total = {'files': 0, 'raw': 0, 'gzip': 0, 'transfer': 0, 'after_home': 0, 'unique': 0}
+    if brotli:
+        total['brotli'] = 0
+    for rel in files:
+        w = weights.get(rel)
+        if not w:
+            continue
+        size = transfer_size(w)
+        total['files'] += 1
+        total['raw'] += w['raw']
+        total['gzip'] += w['gzip']
+        total['transfer'] += size
+        if brotli:
+            total['brotli'] += w['brotli']
+        if rel not in home_files:
+            total['after_home'] += size
+        if use_counts.get(rel, 0) <= 1:
+            total['unique'] += size
+    return total
+
+
+def kb(n: int) -> str:
+    return f'{n / 1024:.1f} KB'
 
-    asset_to_pages = {}
 
+def scan(fmt: str = 'json', budget_kb: float = BUDGET_KB, out: Path = OUT):
+    index = site_model.FileIndex()
+    html_files, js_files, css_files, image_files = find_files(index)
+    site = site_model.load_site(html_files)
+    graph = asset_graph.build_graph(index, site)
+    out = report_writer.report_path(out, fmt)
+    stream = report_writer.is_stream(out)
+    budget = int(budget_kb * 1024)
+
+    # how many pages load each file (the page itself counts once), for cache-hit modelling
+    use_counts = {}
     for html in html_files:
-        try:
-            text = html.read_text(encoding='utf-8')
-        except Exception:
-            text = html.read_text(encoding='latin-1')
-
-        for m in HTML_PATTERN.finditer(text):
-            src = m.group(1) or m.group(2)
-            if not src:
-                continue
-            # normalize path (strip query/hash)
-            src = src.split('?')[0].split('#')[0]
-            # resolve relative to the html file
-            src_path = (html.parent / src).resolve()
-            try:
-                rel = src_path.relative_to(ROOT).as_posix()
-            except Exception:
-                rel = src
-            asset_to_pages.setdefault(rel, []).append(str(html.relative_to(ROOT).as_posix()))
-
-    used_js = {a for a in asset_to_pages.keys() if a.endswith('.js')}
-    used_css = {a for a in asset_to_pages.keys() if a.endswith('.css')}
-
-    unused_js = sorted(list(js_files - used_js))
-    unused_css = sorted(list(css_files - used_css))
-
-    data = {
-        'assets_found': {
+        page = html.relative_to(ROOT).as_posix()
+        for rel in graph.page_assets(page) | {page}:
+            use_counts[rel] = use_counts.get(rel, 0) + 1
+    weights = load_weights(index, use_counts)
+    home_files = (graph.page_assets(HOME_PAGE) | {HOME_PAGE}) if HOME_PAGE in site else set()
+
+    asset_to_pages = {}
+    page_weights = {}
+    over_budget = []
+    writer = report_writer.ReportWriter(out, 'asset_usage_scanner') if stream else None
+
+    try:
+        for html in html_files:
+            page = html.relative_to(ROOT).as_posix()
+            assets = sorted(graph.page_assets(page))
+            weight = page_weight([page] + assets, weights, home_files, use_counts)
+            if weight['transfer'] > budget:
+                over_budget.append(page)
+            if writer:
+                # streamed: one line per page, only the set of used assets stays in memory
+                writer.write({'file': page, 'assets': assets, 'weight': weight})
+                for rel in assets:
+                    asset_to_pages.setdefault(rel, None)
+            else:
+                page_weights[page] = weight
+                for rel in assets:
+                    asset_to_pages.setdefault(rel, []).append(page)
+
+        # every used file counted once: the whole site with a perfectly warm cache
+        site_weight = {
+            'files': len(weights),
+            'raw': sum(w['raw'] for w in weights.values()),
+            'transfer': sum(transfer_size(w) for w in weights.values()),
+        }
+
+        used = set(asset_to_pages)
+        unused_js = sorted(js_files - used)
+        unused_css = sorted(css_files - used)
+        unused_images = sorted(image_files - used)
+
+        assets_found = {
             'js_count': len(js_files),
             'css_count': len(css_files),
-        },
-        'used_assets': asset_to_pages,
-        'unused_js': unused_js,
-        'unused_css': unused_css,
-    }
+            'image_count': len(image_files),
+        }
+        if writer:
+            writer.summary = {
+                'assets_found': assets_found,
+                'used_assets_count': len(asset_to_pages),
+                'unused_js': unused_js,
+                'unused_css': unused_css,
+                'unused_images': unused_images,
+                'budget_bytes': budget,
+                'over_budget': over_budget,
+                'site_weight': site_weight,
+            }
+    finally:
+        if writer:
+            writer.close()
 
-    OUT.write_text(json.dumps(data, indent=2), encoding='utf-8')
+    if not stream:
+        data = {
+            'assets_found': assets_found,
+            'used_assets': asset_to_pages,
+            'unused_js': unused_js,
+            'unused_css': unused_css,
+            'unused_images': unused_images,
+            'budget_bytes': budget,
+            'over_budget': over_budget,
+            'site_weight': site_weight,
+            'page_weights': page_weights,
+        }
+        out.write_text(json.dumps(data, indent=2), encoding='utf-8')
 
     print('Scanned', len(html_files), 'HTML files')
-    print('JS files found:', len(js_files), 'CSS files found:', len(css_files))
+    print('JS files found:', len(js_files), 'CSS files found:', len(css_files),
+          'Images found:', len(image_files))
     print('Used assets entries:', len(asset_to_pages))
-    print('Unused JS:', len(unused_js), 'Unused CSS:', len(unused_css))
-    print('Results written to', OUT)
+    print('Unused JS:', len(unused_js), 'Unused CSS:', len(unused_css), 'Unused images:', len(unused_images))
+    print('Site weight (each file once):', kb(site_weight['transfer']), 'transfer /',
+          kb(site_weight['raw']), 'raw', '' if brotli else '(gzip; install brotli for br sizes)')
+    if page_weights:
+        heaviest = sorted(page_weights.items(), key=lambda kv: kv[1]['transfer'], reverse=True)[:5]
+        print('Heaviest pages:')
+        for page, w in heaviest:
+            print(f"  {page}: {kb(w['transfer'])} cold, {kb(w['after_home'])} after home")
+    print(f'Over budget ({kb(budget)}):', len(over_budget), *over_budget)
+    print('Results written to', out)
+    # files scanned (pages + the assets found), for the run history
+    return len(html_files) + len(js_files) + len(css_files) + len(image_files)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description='Scan HTML/CSS/JS for referenced assets and list unused ones.')
+    ap.add_argument('--format', choices=report_writer.FORMATS, default='json',
+                    help='json (default) or streamed JSON Lines, optionally gzipped')
+    ap.add_argument('--budget', type=float, default=BUDGET_KB, metavar='KB',
+                    help=f'flag pages whose cold-cache transfer exceeds this (default {BUDGET_KB})')
+    ap.add_argument('--out', type=Path, default=OUT, metavar='PATH',
+                    help='report path (default tools/asset_usage_scanner/asset-usage.json)')
+    args = ap.parse_args(argv)
+    with run_history.track('asset_usage_scanner') as run:
+        run['files'] = scan(args.format, args.budget, args.out)
 
 
 if __name__ == '__main__':
-    scan()
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Link Checker Benchmark
+- Generates a synthetic site (default 10k pages) in a temp folder
+- Times link_checker.check_many at 1, 2, 4 ... up to N worker processes
+  (existence checks answered by a site_model.FileIndex of the synthetic site)
+- Verifies every job count produces the exact same merged results
+Output: console table (jobs, seconds, pages/s, speedup)
+
+Run: python tools/benchmarks/bench_link_checker.py [--pages 10000] [--max-jobs 8]
+"""
+import os
+import sys
+import time
+import shutil
+import random
+import argparse
+import tempfile
+from pathlib import Path
+
+# link_checker + shared helpers live next to this folder
+TOOLS_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(TOOLS_DIR / 'link_checker'))
+import link_checker  # noqa: E402
+import site_model  # noqa: E402  (importable once link_checker has set up sys.path)
+
+PAGES_PER_DIR = 100
+WORDS = ('project game timer search theme resume contact roster score shot clock '
+         'canvas layout mobile calendar finance password converter editor notes').split()
+
+
+def make_site(root: Path, pages: int, seed: int = 1):
+    """Write `pages` HTML files under root/section-N/page-M.html plus shared assets."""
+    rnd = random.Random(seed)
+    (root / 'assets' / 'css').mkdir(parents=True)
+    (root / 'assets' / 'js').mkdir(parents=True)
+    (root / 'assets' / 'css' / 'styles.css').write_text('body{margin:0}\n', encoding='utf-8')
+    (root / 'assets' / 'js' / 'theme-manager.js').write_text('// theme\n', encoding='utf-8')
+
+    files = []
+    for i in range(pages):
+        section = root / f'section-{i // PAGES_PER_DIR}'
+        section.mkdir(exist_ok=True)
+        links = []
+        for _ in range(20):
+            j = rnd.randrange(pages)
+            # ~2% of links point at pages that do not exist
+            name = f'page-{j % PAGES_PER_DIR}.html' if rnd.random() > 0.02 else 'missing.html'
+            links.append(f'<li><a href="../section-{j // PAGES_PER_DIR}/{name}">{rnd.choice(WORDS)}</a></li>')
+        body = ' '.join(rnd.choice(WORDS) for _ in range(300))
+        html = (
+            '<!DOCTYPE html>\n<html lang="en">\n<head>\n'
+            f'  <title>Page {i}</title>\n'
+            '  <link rel="stylesheet" href="../assets/css/styles.css">\n'
+            '  <script src="../assets/js/theme-manager.js"></script>\n'
+            '</head>\n<body>\n'
+            f'  <h1 id="top">Page {i}</h1>\n  <h2>{rnd.choice(WORDS)}</h2>\n'
+            f'  <p>{body}</p>\n  <ul>\n    ' + '\n    '.join(links) + '\n  </ul>\n'
+            '  <a href="#top">Back to top</a>\n'
+            '</body>\n</html>\n'
+        )
+        path = section / f'page-{i % PAGES_PER_DIR}.html'
+        path.write_text(html, encoding='utf-8')
+        files.append(path)
+    return files
+
+
+def job_counts(max_jobs: int):
+    counts, n = [], 1
+    while n < max_jobs:
+        counts.append(n)
+        n *= 2
+    counts.append(max_jobs)
+    return counts
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description='Benchmark link_checker --jobs scaling.')
+    ap.add_argument('--pages', type=int, default=10000)
+    ap.add_argument('--max-jobs', type=int, default=os.cpu_count() or 1)
+    ap.add_argument('--batch-size', type=int, default=None)
+    args = ap.parse_args(argv)
+
+    tmp = Path(tempfile.mkdtemp(prefix='linkbench-'))
+    try:
+        t0 = time.perf_counter()
+        files = make_site(tmp, args.pages)
+        print(f'Generated {len(files)} pages in {time.perf_counter() - t0:.2f}s under {tmp}')
+        print(f'CPU cores: {os.cpu_count()}')
+
+        # point the checker (and the worker initializer) at the synthetic site
+        link_checker._init_worker(str(tmp))
+        t0 = time.perf_counter()
+        index = site_model.FileIndex(tmp)
+        print(f'Indexed {len(index.files)} files in {time.perf_counter() - t0:.2f}s')
+
+        baseline = None
+        base_time = None
+        print(f'{"jobs":>5} {"seconds":>9} {"pages/s":>9} {"speedup":>8}')
+        for jobs in job_counts(args.max_jobs):
+            t0 = time.perf_counter()
+            results = link_checker.check_many(files, jobs, args.batch_size, index)
+            elapsed = time.perf_counter() - t0
+            merged = [res for res, _ in results]
+            if baseline is None:
+                baseline, base_time = merged, elapsed
+            elif merged != baseline:
+                print(f'!! results for --jobs {jobs} differ from --jobs 1')
+                return 1
+            print(f'{jobs:>5} {elapsed:>9.2f} {len(files) / elapsed:>9.0f} {base_time / elapsed:>7.2f}x')
+
+        report = link_checker.build_report(baseline)
+        print('Summary (identical for every job count):', report['summary'])
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Preview Server Load Test
+- Starts site_manager's preview server in a child process, once per engine
+  (threaded, asyncio), so client and server don't share a GIL
+- Opens N keep-alive connections that each fetch the home page and its full
+  asset closure (from asset_graph) over and over for a fixed duration
+- Repeats for every connection count
+Output: console table (engine, connections, req/s, MB/s, p50/p99 latency, errors)
+
+Run: python tools/benchmarks/bench_preview_server.py [--connections 1 16 64] [--seconds 5]
+"""
+import sys
+import time
+import socket
+import asyncio
+import argparse
+import subprocess
+from pathlib import Path
+
+TOOLS_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(TOOLS_DIR / 'common'))
+import asset_graph  # noqa: E402
+
+ENGINES = ('threaded', 'asyncio')
+HOME = 'index.html'
+
+
+def page_urls(page: str = HOME):
+    graph = asset_graph.build_graph()
+    return ['/' + page] + ['/' + a for a in sorted(graph.page_assets(page))]
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def serve(engine: str, port: int):
+    """Child-process mode: run one engine until killed."""
+    sys.path.insert(0, str(TOOLS_DIR / 'site_manager'))
+    import site_manager
+    site_manager.RootHandler.log_message = lambda *a: None
+    site_manager.start_server(port, engine)
+    print('ready', flush=True)
+    while True:
+        time.sleep(3600)
+
+
+async def fetch(reader, writer, path: str):
+    writer.write(f'GET {path} HTTP/1.1\r\nHost: 127.0.0.1\r\nAccept-Encoding: gzip, br\r\n\r\n'.encode())
+    await writer.drain()
+    head = await reader.readuntil(b'\r\n\r\n')
+    status = int(head.split(b' ', 2)[1])
+    length = 0
+    for line in head.split(b'\r\n')[1:]:
+        name, _, value = line.partition(b':')
+        if name.strip().lower() == b'content-length':
+            length = int(value)
+    if length:
+        await reader.readexactly(length)
+    return status, len(head) + length
+
+
+async def client(port: int, urls, deadline: float, latencies: list, totals: dict):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    try:
+        i = 0
+        while time.perf_counter() < deadline:
+            t0 = time.perf_counter()
+            try:
+                status, nbytes = await fetch(reader, writer, urls[i % len(urls)])
+            except (ConnectionError, asyncio.IncompleteReadError):
+                totals['errors'] += 1
+                writer.close()
+                reader, writer = await asyncio.open_connection('127.0.0.1', port)
+                continue
+            latencies.append(time.perf_counter() - t0)
+            totals['bytes'] += nbytes
+            if status >= 400:
+                totals['errors'] += 1
+            i += 1
+    finally:
+        writer.close()
+
+
+async def load(port: int, urls, connections: int, seconds: float) -> dict:
+    latencies, totals = [], {'bytes': 0, 'errors': 0}
+    deadline = time.perf_counter() + seconds
+    t0 = time.perf_counter()
+    await asyncio.gather(*(client(port, urls, deadline, latencies, totals) for _ in range(connections)))
+    elapsed = time.perf_counter() - t0
+    latencies.sort()
+
+    def pct(p):
+        return latencies[min(len(latencies) - 1, round(p / 100 * (len(latencies) - 1)))] if latencies else 0
+
+    return {'requests': len(latencies), 'rps': len(latencies) / elapsed,
+            'mbps': totals['bytes'] / elapsed / 1e6, 'p50': pct(50), 'p99': pct(99),
+            'errors': totals['errors']}
+
+
+def run_engine(engine: str, urls, args):
+    port = free_port()
+    child = subprocess.Popen([sys.executable, __file__, '--serve', engine, '--port', str(port)],
+                             stdout=subprocess.PIPE, text=True)
+    try:
+        child.stdout.readline()  # 'ready'
+        asyncio.run(load(port, urls, 1, 0.5))  # warm the file cache
+        for conns in args.connections:
+            r = asyncio.run(load(port, urls, conns, args.seconds))
+            print(f"{engine:>9} {conns:>6} {r['rps']:>9.0f} {r['mbps']:>8.1f} "
+                  f"{r['p50'] * 1000:>9.2f} {r['p99'] * 1000:>9.2f} {r['errors']:>7}")
+    finally:
+        child.kill()
+        child.wait()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description='Load-test the preview server engines.')
+    ap.add_argument('--connections', type=int, nargs='+', default=[1, 16, 64])
+    ap.add_argument('--seconds', type=float, default=5.0)
+    ap.add_argument('--engines', nargs='+', choices=ENGINES, default=list(ENGINES))
+    ap.add_argument('--serve', choices=ENGINES, help=argparse.SUPPRESS)
+    ap.add_argument('--port', type=int, default=0, help=argparse.SUPPRESS)
+    args = ap.parse_args(argv)
+    if args.serve:
+        serve(args.serve, args.port)
+        return 0
+
+    urls = page_urls()
+    print(f'{len(urls)} URLs per pass ({HOME} + its asset closure), {args.seconds:.0f}s per run')
+    print(f'{"engine":>9} {"conns":>6} {"req/s":>9} {"MB/s":>8} {"p50 ms":>9} {"p99 ms":>9} {"errors":>7}')
+    for engine in args.engines:
+        run_engine(engine, urls, args)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
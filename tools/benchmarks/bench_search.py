@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Search Benchmark + Relevance Regression Set
+- Relevance: builds the index for the real site in memory and checks every
+  query in search_relevance.json still ranks its expected pages in the top N
+- Benchmark: synthetic corpora (default 100 .. 100k pages, Zipf-distributed
+  vocabulary) -> index build time, on-disk size, and p50/p99 query latency for
+  the reference engine (search_query.py), cold (fresh shard cache per query,
+  like a first search in the browser) and warm, next to a siteContent-style
+  substring scan over titles + snippets
+Output: console tables; exit code 1 when a relevance case regresses
+
+Run: python tools/benchmarks/bench_search.py [--sizes 100 1000 10000 100000] [--relevance-only]
+"""
+import sys
+import json
+import time
+import shutil
+import random
+import argparse
+import tempfile
+from pathlib import Path
+
+# shared helpers live in tools/common
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'common'))
+import site_model  # noqa: E402
+import search_index  # noqa: E402
+from search_query import SearchIndex  # noqa: E402
+
+RELEVANCE = Path(__file__).resolve().parent / 'search_relevance.json'
+DEFAULT_SIZES = (100, 1000, 10000, 100000)
+VOCAB_SIZE = 20000
+SYLLABLES = ('ba be bi bo bu ca ce ci co cu da de di do du fa fe fi fo ga ge go ka ke ki ko la le li '
+             'lo lu ma me mi mo mu na ne ni no nu pa pe pi po ra re ri ro ru sa se si so ta te ti to '
+             'va ve vi vo za ze zi zo').split()
+
+
+# -----------------------------------------------------------------------------
+# RELEVANCE
+# -----------------------------------------------------------------------------
+
+def check_relevance(cases_path: Path = RELEVANCE) -> int:
+    cases = json.loads(cases_path.read_text(encoding='utf-8'))
+    manifest, shards = search_index.build_index(site_model.load_site())
+    engine = SearchIndex.from_build(manifest, shards)
+
+    failures = 0
+    for case in cases:
+        got = [rel for rel, _ in engine.search(case['query'], case['top'])]
+        missing = [rel for rel in case['expect'] if rel not in got]
+        failures += bool(missing)
+        mark = 'FAIL' if missing else 'PASS'
+        print(f"{mark} {case['query']!r:<20} top {case['top']}: {', '.join(got) or '(no results)'}")
+        for rel in missing:
+            print(f'       expected {rel}')
+    print(f'{len(cases) - failures}/{len(cases)} relevance cases pass')
+    return failures
+
+
+# -----------------------------------------------------------------------------
+# SYNTHETIC CORPUS
+# -----------------------------------------------------------------------------
+
+def make_vocab(rnd: random.Random, size: int):
+    words = set()
+    while len(words) < size:
+        words.add(''.join(rnd.choice(SYLLABLES) for _ in range(rnd.randint(2, 4))))
+    vocab = sorted(words)
+    rnd.shuffle(vocab)
+    # Zipf: the word at rank r turns up ~1/r as often as the most common one
+    cum, total = [], 0.0
+    for rank in range(1, size + 1):
+        total += 1.0 / rank
+        cum.append(total)
+    return vocab, cum
+
+
+def make_corpus(pages: int, body_words: int, seed: int):
+    """{rel: site_model-shaped record} without touching the disk."""
+    rnd = random.Random(seed)
+    vocab, cum = make_vocab(rnd, VOCAB_SIZE)
+
+    def words(n):
+        return ' '.join(rnd.choices(vocab, cum_weights=cum, k=n))
+
+    site = {}
+    for i in range(pages):
+        rel = f'section-{i // 100}/page-{i % 100}.html'
+        site[rel] = {
+            'title': words(3).title(),
+            'headings': [words(2) for _ in range(3)],
+            'description': words(12),
+            'text': words(body_words),
+        }
+    return site, vocab, cum
+
+
+def make_queries(rnd: random.Random, vocab, cum, count: int):
+    """Mix of one-word, two-word and half-typed (prefix) queries drawn from the corpus vocabulary."""
+    queries = []
+    for _ in range(count):
+        kind = rnd.random()
+        a, b = rnd.choices(vocab, cum_weights=cum, k=2)
+        if kind < 0.4:
+            queries.append(a)
+        elif kind < 0.7:
+            queries.append(f'{a} {b}')
+        else:
+            queries.append(f'{a} {b[:3]}')
+    return queries
+
+
+# -----------------------------------------------------------------------------
+# BENCHMARK
+# -----------------------------------------------------------------------------
+
+def percentile(samples, pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))]
+
+
+def substring_scan(docs, query: str):
+    # what the curated siteContent list does: case-insensitive substring over title + description
+    q = query.lower()
+    return [d for d in docs if q in d[1].lower() or q in d[3].lower()]
+
+
+def bench_size(pages: int, args) -> dict:
+    site, vocab, cum = make_corpus(pages, args.body_words, args.seed)
+    queries = make_queries(random.Random(args.seed + 1), vocab, cum, args.queries)
+
+    t0 = time.perf_counter()
+    manifest, shards = search_index.build_index(site)
+    build = time.perf_counter() - t0
+
+    out = Path(tempfile.mkdtemp(prefix='searchbench-'))
+    try:
+        t0 = time.perf_counter()
+        search_index.write_index(manifest, shards, out)
+        write = time.perf_counter() - t0
+        shard_sizes = [p.stat().st_size for p in out.glob('shard-*.json')]
+        manifest_size = (out / 'manifest.json').stat().st_size
+
+        engine = SearchIndex.open(out)
+        cold, fetched = [], []
+        for q in queries:
+            fresh = SearchIndex(engine.manifest, engine._load_shard)
+            t0 = time.perf_counter()
+            fresh.search(q)
+            cold.append(time.perf_counter() - t0)
+            fetched.append(fresh.bytes_loaded)
+
+        for q in queries:
+            engine.search(q)
+        warm = []
+        for q in queries:
+            t0 = time.perf_counter()
+            engine.search(q)
+            warm.append(time.perf_counter() - t0)
+
+        scan = []
+        for q in queries:
+            t0 = time.perf_counter()
+            substring_scan(manifest['docs'], q)
+            scan.append(time.perf_counter() - t0)
+    finally:
+        shutil.rmtree(out, ignore_errors=True)
+
+    return {
+        'pages': pages, 'build': build, 'write': write,
+        'manifest_kb': manifest_size / 1024, 'shards': len(shard_sizes),
+        'shards_kb': sum(shard_sizes) / 1024, 'largest_kb': max(shard_sizes) / 1024,
+        'fetch_kb': sum(fetched) / len(fetched) / 1024,
+        'cold_p50': percentile(cold, 50), 'cold_p99': percentile(cold, 99),
+        'warm_p50': percentile(warm, 50), 'warm_p99': percentile(warm, 99),
+        'scan_p50': percentile(scan, 50), 'scan_p99': percentile(scan, 99),
+    }
+
+
+def print_rows(rows):
+    print(f'{"pages":>7} {"build s":>8} {"write s":>8} {"manif KB":>9} {"shards":>7} {"shard KB":>9} '
+          f'{"max KB":>8} {"fetch KB":>9}')
+    for r in rows:
+        print(f"{r['pages']:>7} {r['build']:>8.2f} {r['write']:>8.2f} {r['manifest_kb']:>9.0f} "
+              f"{r['shards']:>7} {r['shards_kb']:>9.0f} {r['largest_kb']:>8.0f} {r['fetch_kb']:>9.1f}")
+    print()
+    print(f'{"pages":>7} {"cold p50":>9} {"cold p99":>9} {"warm p50":>9} {"warm p99":>9} '
+          f'{"scan p50":>9} {"scan p99":>9}   (ms)')
+    for r in rows:
+        print(f"{r['pages']:>7} " + ' '.join(f'{r[k] * 1000:>9.2f}' for k in (
+            'cold_p50', 'cold_p99', 'warm_p50', 'warm_p99', 'scan_p50', 'scan_p99')))
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description='Benchmark the search index and check ranking regressions.')
+    ap.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES))
+    ap.add_argument('--queries', type=int, default=200)
+    ap.add_argument('--body-words', type=int, default=150)
+    ap.add_argument('--seed', type=int, default=1)
+    ap.add_argument('--relevance-only', action='store_true')
+    args = ap.parse_args(argv)
+
+    print('== Relevance (real site)')
+    failures = check_relevance()
+    if args.relevance_only:
+        return 1 if failures else 0
+
+    print('\n== Synthetic corpora')
+    rows = []
+    for pages in args.sizes:
+        t0 = time.perf_counter()
+        rows.append(bench_size(pages, args))
+        print(f'  {pages} pages done in {time.perf_counter() - t0:.1f}s')
+    print()
+    print_rows(rows)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Asset Graph
+- Transitive asset-reference graph across HTML, CSS and JS
+- HTML refs come from site_model (img/script/link, srcset, poster, inline
+  <style>/style="" url() and @import, inline module imports and asset paths
+  in inline scripts)
+- CSS files contribute url() and @import; JS files contribute ES module
+  imports and asset-looking string literals
+- Per-file refs for CSS/JS are cached on disk keyed by path + mtime + size
+Cache: tools/.cache/asset-graph.json
+
+Resolution follows the browser: CSS url() and JS imports resolve against the
+file that contains them; string literals in JS (e.g. img.src = 'x.png') resolve
+against the page that loaded the script.
+
+Run: python tools/common/asset_graph.py [page.html ...]   (print page closures)
+"""
+import os
+import sys
+import json
+from pathlib import Path
+from urllib.parse import unquote
+
+import site_model
+from site_model import FileIndex, SKIP_DIRS
+
+# project root: two levels up from tools/common/asset_graph.py
+ROOT = Path(__file__).resolve().parents[2]
+CACHE = ROOT / 'tools' / '.cache' / 'asset-graph.json'
+CACHE_VERSION = 1
+
+JS_EXTS = ('.js', '.mjs')
+CSS_EXTS = ('.css',)
+IMAGE_EXTS = ('.png', '.jpg', '.jpeg', '.gif', '.svg', '.webp', '.avif', '.ico')
+SKIP_SCHEMES = ('http://', 'https://', '//', 'mailto:', 'tel:', 'data:', 'javascript:', 'blob:', '#')
+
+
+def resolve_ref(base_rel: str, ref: str):
+    """ROOT-relative POSIX path for ref as seen from base_rel, or None if not local."""
+    ref = ref.strip()
+    if not ref or ref.startswith(SKIP_SCHEMES) or '${' in ref or '{{' in ref:
+        return None
+    clean = unquote(ref.split('#', 1)[0].split('?', 1)[0])
+    if not clean:
+        return None
+    if clean.startswith('/'):
+        joined = clean.lstrip('/')
+    else:
+        joined = posix_join(posix_dirname(base_rel), clean)
+    norm = os.path.normpath(joined).replace(os.sep, '/')
+    if norm == '.' or norm.startswith('../'):
+        return None
+    return norm
+
+
+def posix_dirname(rel: str) -> str:
+    return rel.rsplit('/', 1)[0] if '/' in rel else ''
+
+
+def posix_join(a: str, b: str) -> str:
+    return f'{a}/{b}' if a else b
+
+
+def file_refs(path: Path):
+    """[(ref, kind)] found in one CSS or JS file."""
+    text = path.read_text(encoding='utf-8', errors='ignore')
+    if path.suffix.lower() in CSS_EXTS:
+        return site_model.css_refs(text)
+    return site_model.js_refs(text)
+
+
+def load_cache() -> dict:
+    try:
+        data = json.loads(CACHE.read_text(encoding='utf-8'))
+    except Exception:
+        return {}
+    if data.get('version') != CACHE_VERSION:
+        return {}
+    return data.get('files', {})
+
+
+def save_cache(files: dict):
+    CACHE.parent.mkdir(parents=True, exist_ok=True)
+    tmp = CACHE.with_suffix('.tmp')
+    tmp.write_text(json.dumps({'version': CACHE_VERSION, 'files': files}, separators=(',', ':')),
+                   encoding='utf-8')
+    os.replace(tmp, CACHE)
+
+
+def is_site_file(rel: str) -> bool:
+    return not any(part in SKIP_DIRS for part in rel.split('/'))
+
+
+class AssetGraph:
+    """pages: {page: [(ref, kind)]}; refs: {css_or_js: [(ref, kind)]}; files: every site file."""
+
+    def __init__(self, pages: dict, refs: dict, files: set):
+        self.pages = pages
+        self.refs = refs
+        self.files = files
+        self._closures = {}
+
+    def page_assets(self, page: str) -> set:
+        """Every local file a browser fetches (transitively) to render page."""
+        if page in self._closures:
+            return self._closures[page]
+        seen = set()
+        stack = [t for t in (resolve_ref(page, r) for r, _ in self.pages.get(page, ())) if t]
+        while stack:
+            node = stack.pop()
+            if node in seen or node not in self.files:
+                continue
+            seen.add(node)
+            is_js = node.lower().endswith(JS_EXTS)
+            for ref, kind in self.refs.get(node, ()):
+                # DOM-facing strings in scripts resolve against the document, imports against the script
+                base = page if (is_js and kind == 'string') else node
+                target = resolve_ref(base, ref)
+                if target and target not in seen:
+                    stack.append(target)
+        seen.discard(page)
+        self._closures[page] = seen
+        return seen
+
+    def asset_users(self) -> dict:
+        """{asset: [pages using it]} across the whole site (pages in sorted order)."""
+        users = {}
+        for page in sorted(self.pages):
+            for asset in sorted(self.page_assets(page)):
+                users.setdefault(asset, []).append(page)
+        return users
+
+    def to_dict(self) -> dict:
+        # stable, JSON-friendly form for bundling / preload tooling
+        return {page: sorted(self.page_assets(page)) for page in sorted(self.pages)}
+
+
+def build_graph(index: FileIndex = None, site: dict = None, use_cache: bool = True) -> AssetGraph:
+    if index is None:
+        index = FileIndex()
+    if site is None:
+        site = site_model.load_site(site_model.collect_html_files(index))
+
+    pages = {}
+    for rel, record in site.items():
+        refs = [(r, t) for r, t in record['assets']]
+        refs += [tuple(r) for r in record.get('resources', ())]
+        pages[rel] = refs
+
+    cached = load_cache() if use_cache else {}
+    entries = {}
+    dirty = False
+    for rel in sorted(index.files):
+        if not is_site_file(rel) or not rel.lower().endswith(JS_EXTS + CSS_EXTS):
+            continue
+        path = index.root / rel
+        st = path.stat()
+        entry = cached.get(rel)
+        if not entry or entry['mtime_ns'] != st.st_mtime_ns or entry['size'] != st.st_size:
+            entry = {'mtime_ns': st.st_mtime_ns, 'size': st.st_size,
+                     'refs': [list(r) for r in file_refs(path)]}
+            dirty = True
+        entries[rel] = entry
+
+    if use_cache and (dirty or entries.keys() != cached.keys()):
+        save_cache(entries)
+
+    refs = {rel: [tuple(r) for r in e['refs']] for rel, e in entries.items()}
+    files = {rel for rel in index.files if is_site_file(rel)}
+    return AssetGraph(pages, refs, files)
+
+
+if __name__ == '__main__':
+    graph = build_graph()
+    targets = sys.argv[1:] or sorted(graph.pages)
+    for page in targets:
+        assets = sorted(graph.page_assets(page))
+        print(f'{page} ({len(assets)} assets)')
+        for a in assets:
+            print('  ', a)
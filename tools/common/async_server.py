@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Async Preview Server (asyncio engine for site_manager.start_server)
+- One event loop in a background thread serves every connection; no thread
+  per connection
+- HTTP/1.1 persistent connections; pipelined requests are answered in order
+- Bodies are written from the shared static_cache.StaticFileCache (filled
+  on a worker thread); files too large to cache go out with loop.sendfile()
+  (zero-copy on Linux). Cached bytes can differ from the file on disk (the
+  live-reload snippet), so they are never sent from disk
+- At most max_connections are served at once; extra connections wait in line
+- Idle connections are closed after IDLE_TIMEOUT seconds
+- Files only: a directory without index.html is a 404 (no listing)
+- With a site_watcher.ReloadHub, /__livereload streams reload events (SSE)
+
+Run: python tools/common/async_server.py [--port 8000]
+"""
+import json
+import asyncio
+import argparse
+import threading
+from pathlib import Path
+from http import HTTPStatus
+from email.utils import formatdate
+
+import static_cache
+from site_watcher import LIVE_RELOAD_PATH
+
+# project root: two levels up from tools/common/async_server.py
+ROOT = Path(__file__).resolve().parents[2]
+
+MAX_CONNECTIONS = 256
+IDLE_TIMEOUT = 15.0          # seconds a keep-alive connection may sit idle
+MAX_HEADER_BYTES = 64 * 1024
+EVENT_PING = 15.0            # seconds between SSE keep-alive comments
+SERVER_NAME = 'finnworks-preview-async'
+
+
+class Headers(dict):
+    """Case-insensitive header lookup (same .get() interface as http.client's message)."""
+
+    def get(self, name, default=None):
+        return super().get(name.lower(), default)
+
+
+class AsyncStaticServer:
+    def __init__(self, root: Path = ROOT, host: str = '127.0.0.1', port: int = 8000,
+                 cache: static_cache.StaticFileCache = None, max_connections: int = MAX_CONNECTIONS,
+                 hub=None):
+        self.root = Path(root).resolve()
+        self.host = host
+        self.port = port
+        self.cache = cache or static_cache.StaticFileCache(self.root)
+        self.max_connections = max_connections
+        self.hub = hub
+        self.active = 0
+        self.requests = 0
+        self._loop = None
+        self._server = None
+        self._slots = None
+        self._stop = None
+        self._writers = set()
+        self._event_queues = set()
+        self._thread = None
+        self._ready = threading.Event()
+
+    # -- lifecycle -------------------------------------------------------------
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._slots = asyncio.Semaphore(self.max_connections)
+        self._server = await asyncio.start_server(self._handle, self.host, self.port,
+                                                  limit=MAX_HEADER_BYTES, backlog=1024)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        await self.start()
+        self._stop = asyncio.Event()
+        self._ready.set()
+        await self._stop.wait()
+        # stop accepting, then let open connections see EOF and unwind on their own
+        self._server.close()
+        for q in list(self._event_queues):
+            q.put_nowait(None)
+        for writer in list(self._writers):
+            writer.close()
+        for _ in range(100):
+            if not self._writers:
+                break
+            await asyncio.sleep(0.02)
+
+    def start_in_thread(self):
+        """Run the event loop on a daemon thread (what start_server uses).
+
+        Raises here, on the caller's thread, when the server can't start (e.g. OSError: port in use).
+        """
+        failed = []
+
+        def run():
+            try:
+                asyncio.run(self.serve_forever())
+            except BaseException as e:
+                failed.append(e)
+            finally:
+                self._ready.set()
+        self._thread = threading.Thread(target=run, daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if failed and not self._stop:
+            raise failed[0]
+        return self
+
+    @property
+    def thread(self):
+        """The thread running the event loop (None until start_in_thread)."""
+        return self._thread
+
+    def shutdown(self):
+        # same name as socketserver's, so site_manager.stop_server handles both engines
+        if self._loop and self._stop and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._stop.set)
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    # -- connections -----------------------------------------------------------
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._writers.add(writer)
+        try:
+            async with self._slots:
+                self.active += 1
+                try:
+                    while await self._serve_one(reader, writer):
+                        pass
+                except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError,
+                        asyncio.TimeoutError):
+                    pass
+                finally:
+                    self.active -= 1
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except Exception:
+                pass
+
+    async def _serve_one(self, reader, writer) -> bool:
+        """Answer one request; False when the connection should close."""
+        head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), IDLE_TIMEOUT)
+        lines = head.decode('latin-1').split('\r\n')
+        try:
+            method, target, version = lines[0].split(' ', 2)
+        except ValueError:
+            await self._simple(writer, 400, close=True)
+            return False
+        headers = Headers()
+        for line in lines[1:]:
+            name, sep, value = line.partition(':')
+            if sep:
+                headers[name.strip().lower()] = value.strip()
+        self.requests += 1
+
+        conn = headers.get('Connection', '').lower()
+        keep_alive = (version == 'HTTP/1.1' and conn != 'close') or \
+                     (version == 'HTTP/1.0' and conn == 'keep-alive')
+        if 'content-length' in headers or 'transfer-encoding' in headers:
+            # preview server takes no request bodies; don't try to resync the stream
+            keep_alive = False
+
+        if method not in ('GET', 'HEAD'):
+            await self._simple(writer, 405, [('Allow', 'GET, HEAD')], close=not keep_alive)
+            return keep_alive
+
+        if self.hub is not None and target.split('?', 1)[0] == LIVE_RELOAD_PATH:
+            await self._events(writer)
+            return False
+
+        path = static_cache.resolve(self.root, target)
+        if path is not None and path.is_dir():
+            url_path, sep, query = target.partition('?')
+            if not url_path.endswith('/'):
+                location = url_path + '/' + sep + query
+                await self._simple(writer, 301, [('Location', location)], close=not keep_alive)
+                return keep_alive
+            path = path / 'index.html'
+        # a miss reads and compresses the file (gzip-9, brotli-11): keep that off the event loop
+        entry = await self._loop.run_in_executor(None, self.cache.get, path) if path is not None else None
+        if entry is None:
+            await self._simple(writer, 404, close=not keep_alive)
+            return keep_alive
+
+        status, hdrs, body = static_cache.plan(entry, headers)
+        writer.write(self._head(status, hdrs, keep_alive))
+        if method == 'HEAD' or status == 304:
+            pass
+        elif isinstance(body, bytes):
+            writer.write(body)
+        else:
+            start, length = body
+            if entry.data is None:
+                await writer.drain()
+                with open(entry.path, 'rb') as fh:
+                    await self._loop.sendfile(writer.transport, fh, start, length)
+            else:
+                writer.write(entry.data[start:start + length])
+        await writer.drain()
+        return keep_alive
+
+    async def _events(self, writer):
+        """Server-sent event stream of hub events until the client or server goes away."""
+        queue = asyncio.Queue()
+        loop = self._loop
+
+        def push(event):
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, event)
+            except RuntimeError:  # loop already closed
+                pass
+
+        headers = [('Content-Type', 'text/event-stream'), ('Cache-Control', 'no-cache')]
+        writer.write(self._head(200, headers, False) + b'retry: 1000\n\n')
+        await writer.drain()
+        self._event_queues.add(queue)
+        self.hub.subscribe(push)
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), EVENT_PING)
+                except asyncio.TimeoutError:
+                    writer.write(b': ping\n\n')
+                else:
+                    if event is None:
+                        break
+                    writer.write(f'event: reload\ndata: {json.dumps(event)}\n\n'.encode())
+                await writer.drain()
+        finally:
+            self.hub.unsubscribe(push)
+            self._event_queues.discard(queue)
+
+    def _head(self, status: int, headers, keep_alive: bool) -> bytes:
+        lines = [f'HTTP/1.1 {status} {HTTPStatus(status).phrase}',
+                 f'Server: {SERVER_NAME}',
+                 f'Date: {formatdate(usegmt=True)}']
+        lines += [f'{name}: {value}' for name, value in headers]
+        lines.append('Connection: keep-alive' if keep_alive else 'Connection: close')
+        return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+
+    async def _simple(self, writer, status: int, extra=(), close: bool = False):
+        body = f'{status} {HTTPStatus(status).phrase}\n'.encode()
+        headers = [('Content-Type', 'text/plain; charset=utf-8'), ('Content-Length', str(len(body)))]
+        writer.write(self._head(status, headers + list(extra), not close) + body)
+        await writer.drain()
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser(description='Serve the site with the asyncio preview engine.')
+    ap.add_argument('--port', type=int, default=8000)
+    ap.add_argument('--max-connections', type=int, default=MAX_CONNECTIONS)
+    args = ap.parse_args()
+    server = AsyncStaticServer(port=args.port, max_connections=args.max_connections)
+    print(f'Serving {server.root} on http://127.0.0.1:{args.port}/ (asyncio)')
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
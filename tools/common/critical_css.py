@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+"""
+Critical CSS (site_build stage)
+- Parses the page into a light DOM and keeps the first FOLD_ELEMENTS
+  elements of <body> (document order) as "above the fold"
+- Matches every rule of each linked local stylesheet against those elements;
+  a rule is critical if any of its selectors might match. Matching errs on
+  the side of keeping a rule: pseudo-classes always match, and classes /
+  attributes on <html> and <body> are ignored when the selector names the
+  tag or uses it as an ancestor (theme-manager toggles .dark there at
+  runtime)
+- @media / @supports are kept around the critical rules inside them;
+  @font-face / @keyframes only when a critical rule names them
+- The critical rules go in a <style> where the <link> stood, and the <link>
+  becomes rel=preload + onload (with a <noscript> fallback), so the full
+  sheet no longer blocks rendering. The cascade order is unchanged
+- Sheets with @import, media-specific links and pages whose critical CSS
+  would exceed MAX_INLINE are left alone
+
+Used by site_build.py (report: tools/site_manager/critical-css-report.json).
+"""
+import os
+import re
+from html.parser import HTMLParser
+
+FOLD_ELEMENTS = 150        # body elements, in document order, treated as above the fold
+MAX_INLINE = 32 * 1024     # larger critical CSS costs more than the request it saves
+
+VOID_TAGS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'source',
+             'track', 'wbr'}
+NOT_RENDERED = {'head', 'script', 'style', 'template', 'noscript', 'title', 'meta', 'link', 'base'}
+STATE_TAGS = ('html', 'body')   # their classes / attributes change at runtime
+
+# -----------------------------------------------------------------------------
+# DOM
+# -----------------------------------------------------------------------------
+
+
+class Element:
+    __slots__ = ('tag', 'id', 'classes', 'attrs', 'parent', 'children')
+
+    def __init__(self, tag, attrs, parent):
+        self.tag = tag
+        self.attrs = attrs
+        self.id = attrs.get('id')
+        self.classes = set((attrs.get('class') or '').split())
+        self.parent = parent
+        self.children = []
+
+    def previous_siblings(self):
+        if self.parent is None:
+            return []
+        siblings = self.parent.children
+        return siblings[:siblings.index(self)]
+
+
+class FoldParser(HTMLParser):
+    """Builds the element tree up to the fold; .fold lists the elements above it."""
+
+    def __init__(self, limit: int = FOLD_ELEMENTS):
+        super().__init__(convert_charrefs=True)
+        self.limit = limit
+        self.root = Element('html', {}, None)
+        self.stack = [self.root]
+        self.fold = [self.root]
+        self.body_count = 0
+        self.hidden = 0   # >0 inside <head>, <template>, <noscript>...
+
+    def handle_starttag(self, tag, attrs):
+        attrs = {k: v or '' for k, v in attrs}
+        if tag == 'html':
+            self.root.attrs = attrs
+            return
+        parent = self.stack[-1]
+        el = Element(tag, attrs, parent)
+        parent.children.append(el)
+        if tag in NOT_RENDERED:
+            self.hidden += tag not in VOID_TAGS
+        elif not self.hidden and self.body_count < self.limit:
+            self.fold.append(el)
+            if tag == 'body' or any(a.tag == 'body' for a in self.stack):
+                self.body_count += 1
+        if tag not in VOID_TAGS:
+            self.stack.append(el)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS and self.stack[-1].tag == tag:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        # pop up to the matching open element; stray end tags are ignored
+        for i in range(len(self.stack) - 1, 0, -1):
+            if self.stack[i].tag == tag:
+                for el in self.stack[i:]:
+                    if el.tag in NOT_RENDERED:
+                        self.hidden -= 1
+                del self.stack[i:]
+                return
+
+
+def fold_elements(html: str, limit: int = FOLD_ELEMENTS):
+    parser = FoldParser(limit)
+    parser.feed(html)
+    parser.close()
+    return parser.fold
+
+# -----------------------------------------------------------------------------
+# SELECTORS
+# -----------------------------------------------------------------------------
+SELECTOR_TOKEN_RE = re.compile(r'''
+    (?P<comb>\s*[>+~]\s*|\s+)
+  | (?P<id>\#(?:[-\w]|\\.)+)
+  | (?P<cls>\.(?:[-\w]|\\.)+)
+  | (?P<attr>\[\s*(?P<name>[-\w|:]+)\s*(?:(?P<op>[~|^$*]?=)\s*(?P<val>"[^"]*"|'[^']*'|[^\]\s]+)\s*(?:[iIsS]\s*)?)?\])
+  | (?P<pseudo>::?[-\w]+(?:\((?:[^()]|\([^()]*\))*\))?)
+  | (?P<tag>\*|(?:[-\w]|\\.)+)
+''', re.X)
+
+
+def parse_selector(selector: str):
+    """[(combinator, compound)] left to right, or None if the selector can't be parsed.
+    compound = (tag, ids, classes, attrs)."""
+    parts = []
+    comb = None
+    compound = None
+    pos, text = 0, selector.strip()
+    while pos < len(text):
+        m = SELECTOR_TOKEN_RE.match(text, pos)
+        if not m or m.end() == pos:
+            return None
+        pos = m.end()
+        if m.group('comb') is not None:
+            if compound is not None:
+                parts.append((comb, compound))
+                compound = None
+            comb = m.group('comb').strip() or ' '
+            continue
+        if compound is None:
+            compound = ['*', [], [], []]
+        if m.group('tag'):
+            compound[0] = m.group('tag').lower()
+        elif m.group('id'):
+            compound[1].append(_unescape(m.group('id')[1:]))
+        elif m.group('cls'):
+            compound[2].append(_unescape(m.group('cls')[1:]))
+        elif m.group('attr'):
+            val = m.group('val')
+            if val and val[0] in '"\'':
+                val = val[1:-1]
+            compound[3].append((m.group('name').lower(), m.group('op'), val))
+        # pseudo-classes / pseudo-elements: state can change above the fold, assume they match
+    if compound is None:
+        return None
+    parts.append((comb, compound))
+    return parts
+
+
+def _unescape(ident: str) -> str:
+    return re.sub(r'\\(.)', r'\1', ident)
+
+
+def _attr_ok(el: Element, name: str, op, val) -> bool:
+    if name not in el.attrs:
+        return False
+    have = el.attrs[name]
+    if op is None:
+        return True
+    if op == '=':
+        return have == val
+    if op == '~=':
+        return val in have.split()
+    if op == '|=':
+        return have == val or have.startswith(val + '-')
+    if op == '^=':
+        return bool(val) and have.startswith(val)
+    if op == '$=':
+        return bool(val) and have.endswith(val)
+    return bool(val) and val in have  # *=
+
+
+def _compound_ok(el: Element, compound, subject: bool) -> bool:
+    tag, ids, classes, attrs = compound
+    if tag not in ('*', el.tag) and not tag.endswith('|*'):
+        return False
+    if el.tag in STATE_TAGS and (tag == el.tag or not subject):
+        return True  # body.dark ..., .dark .card
+    return (all(el.id == i for i in ids) and all(c in el.classes for c in classes)
+            and all(_attr_ok(el, *a) for a in attrs))
+
+
+def matches(parts, el: Element, i: int = None) -> bool:
+    """Does el match parts[:i+1] (right-to-left, backtracking over combinators)?"""
+    if i is None:
+        i = len(parts) - 1
+    comb, compound = parts[i]
+    if not _compound_ok(el, compound, i == len(parts) - 1):
+        return False
+    if i == 0:
+        return True
+    if comb == '>':
+        return el.parent is not None and matches(parts, el.parent, i - 1)
+    if comb == ' ':
+        node = el.parent
+        while node is not None:
+            if matches(parts, node, i - 1):
+                return True
+            node = node.parent
+        return False
+    siblings = el.previous_siblings()
+    if comb == '+':
+        return bool(siblings) and matches(parts, siblings[-1], i - 1)
+    return any(matches(parts, s, i - 1) for s in siblings)  # ~
+
+
+def selector_used(selector: str, elements) -> bool:
+    parts = parse_selector(selector)
+    if parts is None:
+        return True  # unknown syntax: keep the rule
+    return any(matches(parts, el) for el in elements)
+
+# -----------------------------------------------------------------------------
+# CSS
+# -----------------------------------------------------------------------------
+CSS_COMMENT_RE = re.compile(r'''("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')|/\*.*?\*/''', re.S)
+CSS_URL_RE = re.compile(r'''url\(\s*(["']?)([^"')]+)\1\s*\)''', re.I)
+NESTED_AT_RULES = ('@media', '@supports', '@layer', '@container')
+
+
+def strip_comments(css: str) -> str:
+    return CSS_COMMENT_RE.sub(lambda m: m.group(1) or '', css)
+
+
+def _block_end(css: str, start: int) -> int:
+    """Index just past the '}' closing the block whose '{' is at start."""
+    depth, i, n = 0, start, len(css)
+    while i < n:
+        c = css[i]
+        if c in '"\'':
+            j = i + 1
+            while j < n and css[j] != c:
+                j += 2 if css[j] == '\\' else 1
+            i = j + 1
+            continue
+        if c == '{':
+            depth += 1
+        elif c == '}':
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    return n
+
+
+def parse_rules(css: str):
+    """Top-level items: ('rule', selectors, body) | ('nested', prelude, [items]) | ('at', prelude, text)."""
+    items, i, n = [], 0, len(css)
+    while i < n:
+        brace = css.find('{', i)
+        semi = css.find(';', i)
+        if brace < 0:
+            break
+        prelude = css[i:brace].strip()
+        if prelude.startswith('@') and 0 <= semi < brace:
+            items.append(('at', css[i:semi].strip(), css[i:semi + 1].strip()))  # @import / @charset
+            i = semi + 1
+            continue
+        end = _block_end(css, brace)
+        body = css[brace + 1:end - 1]
+        if prelude.lower().startswith(NESTED_AT_RULES):
+            items.append(('nested', prelude, parse_rules(body)))
+        elif prelude.startswith('@'):
+            items.append(('at', prelude, css[i:end].strip()))
+        else:
+            items.append(('rule', prelude, body.strip()))
+        i = end
+    return items
+
+
+def _split_selectors(prelude: str):
+    out, depth, cur = [], 0, []
+    for c in prelude:
+        if c in '([':
+            depth += 1
+        elif c in ')]':
+            depth -= 1
+        if c == ',' and depth == 0:
+            out.append(''.join(cur))
+            cur = []
+        else:
+            cur.append(c)
+    out.append(''.join(cur))
+    return [s.strip() for s in out if s.strip()]
+
+
+def _critical_items(items, elements, cache):
+    out = []
+    for kind, prelude, body in items:
+        if kind == 'rule':
+            used = []
+            for sel in _split_selectors(prelude):
+                if sel not in cache:
+                    cache[sel] = selector_used(sel, elements)
+                if cache[sel]:
+                    used.append(sel)
+            if used:
+                out.append(f"{','.join(used)}{{{body}}}")
+        elif kind == 'nested':
+            inner = _critical_items(body, elements, cache)
+            if inner:
+                out.append(f"{prelude}{{{''.join(inner)}}}")
+    return out
+
+
+def _named_at_rules(items, used_text: str):
+    """@font-face / @keyframes that the critical rules refer to."""
+    out = []
+    for kind, prelude, text in items:
+        if kind != 'at':
+            continue
+        low = prelude.lower()
+        if low.startswith('@font-face'):
+            family = re.search(r'font-family\s*:\s*([^;}]+)', text, re.I)
+            name = family.group(1).strip().strip('"\'') if family else None
+        elif '@keyframes' in low:
+            name = prelude.split(None, 1)[1].strip() if ' ' in prelude else None
+        else:
+            continue
+        if name and re.search(r'(?<![-\w])' + re.escape(name) + r'(?![-\w])', used_text):
+            out.append(text)
+    return out
+
+
+def critical_css(css: str, elements) -> str:
+    """The subset of css that might apply to elements ('' if none)."""
+    items = parse_rules(strip_comments(css))
+    rules = _critical_items(items, elements, {})
+    used_text = ''.join(rules)
+    return ''.join(_named_at_rules(items, used_text) + rules)
+
+
+def has_import(css: str) -> bool:
+    return any(kind == 'at' and prelude.lower().startswith('@import')
+               for kind, prelude, _ in parse_rules(strip_comments(css)))
+
+
+def rebase_urls(css: str, from_rel: str, to_rel: str) -> str:
+    """Rewrite relative url()s written for the file from_rel so they work from to_rel."""
+    src_dir = os.path.dirname(from_rel)
+    dst_dir = os.path.dirname(to_rel) or '.'
+
+    def fix(m):
+        ref = m.group(2).strip()
+        if re.match(r'^([a-z][a-z0-9+.-]*:|/|#)', ref, re.I):
+            return m.group(0)
+        path, tail = re.match(r'([^?#]*)(.*)', ref, re.S).groups()
+        new = os.path.relpath(os.path.normpath(os.path.join(src_dir, path)), dst_dir).replace(os.sep, '/')
+        return f'url("{new}{tail}")'
+
+    return CSS_URL_RE.sub(fix, css)
+
+# -----------------------------------------------------------------------------
+# PAGE
+# -----------------------------------------------------------------------------
+LINK_TAG_RE = re.compile(r'<link\b[^>]*>', re.I | re.S)
+ATTR_RE = re.compile(r'''([-\w:]+)\s*=\s*("[^"]*"|'[^']*'|[^\s"'>]+)''', re.S)
+
+
+def _link_attrs(tag: str) -> dict:
+    return {k.lower(): v.strip('"\'') for k, v in ATTR_RE.findall(tag)}
+
+
+def deferred_link(tag: str) -> str:
+    """<link rel=stylesheet> -> non-blocking preload that turns into a stylesheet once loaded."""
+    attrs = re.sub(r'''\srel\s*=\s*("[^"]*"|'[^']*'|[^\s"'>]+)''', '', tag[:-1].rstrip('/ '), flags=re.I)
+    return (attrs + ' rel="preload" as="style" onload="this.onload=null;this.rel=\'stylesheet\'">'
+            + f'<noscript>{tag}</noscript>')
+
+
+def inline_critical(html: str, page_rel: str, sheets: dict):
+    """sheets: {href as written in the page: (css text, css rel in the output)}.
+    Returns (html, stats) with stats = {'blocking': bytes, 'inlined': bytes, 'deferred': n,
+    'saved': bytes, 'skipped': reason or None}."""
+    links = []
+    for m in LINK_TAG_RE.finditer(html):
+        attrs = _link_attrs(m.group(0))
+        if attrs.get('rel', '').lower() != 'stylesheet' or attrs.get('href') not in sheets:
+            continue
+        if attrs.get('media', 'all').lower() not in ('all', 'screen', ''):
+            continue  # print/other media sheets don't block first paint
+        links.append((m, attrs['href']))
+    stats = {'blocking': 0, 'inlined': 0, 'deferred': 0, 'saved': 0, 'skipped': None}
+    if not links:
+        return html, stats
+
+    elements = fold_elements(html)
+    blocks = {}
+    for m, href in links:
+        css, css_rel = sheets[href]
+        stats['blocking'] += len(css.encode('utf-8'))
+        if has_import(css):
+            continue  # @import chains would still block; leave the link as it is
+        blocks[m.start()] = rebase_urls(critical_css(css, elements), css_rel, page_rel)
+    inlined = sum(len(b.encode('utf-8')) for b in blocks.values())
+    if inlined > MAX_INLINE:
+        stats['skipped'] = f'critical CSS {inlined} bytes > {MAX_INLINE}'
+        return html, stats
+
+    out, pos = [], 0
+    for m, href in links:
+        if m.start() not in blocks:
+            continue
+        out.append(html[pos:m.start()])
+        if blocks[m.start()]:
+            out.append(f'<style data-critical="{href}">{blocks[m.start()]}</style>')
+        out.append(deferred_link(m.group(0)))
+        pos = m.end()
+        stats['deferred'] += 1
+    out.append(html[pos:])
+    deferred_bytes = sum(len(sheets[href][0].encode('utf-8')) for m, href in links if m.start() in blocks)
+    stats['inlined'] = inlined
+    stats['saved'] = deferred_bytes - inlined
+    return ''.join(out), stats
@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+Deploy Pipeline (changed files only)
+- Delta: every file whose git blob id differs from the last deploy's
+  manifest (staged ids from `git ls-files -s`, `git hash-object` only for
+  files dirty in the work tree), so no history walk is needed. With no
+  manifest yet, the delta is `git diff` against the upstream branch (what
+  GitHub Pages serves), or HEAD when there is none, plus untracked files
+- Checks: only the steps the delta affects (site_watcher.affected_steps):
+  search index update, incremental link check, asset scan
+- Blocking: link/anchor/asset breakage that the last deploy didn't have
+  (without a manifest: breakage in pages outside the delta, or pointing at
+  files the delta didn't delete, counts as already known), or a failing
+  step. Newly unused assets and newly over-budget pages are warnings
+- Deploy: git add -A, commit, push; then a compact manifest (commit,
+  delta, check results, known issues, {file: blob id}) is written to
+  tools/.cache/deploys/ and last.json, which the next deploy diffs against
+- Dry run writes nothing to the work tree: the link and asset reports go to
+  a temp folder and the search index step is skipped (it only regenerates
+  assets/search/, it can't block)
+
+Used by site_manager (Deploy tab) and tools_cli.py deploy.
+Run: python tools/common/deploy_pipeline.py [--message MSG] [--dry-run] [--force] [--no-push]
+"""
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+import contextlib
+from pathlib import Path
+
+import site_watcher
+import search_index
+import warm_worker
+
+# project root: two levels up from tools/common/deploy_pipeline.py
+ROOT = Path(__file__).resolve().parents[2]
+DEPLOYS = ROOT / 'tools' / '.cache' / 'deploys'
+LAST = DEPLOYS / 'last.json'
+MANIFEST_VERSION = 1
+
+# what counts as site content (the rest of a commit deploys without checks)
+SITE_EXTS = site_watcher.WATCH_EXTS + ('.png', '.jpg', '.jpeg', '.gif', '.svg', '.webp', '.ico',
+                                       '.woff', '.woff2', '.ttf', '.pdf', '.mp3', '.mp4', '.json')
+GENERATED = ('assets/search/',)   # written by the search step itself
+LINK_ISSUES = ('broken_links', 'missing_anchors', 'broken_assets')
+
+
+class DeployError(RuntimeError):
+    pass
+
+
+def git(*args, check: bool = True, input: str = None) -> str:
+    proc = subprocess.run(['git', *args], cwd=str(ROOT), input=input, capture_output=True, text=True,
+                          encoding='utf-8')
+    if check and proc.returncode != 0:
+        raise DeployError(f"git {' '.join(args)} failed: {(proc.stderr or proc.stdout).strip()}")
+    return proc.stdout
+
+
+# -----------------------------------------------------------------------------
+# DELTA
+# -----------------------------------------------------------------------------
+
+def tree_hashes() -> dict:
+    """{rel: git blob id} for the work tree: tracked + untracked (not ignored) files."""
+    hashes = {}
+    for entry in git('ls-files', '-s', '-z').split('\0'):
+        if entry:
+            meta, rel = entry.split('\t', 1)
+            hashes[rel] = meta.split()[1]
+    dirty = {rel for rel in git('ls-files', '-m', '-o', '-d', '--exclude-standard', '-z').split('\0') if rel}
+    present = sorted(rel for rel in dirty if (ROOT / rel).is_file())
+    for rel in dirty.difference(present):
+        hashes.pop(rel, None)
+    if present:
+        ids = git('hash-object', '--stdin-paths', input='\n'.join(present)).split()
+        hashes.update(zip(present, ids))
+    return hashes
+
+
+def last_manifest():
+    try:
+        manifest = json.loads(LAST.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get('version') == MANIFEST_VERSION else None
+
+
+def fallback_base():
+    """(commit, 'upstream' | 'HEAD'): what to diff against before the first deploy."""
+    upstream = git('rev-parse', '--verify', '--quiet', '@{upstream}', check=False).strip()
+    if upstream:
+        return upstream, 'upstream'
+    return git('rev-parse', 'HEAD').strip(), 'HEAD'
+
+
+def delta(manifest, current: dict):
+    """(base commit, base source, {rel: 'created'|'modified'|'deleted'}) since the last deploy.
+
+    base source: 'last deploy', 'upstream' or 'HEAD', whichever the delta was taken against.
+    """
+    if manifest is not None:
+        before = manifest['files']
+        changes = {rel: 'created' if rel not in before else 'modified'
+                   for rel, blob in current.items() if before.get(rel) != blob}
+        changes.update((rel, 'deleted') for rel in before.keys() - current.keys())
+        return manifest['commit'], 'last deploy', changes
+    base, source = fallback_base()
+    kinds = {'A': 'created', 'D': 'deleted'}
+    changes = {}
+    out = git('diff', '--name-status', '--no-renames', '-z', base).split('\0')
+    for status, rel in zip(out[::2], out[1::2]):
+        changes[rel] = kinds.get(status[:1], 'modified')
+    for rel in git('ls-files', '-o', '--exclude-standard', '-z').split('\0'):
+        if rel:
+            changes[rel] = 'created'
+    return base, source, changes
+
+
+def is_site_file(rel: str) -> bool:
+    parts = rel.split('/')
+    return (rel.lower().endswith(SITE_EXTS) and not rel.startswith(GENERATED)
+            and not any(p in site_watcher.IGNORE_DIRS or p.startswith('.') for p in parts))
+
+
+# -----------------------------------------------------------------------------
+# CHECKS
+# -----------------------------------------------------------------------------
+
+def _tool(key: str):
+    return sys.modules.get(key) or warm_worker.load_tool(key, warm_worker.WARM_TOOLS[key])
+
+
+def _quiet(fn, *args):
+    """Run a tool entry point with its stdout captured; returns (result, printed lines)."""
+    buf = io.StringIO()
+    with contextlib.redirect_stdout(buf):
+        result = fn(*args)
+    return result, buf.getvalue().splitlines()
+
+
+def target_of(page: str, ref: str) -> str:
+    return os.path.normpath(os.path.join(os.path.dirname(page), ref.split('#', 1)[0])).replace(os.sep, '/')
+
+
+def link_issues(report: dict) -> dict:
+    """{issue key: (page, target rel or None)} from a link_checker report."""
+    issues = {}
+    for res in report['details']:
+        page = res['file']
+        for kind in LINK_ISSUES:
+            for item in res.get(kind, ()):
+                ref = item.get('href', item.get('ref', item.get('anchor', '')))
+                target = target_of(page, ref) if ref and kind != 'missing_anchors' else None
+                issues[f'{page} {kind} {ref}'] = (page, target)
+    return issues
+
+
+def check_links(changes: dict, manifest, out: Path = None):
+    link_checker = _tool('link_checker')
+    out = out or link_checker.OUT
+    _, lines = _quiet(link_checker.main, ['--incremental', '--out', str(out)])
+    report = json.loads(out.read_text(encoding='utf-8'))
+    issues = link_issues(report)
+    if manifest is not None:
+        known = set(manifest['issues']['links'])
+    else:
+        # first deploy: breakage outside the delta was already live
+        deleted = {rel for rel, kind in changes.items() if kind == 'deleted'}
+        known = {key for key, (page, target) in issues.items() if page not in changes and target not in deleted}
+    new = sorted(issues.keys() - known)
+    return {'summary': report['summary'], 'issues': sorted(issues), 'new': new,
+            'fixed': sorted(known - issues.keys()), 'log': lines[-3:]}
+
+
+def check_assets(manifest, out: Path = None):
+    scanner = _tool('asset_usage_scanner')
+    out = out or scanner.OUT
+    _, lines = _quiet(scanner.main, ['--out', str(out)])
+    data = json.loads(out.read_text(encoding='utf-8'))
+    unused = sorted(data['unused_js'] + data['unused_css'] + data['unused_images'])
+    before = manifest['issues'] if manifest is not None else {'unused': unused, 'over_budget': data['over_budget']}
+    return {'unused': unused, 'over_budget': data['over_budget'],
+            'new_unused': sorted(set(unused) - set(before.get('unused', ()))),
+            'new_over_budget': sorted(set(data['over_budget']) - set(before.get('over_budget', ()))),
+            'log': [ln for ln in lines if ln.startswith(('Unused', 'Over budget'))]}
+
+
+def check_search():
+    res = search_index.update_tracked()
+    return {'pages': res['pages'], 'changed': len(res['changed']), 'removed': len(res['removed']),
+            'shards_written': res['shards_written']}
+
+
+def run_checks(steps, changes: dict, manifest, log=print, scratch: Path = None) -> dict:
+    """{step: result | {'error': ...}}; every affected step runs even if an earlier one fails.
+
+    scratch: folder for the reports instead of the committed ones (dry run); the search step is skipped.
+    """
+    results = {}
+    for step in steps:
+        t0 = time.perf_counter()
+        try:
+            if step == 'search':
+                results[step] = {'skipped': 'dry run'} if scratch else check_search()
+            elif step == 'links':
+                results[step] = check_links(changes, manifest, scratch and scratch / 'link-report.json')
+            else:
+                results[step] = check_assets(manifest, scratch and scratch / 'asset-usage.json')
+        except Exception as e:
+            results[step] = {'error': f'{type(e).__name__}: {e}'}
+        results[step]['seconds'] = time.perf_counter() - t0
+        log(f"  {step}: {describe_step(step, results[step])}")
+    return results
+
+
+def describe_step(step: str, res: dict) -> str:
+    if 'error' in res:
+        return 'FAILED ' + res['error']
+    if 'skipped' in res:
+        return f"skipped ({res['skipped']})"
+    if step == 'search':
+        return f"{res['changed']} page(s) re-tokenized, {res['shards_written']} shard(s) written"
+    if step == 'links':
+        return f"{len(res['issues'])} issue(s), {len(res['new'])} new, {len(res['fixed'])} fixed"
+    return (f"{len(res['unused'])} unused ({len(res['new_unused'])} new), "
+            f"{len(res['over_budget'])} over budget ({len(res['new_over_budget'])} new)")
+
+
+def blockers(results: dict):
+    out = [f"{step} check failed: {res['error']}" for step, res in results.items() if 'error' in res]
+    out += [f'new breakage: {key}' for key in results.get('links', {}).get('new', ())]
+    return out
+
+
+def warnings(results: dict):
+    assets = results.get('assets', {})
+    return ([f'newly unused: {rel}' for rel in assets.get('new_unused', ())] +
+            [f'newly over budget: {rel}' for rel in assets.get('new_over_budget', ())])
+
+
+# -----------------------------------------------------------------------------
+# DEPLOY
+# -----------------------------------------------------------------------------
+
+def write_manifest(manifest: dict) -> Path:
+    DEPLOYS.mkdir(parents=True, exist_ok=True)
+    stamp = time.strftime('%Y%m%d-%H%M%S', time.gmtime(manifest['time']))
+    path = DEPLOYS / f"deploy-{stamp}-{manifest['commit'][:7]}.json"
+    text = json.dumps(manifest, separators=(',', ':'))
+    for dest in (path, LAST):
+        tmp = dest.with_suffix('.tmp')
+        tmp.write_text(text, encoding='utf-8')
+        os.replace(tmp, dest)
+    return path
+
+
+def carried_issues(manifest, results: dict) -> dict:
+    """Known issues after this deploy: fresh results where a step ran, the previous ones otherwise."""
+    issues = dict(manifest['issues']) if manifest is not None else {'links': [], 'unused': [], 'over_budget': []}
+    links, assets = results.get('links', {}), results.get('assets', {})
+    if 'issues' in links:
+        issues['links'] = links['issues']
+    if 'unused' in assets:
+        issues['unused'] = assets['unused']
+        issues['over_budget'] = assets['over_budget']
+    return issues
+
+
+def deploy(message: str = 'Site Manager update', dry_run: bool = False, force: bool = False,
+           push: bool = True, log=print) -> dict:
+    """Check the delta since the last deploy, then commit + push unless something new broke.
+
+    Returns {'base', 'base_source', 'changes', 'steps', 'checks', 'blockers', 'warnings', 'deployed',
+    'manifest'?}.
+    """
+    t0 = time.perf_counter()
+    manifest = last_manifest()
+    base, source, changes = delta(manifest, tree_hashes())
+    site = {rel: kind for rel, kind in changes.items() if is_site_file(rel)}
+    steps = site_watcher.affected_steps(site) if site else []
+    log(f"Since {source} {base[:7]}: {len(changes)} changed file(s), "
+        f"{len(site)} site file(s) -> {', '.join(steps) or 'no checks needed'}")
+    with (tempfile.TemporaryDirectory(prefix='deploy-check-') if dry_run else contextlib.nullcontext()) as tmp:
+        checks = run_checks(steps, site, manifest, log, scratch=tmp and Path(tmp))
+    result = {'base': base, 'base_source': source, 'changes': changes, 'steps': steps, 'checks': checks,
+              'blockers': blockers(checks), 'warnings': warnings(checks), 'deployed': False}
+    for line in result['warnings']:
+        log(f'  warning: {line}')
+    for line in result['blockers']:
+        log(f'  BLOCKED: {line}')
+
+    if dry_run or (result['blockers'] and not force):
+        if result['blockers'] and not dry_run:
+            log('Push blocked; fix the new breakage or deploy with force.')
+        result['seconds'] = time.perf_counter() - t0
+        return result
+
+    git('add', '-A')
+    if subprocess.run(['git', 'diff', '--cached', '--quiet'], cwd=str(ROOT)).returncode:
+        git('commit', '-m', message)   # anything staged; unpushed commits alone still get pushed
+        log(f'Committed: {message}')
+    if push:
+        git('push')
+        log('Pushed.')
+    commit = git('rev-parse', 'HEAD').strip()
+    new_manifest = {'version': MANIFEST_VERSION, 'commit': commit, 'base': base, 'base_source': source, 'time': time.time(),
+                    'pushed': push, 'forced': bool(result['blockers']), 'changes': changes,
+                    'checks': {step: describe_step(step, res) for step, res in checks.items()},
+                    'issues': carried_issues(manifest, checks), 'files': tree_hashes()}
+    result['manifest'] = write_manifest(new_manifest)
+    result['deployed'] = True
+    result['commit'] = commit
+    result['seconds'] = time.perf_counter() - t0
+    log(f"Deployed {commit[:7]} in {result['seconds']:.2f}s; manifest {result['manifest'].name}")
+    return result
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser(description='Check what changed since the last deploy, then commit and push.')
+    ap.add_argument('--message', default='Site Manager update', help='commit message')
+    ap.add_argument('--dry-run', action='store_true', help='run the affected checks only')
+    ap.add_argument('--force', action='store_true', help='push even with new breakage')
+    ap.add_argument('--no-push', action='store_true', help='commit and record the deploy without pushing')
+    args = ap.parse_args()
+    res = deploy(args.message, args.dry_run, args.force, not args.no_push)
+    sys.exit(0 if res['deployed'] or (args.dry_run and not res['blockers']) else 1)
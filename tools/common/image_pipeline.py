@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Image Pipeline (site_build stage)
+- Every JPG/PNG a page shows with <img src> gets downscaled copies at
+  WIDTHS (only widths smaller than the original, only copies that come out
+  smaller in bytes), in the original format, so src stays a working fallback
+- Pages get srcset (variants + original) and sizes on those <img> tags; an
+  existing srcset is left alone, an existing sizes is kept
+- Resizing runs on site_build's process pool; variants are cached in
+  tools/.cache/images/ by a hash of the source bytes + settings, so re-runs
+  only resize new or edited images
+- Pillow is optional: without it images are copied at full size
+
+Run: python tools/common/image_pipeline.py   (render/refresh the cache, print sizes)
+"""
+import os
+import re
+import sys
+import json
+import hashlib
+from pathlib import Path
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+
+from site_model import FileIndex, SKIP_DIRS
+
+# project root: two levels up from tools/common/image_pipeline.py
+ROOT = Path(__file__).resolve().parents[2]
+CACHE_DIR = ROOT / 'tools' / '.cache' / 'images'
+
+IMAGE_EXTS = ('.jpg', '.jpeg', '.png')
+WIDTHS = (480, 960, 1600)
+JPEG_QUALITY = 82
+DEFAULT_SIZES = '100vw'
+PIPELINE_VERSION = 2
+
+IMG_TAG_RE = re.compile(r'<img\b[^>]*>', re.I | re.S)
+IMG_SRC_RE = re.compile(r'''\ssrc\s*=\s*(["'])(.*?)\1''', re.I | re.S)
+IMG_ATTR_RE = r'\s{}\s*='
+
+
+def available() -> bool:
+    return Image is not None
+
+
+def is_image(rel: str) -> bool:
+    return rel.lower().endswith(IMAGE_EXTS)
+
+
+def cache_key(data: bytes) -> str:
+    """Source hash + every setting that changes the output."""
+    h = hashlib.sha256(data)
+    h.update(json.dumps([PIPELINE_VERSION, WIDTHS, JPEG_QUALITY]).encode())
+    return h.hexdigest()[:20]
+
+
+def variant_rel(rel: str, width: int) -> str:
+    stem, dot, ext = rel.rpartition('.')
+    return f'{stem}-{width}w.{ext}'
+
+
+# -----------------------------------------------------------------------------
+# WORKER
+# -----------------------------------------------------------------------------
+
+def _save(img, dest: Path, ext: str):
+    tmp = dest.with_name(dest.name + '.tmp')
+    if ext in ('jpg', 'jpeg'):
+        if img.mode not in ('RGB', 'L'):
+            img = img.convert('RGB')
+        img.save(tmp, 'JPEG', quality=JPEG_QUALITY, optimize=True, progressive=True)
+    else:
+        img.save(tmp, 'PNG', optimize=True)
+    os.replace(tmp, dest)
+
+
+def render(task: dict) -> dict:
+    """Resize one image into the cache (runs in a worker process). Returns its metadata."""
+    src, key, cache_dir = Path(task['src']), task['key'], Path(task['cache_dir'])
+    ext = src.suffix.lower().lstrip('.')
+    size = src.stat().st_size
+    with Image.open(src) as opened:
+        img = ImageOps.exif_transpose(opened)
+        width, height = img.size
+        if img.mode == 'P':
+            img = img.convert('RGBA')  # palette images resize with nearest-neighbour otherwise
+        variants = {}
+        for w in WIDTHS:
+            if w >= width:
+                break
+            dest = cache_dir / f'{key}-{w}.{ext}'
+            if not dest.is_file():
+                resized = img.resize((w, max(1, round(height * w / width))), Image.LANCZOS)
+                _save(resized, dest, ext)
+            data = dest.read_bytes()
+            if len(data) >= size:
+                # e.g. a small palette PNG that grew once resampled to RGBA: no point offering it
+                dest.unlink()
+                continue
+            variants[str(w)] = {'file': dest.name, 'hash': hashlib.sha256(data).hexdigest(),
+                                'bytes': len(data)}
+    meta = {'width': width, 'height': height, 'bytes': size, 'variants': variants}
+    tmp = cache_dir / f'{key}.json.tmp'
+    tmp.write_text(json.dumps(meta), encoding='utf-8')
+    os.replace(tmp, cache_dir / f'{key}.json')
+    return meta
+
+
+# -----------------------------------------------------------------------------
+# STAGE
+# -----------------------------------------------------------------------------
+
+def load_meta(key: str, cache_dir: Path = CACHE_DIR):
+    try:
+        meta = json.loads((cache_dir / f'{key}.json').read_text(encoding='utf-8'))
+    except Exception:
+        return None
+    files = [cache_dir / v['file'] for v in meta['variants'].values()]
+    return meta if all(f.is_file() for f in files) else None
+
+
+def process(rels, root: Path = ROOT, pool=None, cache_dir: Path = CACHE_DIR) -> dict:
+    """{rel: meta} for every image, resizing only what the cache doesn't hold yet.
+    meta = {'width', 'height', 'bytes', 'key', 'cached', 'variants': {width: {'file', 'hash', 'bytes'}}}"""
+    if Image is None:
+        return {}
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    results, tasks = {}, []
+    for rel in rels:
+        key = cache_key((root / rel).read_bytes())
+        meta = load_meta(key, cache_dir)
+        if meta is not None:
+            results[rel] = dict(meta, key=key, cached=True)
+        else:
+            tasks.append({'rel': rel, 'src': str(root / rel), 'key': key, 'cache_dir': str(cache_dir)})
+    rendered = pool.map(render, tasks) if pool else map(render, tasks)
+    for task, meta in zip(tasks, rendered):
+        results[task['rel']] = dict(meta, key=task['key'], cached=False)
+    return results
+
+
+def srcset_value(candidates) -> str:
+    """candidates: [(url, width)] -> 'url 480w, url 960w, ...'"""
+    return ', '.join(f'{url} {w}w' for url, w in sorted(candidates, key=lambda c: c[1]))
+
+
+def inject_srcset(html: str, srcsets: dict) -> str:
+    """Add srcset (and sizes, unless present) to <img> tags whose src is a key of srcsets."""
+    if not srcsets:
+        return html
+
+    def patch(m):
+        tag = m.group(0)
+        src = IMG_SRC_RE.search(tag)
+        if not src or src.group(2) not in srcsets or re.search(IMG_ATTR_RE.format('srcset'), tag, re.I):
+            return tag
+        extra = f' srcset="{srcsets[src.group(2)]}"'
+        if not re.search(IMG_ATTR_RE.format('sizes'), tag, re.I):
+            extra += f' sizes="{DEFAULT_SIZES}"'
+        end = len(tag) - 2 if tag.endswith('/>') else len(tag) - 1
+        return tag[:end].rstrip() + extra + tag[end:]
+
+    return IMG_TAG_RE.sub(patch, html)
+
+
+if __name__ == '__main__':
+    if Image is None:
+        print('Pillow is not installed (pip install Pillow); images are copied at full size.')
+        sys.exit(1)
+    rels = [r for r in sorted(FileIndex(ROOT).files)
+            if is_image(r) and not any(p in SKIP_DIRS for p in r.split('/'))]
+    for rel, meta in process(rels).items():
+        sizes = ', '.join(f"{w}w {v['bytes'] / 1024:.0f} KB" for w, v in meta['variants'].items()) or '-'
+        print(f"{rel}: {meta['width']}x{meta['height']} {meta['bytes'] / 1024:.0f} KB -> {sizes}"
+              f"{' (cached)' if meta['cached'] else ''}")
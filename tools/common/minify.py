@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Minify (conservative, stdlib only)
+- CSS: drop comments, collapse whitespace, trim around { } ; , > and the
+  last ; in a block - strings are never touched
+- JS: drop comments, indentation and blank lines; lines are never joined so
+  automatic semicolon insertion still sees the same code. Strings, template
+  literals (incl. ${...}) and regex literals are copied verbatim
+- HTML: drop comments (not conditional comments), collapse whitespace in
+  text, minify inline <style>/<script>; <pre>/<textarea> kept as-is
+
+Used by site_build.py.
+"""
+import re
+
+# -----------------------------------------------------------------------------
+# CSS
+# -----------------------------------------------------------------------------
+CSS_TOKEN_RE = re.compile(r'''("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*'|/\*.*?\*/)''', re.S)
+CSS_TRIM_RE = re.compile(r'\s*([{};,>])\s*')
+
+
+def minify_css(text: str) -> str:
+    out = []
+    for i, part in enumerate(CSS_TOKEN_RE.split(text)):
+        if i % 2:
+            if not part.startswith('/*'):
+                out.append(part)     # string literal
+            elif part.startswith('/*!'):
+                out.append(part)     # license comment
+            continue
+        part = re.sub(r'\s+', ' ', part)
+        part = CSS_TRIM_RE.sub(r'\1', part)
+        out.append(part)
+    css = ''.join(out).strip()
+    return css.replace(';}', '}')
+
+
+# -----------------------------------------------------------------------------
+# JS
+# -----------------------------------------------------------------------------
+# after these characters (or keywords) a '/' starts a regex literal, otherwise it divides
+REGEX_PREFIX = set('(,=:[!&|?{};+-*%<>~^')
+REGEX_KEYWORDS = ('return', 'typeof', 'instanceof', 'in', 'of', 'new', 'delete', 'void',
+                  'throw', 'case', 'do', 'else', 'yield', 'await')
+
+
+def _regex_allowed(out: list) -> bool:
+    code = ''.join(out[-32:]).rstrip()
+    if not code:
+        return True
+    if code[-1] in REGEX_PREFIX:
+        return True
+    word = re.search(r'([A-Za-z_$][\w$]*)$', code)
+    return bool(word) and word.group(1) in REGEX_KEYWORDS
+
+
+def minify_js(text: str) -> str:
+    out = []
+    i, n = 0, len(text)
+    braces = []       # brace depth at each open ${ ... } inside template literals
+    depth = 0
+    pending_space = False
+    pending_newline = False
+
+    def flush_ws():
+        nonlocal pending_space, pending_newline
+        if out:
+            if pending_newline:
+                out.append('\n')
+            elif pending_space:
+                out.append(' ')
+        pending_space = pending_newline = False
+
+    while i < n:
+        c = text[i]
+        nxt = text[i + 1] if i + 1 < n else ''
+
+        if c in ' \t\r\f\v':
+            pending_space = True
+            i += 1
+            continue
+        if c == '\n':
+            pending_newline = True
+            i += 1
+            continue
+        if c == '/' and nxt == '/':
+            end = text.find('\n', i)
+            i = n if end < 0 else end
+            continue
+        if c == '/' and nxt == '*':
+            end = text.find('*/', i + 2)
+            comment = text[i:n if end < 0 else end + 2]
+            i = n if end < 0 else end + 2
+            if '\n' in comment:
+                pending_newline = True
+            else:
+                pending_space = True
+            continue
+
+        flush_ws()
+
+        if c in '"\'':
+            j = i + 1
+            while j < n and text[j] != c and text[j] != '\n':
+                j += 2 if text[j] == '\\' else 1
+            out.append(text[i:j + 1])
+            i = j + 1
+            continue
+        if c == '`' or (c == '}' and braces and braces[-1] == depth):
+            if c == '}':
+                braces.pop()
+            # template literal chunk up to the closing ` or the next ${
+            j = i + 1
+            while j < n:
+                if text[j] == '\\':
+                    j += 2
+                    continue
+                if text[j] == '`':
+                    break
+                if text[j] == '$' and j + 1 < n and text[j + 1] == '{':
+                    braces.append(depth)
+                    j += 1
+                    break
+                j += 1
+            out.append(text[i:j + 1])
+            i = j + 1
+            continue
+        if c == '/' and _regex_allowed(out):
+            j = i + 1
+            in_class = False
+            while j < n and text[j] != '\n':
+                if text[j] == '\\':
+                    j += 2
+                    continue
+                if text[j] == '[':
+                    in_class = True
+                elif text[j] == ']':
+                    in_class = False
+                elif text[j] == '/' and not in_class:
+                    break
+                j += 1
+            j += 1
+            while j < n and (text[j].isalpha()):
+                j += 1  # flags
+            out.append(text[i:j])
+            i = j
+            continue
+
+        if c == '{':
+            depth += 1
+        elif c == '}':
+            depth -= 1
+        out.append(c)
+        i += 1
+
+    return ''.join(out).strip()
+
+
+# -----------------------------------------------------------------------------
+# HTML
+# -----------------------------------------------------------------------------
+HTML_BLOCK_RE = re.compile(
+    r'(<!--.*?-->|<(script|style|pre|textarea)\b([^>]*)>(.*?)</\2\s*>)', re.S | re.I)
+HTML_TAG_RE = re.compile(r'(<[^>]+>)')
+JS_TYPES = ('', 'text/javascript', 'application/javascript', 'module')
+
+
+def _script_type(attrs: str) -> str:
+    m = re.search(r'''\btype\s*=\s*["']?([^"'\s>]+)''', attrs, re.I)
+    return m.group(1).lower() if m else ''
+
+
+def _collapse_text(chunk: str) -> str:
+    # whitespace between/inside text nodes: a run with a newline becomes one newline, else one space
+    parts = HTML_TAG_RE.split(chunk)
+    for k in range(0, len(parts), 2):
+        parts[k] = re.sub(r'\s+', lambda m: '\n' if '\n' in m.group(0) else ' ', parts[k])
+    return ''.join(parts)
+
+
+def minify_html(text: str) -> str:
+    out = []
+    pos = 0
+    for m in HTML_BLOCK_RE.finditer(text):
+        out.append(_collapse_text(text[pos:m.start()]))
+        pos = m.end()
+        whole, tag, attrs, body = m.group(1), (m.group(2) or '').lower(), m.group(3), m.group(4)
+        if whole.startswith('<!--'):
+            if whole.startswith('<!--[if') or whole.startswith('<!--<![endif]'):
+                out.append(whole)
+            continue
+        if tag == 'style':
+            out.append(f'<style{attrs}>{minify_css(body)}</style>')
+        elif tag == 'script' and _script_type(attrs) in JS_TYPES and body.strip():
+            out.append(f'<script{attrs}>{minify_js(body)}</script>')
+        else:
+            out.append(whole)
+    out.append(_collapse_text(text[pos:]))
+    return ''.join(out).strip() + '\n'
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Report Writer
+- Streams tool reports as JSON Lines: each record is written the moment it is
+  produced, so peak memory stays flat and the first bytes hit disk right away
+- A ".gz" suffix gzips the stream
+- Lazy reader so viewers can page through a report without loading it whole
+Layout: {"_report": tool} header line, one line per record, {"_summary": {...}} last
+"""
+import gzip
+import json
+from pathlib import Path
+
+FORMATS = ('json', 'jsonl', 'jsonl.gz')
+
+
+def report_path(json_path: Path, fmt: str) -> Path:
+    """Map a tool's default .json report path onto the chosen output format."""
+    json_path = Path(json_path)
+    if fmt == 'json':
+        return json_path
+    return json_path.with_name(json_path.stem + '.' + fmt)
+
+
+def is_stream(path: Path) -> bool:
+    name = Path(path).name
+    return name.endswith('.jsonl') or name.endswith('.jsonl.gz')
+
+
+def _open(path: Path, mode: str):
+    if Path(path).name.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8', newline='\n')
+
+
+class ReportWriter:
+    """Write one JSON object per line; use as a context manager and set .summary before exit."""
+
+    def __init__(self, path: Path, tool: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.count = 0
+        self.summary = None
+        self._fh = _open(self.path, 'w')
+        self._line({'_report': tool})
+
+    def _line(self, obj):
+        self._fh.write(json.dumps(obj, separators=(',', ':')))
+        self._fh.write('\n')
+
+    def write(self, record: dict):
+        self._line(record)
+        self.count += 1
+
+    def close(self):
+        if self._fh is None:
+            return
+        # a missing summary line marks a report whose run did not finish
+        if self.summary is not None:
+            self._line({'_summary': self.summary})
+        self._fh.close()
+        self._fh = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.summary = None
+        self.close()
+        return False
+
+
+def iter_report(path: Path):
+    """Yield every object in a JSON Lines report (header, records, summary) lazily."""
+    with _open(path, 'r') as fh:
+        for line in fh:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Run History (SQLite, stdlib only)
+- Every run of link_checker, asset_usage_scanner and the search index build
+  is recorded in tools/.cache/run-history.sqlite: when, how long, files
+  scanned, bytes read, peak RSS, exit status and whether it ran warm
+- Bytes read: the process's read I/O (psutil if installed, else
+  /proc/self/io on Linux); peak RSS: resource.getrusage (psutil's peak
+  working set on Windows). Either is left empty where the platform has
+  no source for it. In the dashboard's warm worker, peak RSS is the worker's
+  lifetime peak
+- Each run is compared with the median duration of the tool's previous
+  BASELINE_RUNS successful runs of the same variant (the options that change
+  the work done, e.g. link_checker --incremental) and the same mode (warm
+  worker or cold process), and flagged slow when it takes more than
+  SLOW_FACTOR times that (and at least MIN_SLOWDOWN seconds more)
+
+Run: python tools/common/run_history.py [TOOL] [--limit N]   (recent runs, slow ones marked)
+Used by link_checker, asset_usage_scanner, search_index.update_tracked and tools_dashboard.py.
+"""
+import os
+import sys
+import json
+import time
+import sqlite3
+import argparse
+import statistics
+import contextlib
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# project root: two levels up from tools/common/run_history.py
+ROOT = Path(__file__).resolve().parents[2]
+DB = ROOT / 'tools' / '.cache' / 'run-history.sqlite'
+
+BASELINE_RUNS = 10    # previous successful runs the baseline is the median of
+MIN_BASELINE = 3      # fewer runs than this: no baseline, nothing is flagged
+SLOW_FACTOR = 1.5
+MIN_SLOWDOWN = 0.05   # seconds; keeps jitter on very fast runs from being flagged
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    tool TEXT NOT NULL,
+    variant TEXT NOT NULL DEFAULT '',
+    started REAL NOT NULL,
+    duration REAL NOT NULL,
+    files INTEGER,
+    bytes_read INTEGER,
+    peak_rss INTEGER,
+    exit_code INTEGER NOT NULL,
+    warm INTEGER NOT NULL DEFAULT 0,
+    baseline REAL,
+    slow INTEGER NOT NULL DEFAULT 0,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_tool_started ON runs (tool, variant, started);
+"""
+COLUMNS = ('id', 'tool', 'variant', 'started', 'duration', 'files', 'bytes_read', 'peak_rss',
+           'exit_code', 'warm', 'baseline', 'slow', 'extra')
+
+
+def connect(path: Path = DB):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(path), timeout=10)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+# -----------------------------------------------------------------------------
+# MEASUREMENT
+# -----------------------------------------------------------------------------
+
+def bytes_read():
+    if psutil is not None:
+        try:
+            io = psutil.Process().io_counters()
+            return getattr(io, 'read_chars', io.read_bytes)
+        except (AttributeError, psutil.Error):
+            pass
+    try:
+        with open('/proc/self/io', encoding='ascii') as f:
+            for line in f:
+                if line.startswith('rchar:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def peak_rss():
+    """Peak resident set size in bytes (this process or, for --jobs pools, its largest child)."""
+    if resource is not None:
+        scale = 1 if sys.platform == 'darwin' else 1024   # ru_maxrss: bytes on macOS, KB on Linux
+        peaks = [resource.getrusage(who).ru_maxrss for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN)]
+        return max(peaks) * scale
+    if psutil is not None:
+        info = psutil.Process().memory_info()
+        return getattr(info, 'peak_wset', info.rss)
+    return None
+
+
+@contextlib.contextmanager
+def track(tool: str, variant: str = '', path: Path = DB):
+    """Time the block and record it. The block may set run['files'] and any extra keys, and
+    run['variant'] when what it turned out to do differs from what was asked (e.g. nothing to do).
+
+    with run_history.track('link_checker', 'incremental') as run:
+        ...
+        run['files'] = len(html_files)
+    """
+    run = {'files': None}
+    started, t0, read0 = time.time(), time.perf_counter(), bytes_read()
+    code = 0
+    try:
+        yield run
+    except SystemExit as e:
+        code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        raise
+    except BaseException:
+        code = 1
+        raise
+    finally:
+        read1 = bytes_read()
+        files = run.pop('files')
+        variant = run.pop('variant', variant)
+        try:
+            record(tool, time.perf_counter() - t0, variant=variant, files=files,
+                   bytes_read=(read1 - read0) if read0 is not None and read1 is not None else None,
+                   peak_rss=peak_rss(), exit_code=code, started=started,
+                   warm=bool(os.environ.get('TOOLS_WARM_WORKER')), extra=run, path=path)
+        except sqlite3.Error as e:
+            print(f'[run history not recorded: {e}]', file=sys.stderr)
+
+
+# -----------------------------------------------------------------------------
+# STORE
+# -----------------------------------------------------------------------------
+
+def baseline(conn, tool: str, variant: str = '', before: float = None, warm: bool = False):
+    """Median duration of the last BASELINE_RUNS successful runs of tool + variant + mode, or None if there are too few."""
+    rows = conn.execute(
+        'SELECT duration FROM runs WHERE tool = ? AND variant = ? AND warm = ? AND exit_code = 0 AND started < ? '
+        'ORDER BY started DESC LIMIT ?',
+        (tool, variant, int(warm), before if before is not None else time.time() + 1, BASELINE_RUNS)).fetchall()
+    if len(rows) < MIN_BASELINE:
+        return None
+    return statistics.median(r[0] for r in rows)
+
+
+def is_slow(duration: float, base) -> bool:
+    return base is not None and duration > base * SLOW_FACTOR and duration - base >= MIN_SLOWDOWN
+
+
+def record(tool: str, duration: float, variant: str = '', files=None, bytes_read=None, peak_rss=None,
+           exit_code: int = 0, started: float = None, warm: bool = False, extra: dict = None,
+           path: Path = DB) -> dict:
+    started = time.time() - duration if started is None else started
+    with contextlib.closing(connect(path)) as conn, conn:
+        base = baseline(conn, tool, variant, started, warm)
+        slow = exit_code == 0 and is_slow(duration, base)
+        cur = conn.execute(
+            'INSERT INTO runs (tool, variant, started, duration, files, bytes_read, peak_rss, exit_code, warm, '
+            'baseline, slow, extra) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            (tool, variant, started, duration, files, bytes_read, peak_rss, exit_code, int(warm), base,
+             int(slow), json.dumps(extra) if extra else None))
+        run_id = cur.lastrowid
+    return {'id': run_id, 'tool': tool, 'variant': variant, 'duration': duration,
+            'baseline': base, 'slow': slow}
+
+
+def runs(tool: str = None, limit: int = 100, path: Path = DB):
+    """Latest runs, oldest first (the order they're charted in)."""
+    if not path.exists():
+        return []
+    with contextlib.closing(connect(path)) as conn:
+        where, args = ('WHERE tool = ?', (tool,)) if tool else ('', ())
+        rows = conn.execute(f'SELECT {", ".join(COLUMNS)} FROM runs {where} ORDER BY started DESC LIMIT ?',
+                            (*args, limit)).fetchall()
+    return [dict(zip(COLUMNS, r)) for r in reversed(rows)]
+
+
+def tools(path: Path = DB):
+    if not path.exists():
+        return []
+    with contextlib.closing(connect(path)) as conn:
+        return [r[0] for r in conn.execute('SELECT DISTINCT tool FROM runs ORDER BY tool')]
+
+
+def describe(run: dict) -> str:
+    parts = [time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(run['started'])),
+             f"{run['duration']:.3f}s"]
+    if run['variant']:
+        parts.append(f"[{run['variant']}]")
+    if run['files'] is not None:
+        parts.append(f"{run['files']} files")
+    if run['bytes_read'] is not None:
+        parts.append(f"{run['bytes_read'] / 1024:.0f} KB read")
+    if run['peak_rss'] is not None:
+        parts.append(f"peak {run['peak_rss'] / 1048576:.1f} MB")
+    if run['warm']:
+        parts.append('warm')
+    if run['exit_code']:
+        parts.append(f"exit {run['exit_code']}")
+    if run['slow']:
+        parts.append(f"SLOW (baseline {run['baseline']:.3f}s)")
+    return '  '.join(parts)
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser(description='Show recorded tool runs.')
+    ap.add_argument('tool', nargs='?', help='only this tool')
+    ap.add_argument('--limit', type=int, default=20)
+    args = ap.parse_args()
+    for name in ([args.tool] if args.tool else tools()):
+        print(name)
+        for run in runs(name, args.limit):
+            print('  ' + describe(run))
@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+Search Index
+- Inverted full-text index over every page in the site model, except the
+  utility and easter-egg pages in NOINDEX_PAGES (404, maintenance, portals...)
+- Fields: title, headings, meta description, visible body text; each field's
+  term frequency is multiplied by its boost
+- Tokens are lowercased, stop words dropped and lightly stemmed; the exact same
+  rules are mirrored in assets/js/universal-search.js
+- Postings are serialized compactly ([doc gap, weighted tf, ...]) and sharded by
+  term prefix, so the browser only fetches the shards a query touches
+- Incremental: per-page content hashes and term frequencies are kept in a state
+  file; only changed pages are re-tokenized, postings are re-merged from the
+  stored per-page terms and only shards whose bytes changed are rewritten
+- Also writes the search box's curated dataset (site_content.py) from the
+  same parse of each page
+Output: assets/search/manifest.json + assets/search/shard-<prefix>.json
+        + assets/search/content.json (all committed: GitHub Pages serves the
+        repo as-is, so rebuild and commit them with the pages they index)
+State:  tools/.cache/search-index.json
+
+Used by site_manager.build_search_index, tools_cli.py build-index and the deploy pipeline.
+Run: python tools/common/search_index.py [--force]   (e.g. from an on-save hook)
+"""
+import os
+import re
+import json
+import time
+import hashlib
+import argparse
+from pathlib import Path
+
+import site_model
+import site_content
+import run_history
+
+# project root: two levels up from tools/common/search_index.py
+ROOT = Path(__file__).resolve().parents[2]
+OUT_DIR = ROOT / 'assets' / 'search'
+STATE = ROOT / 'tools' / '.cache' / 'search-index.json'
+INDEX_VERSION = 1
+
+# top-level pages that aren't content: never listed in the curated data either
+NOINDEX_PAGES = frozenset({'404.html', 'backup-index.html', 'congrats.html', 'maintenance.html',
+                           'portal.html', 'portal-2.html', 'progress.html'})
+
+FIELD_BOOSTS = {'title': 5, 'headings': 3, 'description': 2, 'body': 1}
+BM25 = {'k1': 1.2, 'b': 0.75}
+SNIPPET_CHARS = 160
+
+# a shard holding more postings than this is split by a longer prefix (up to MAX_PREFIX chars)
+SHARD_TARGET = 4000
+MAX_PREFIX = 3
+
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+STOP_WORDS = frozenset('''
+a an and are as at be but by can for from has have i in into is it its me my
+not of on or our so that the this to was we will with you your
+'''.split())
+
+
+def stem(word: str) -> str:
+    """Light suffix stripper (plural, -ing, -ed, -ly). Keep in sync with universal-search.js."""
+    if len(word) <= 3 or word.isdigit():
+        return word
+    if word.endswith('ies') and len(word) > 4:
+        return word[:-3] + 'y'
+    if word.endswith('sses'):
+        return word[:-2]
+    if word.endswith('s') and not word.endswith(('ss', 'us', 'is')):
+        word = word[:-1]
+    for suffix in ('ing', 'ed'):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            word = word[:-len(suffix)]
+            # running -> runn -> run
+            if word[-1] == word[-2] and word[-1] not in 'lsz':
+                word = word[:-1]
+            return word
+    if word.endswith('ly') and len(word) > 5:
+        return word[:-2]
+    return word
+
+
+def tokenize(text: str):
+    return [stem(t) for t in TOKEN_RE.findall(text.lower()) if len(t) > 1 and t not in STOP_WORDS]
+
+
+def doc_type(rel: str) -> str:
+    # matches the filter buttons in universal-search.js
+    if rel.startswith('games/'):
+        return 'games'
+    if rel.startswith('projects/'):
+        return 'projects'
+    if rel.startswith('tools/'):
+        return 'tools'
+    return 'pages'
+
+
+def page_fields(rel: str, record: dict) -> dict:
+    return {
+        'title': record.get('title') or rel,
+        'headings': ' '.join(record.get('headings') or ()),
+        'description': record.get('description') or '',
+        'body': record.get('text') or '',
+    }
+
+
+def analyze(rel: str, record: dict):
+    """(weighted term frequencies, weighted length) for one page."""
+    tf = {}
+    length = 0
+    for field, text in page_fields(rel, record).items():
+        boost = FIELD_BOOSTS[field]
+        tokens = tokenize(text)
+        length += boost * len(tokens)
+        for term in tokens:
+            tf[term] = tf.get(term, 0) + boost
+    return tf, length
+
+
+def doc_entry(rel: str, record: dict, length: int) -> list:
+    fields = page_fields(rel, record)
+    snippet = fields['description'] or fields['body']
+    if len(snippet) > SNIPPET_CHARS:
+        snippet = snippet[:SNIPPET_CHARS].rsplit(' ', 1)[0] + '…'
+    return [rel, fields['title'], doc_type(rel), snippet, length]
+
+
+def plan_shards(sizes: dict) -> dict:
+    """{term: shard prefix}; prefixes grow (1..MAX_PREFIX chars) until a shard fits SHARD_TARGET."""
+    assignment = {}
+
+    def split(terms, depth):
+        groups = {}
+        for t in terms:
+            groups.setdefault(t[:depth], []).append(t)
+        for prefix, group in groups.items():
+            size = sum(sizes[t] for t in group)
+            if size > SHARD_TARGET and depth < MAX_PREFIX and len(group) > 1:
+                split(group, depth + 1)
+            else:
+                for t in group:
+                    assignment[t] = prefix
+
+    split(sorted(sizes), 1)
+    return assignment
+
+
+def encode_postings(postings) -> list:
+    # [(doc, wtf), ...] sorted by doc -> [gap, wtf, gap, wtf, ...]
+    flat = []
+    prev = 0
+    for doc, wtf in postings:
+        flat.extend((doc - prev, wtf))
+        prev = doc
+    return flat
+
+
+def assemble(entries: dict):
+    """Merge per-page {rel: (tf, doc entry)} into (manifest, {prefix: {term: flat postings}})."""
+    docs = []
+    postings = {}
+    for doc_id, rel in enumerate(sorted(entries)):
+        tf, doc = entries[rel]
+        docs.append(doc)
+        for term, wtf in tf.items():
+            postings.setdefault(term, []).append((doc_id, wtf))
+
+    assignment = plan_shards({t: len(p) for t, p in postings.items()})
+    shards = {}
+    for term in sorted(postings):
+        shards.setdefault(assignment[term], {})[term] = encode_postings(postings[term])
+
+    manifest = {
+        'version': INDEX_VERSION,
+        'fields': FIELD_BOOSTS,
+        'bm25': BM25,
+        'stop': sorted(STOP_WORDS),
+        'docs': docs,
+        'avg_len': (sum(d[4] for d in docs) / len(docs)) if docs else 0,
+        'max_prefix': MAX_PREFIX,
+        'shards': sorted(shards),
+    }
+    return manifest, shards
+
+
+def page_entry(rel: str, record: dict):
+    tf, length = analyze(rel, record)
+    return tf, doc_entry(rel, record, length)
+
+
+def is_indexed(rel: str) -> bool:
+    return rel not in NOINDEX_PAGES
+
+
+def build_index(site: dict):
+    """Return (manifest, {prefix: {term: flat postings}}) for {rel: site_model record}."""
+    return assemble({rel: page_entry(rel, record) for rel, record in site.items() if is_indexed(rel)})
+
+
+def _dump(obj) -> str:
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False)
+
+
+def _write_if_changed(path: Path, text: str) -> bool:
+    data = text.encode('utf-8')
+    try:
+        if path.read_bytes() == data:
+            return False
+    except OSError:
+        pass
+    tmp = path.with_suffix('.tmp')
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+    return True
+
+
+def write_index(manifest: dict, shards: dict, out_dir: Path = OUT_DIR) -> Path:
+    """Write manifest + shard files, dropping shards that no longer exist. Returns manifest path."""
+    return _write_index(manifest, shards, out_dir)[0]
+
+
+def _write_index(manifest: dict, shards: dict, out_dir: Path):
+    # shard files whose bytes are unchanged are left alone (keeps mtimes/ETags stable)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    wanted = set()
+    written = 0
+    for prefix, terms in shards.items():
+        path = out_dir / f'shard-{prefix}.json'
+        wanted.add(path.name)
+        written += _write_if_changed(path, _dump({'terms': terms}))
+    for old in out_dir.glob('shard-*.json'):
+        if old.name not in wanted:
+            old.unlink()
+    # manifest last: a reader never sees it pointing at shards that aren't written yet
+    manifest_path = out_dir / 'manifest.json'
+    _write_if_changed(manifest_path, _dump(manifest))
+    return manifest_path, written
+
+
+# -----------------------------------------------------------------------------
+# INCREMENTAL REBUILD
+# -----------------------------------------------------------------------------
+
+def _settings() -> dict:
+    # anything that changes how a page is analyzed invalidates every stored entry
+    return {'version': INDEX_VERSION, 'fields': FIELD_BOOSTS, 'stop': sorted(STOP_WORDS),
+            'snippet': SNIPPET_CHARS, 'content': [site_content.CONTENT_VERSION, site_content.FIELDS]}
+
+
+def content_hash(path: Path) -> str:
+    return hashlib.sha1(path.read_bytes()).hexdigest()
+
+
+def load_state(path: Path = STATE) -> dict:
+    try:
+        data = json.loads(path.read_text(encoding='utf-8'))
+    except Exception:
+        return {}
+    if data.get('settings') != _settings():
+        return {}
+    return data.get('pages', {})
+
+
+def save_state(pages: dict, path: Path = STATE):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix('.tmp')
+    tmp.write_text(json.dumps({'settings': _settings(), 'pages': pages}, separators=(',', ':')),
+                   encoding='utf-8')
+    os.replace(tmp, path)
+
+
+def update_index(html_files=None, root: Path = ROOT, out_dir: Path = OUT_DIR,
+                 state_path: Path = STATE, force: bool = False) -> dict:
+    """Bring the index in out_dir up to date with html_files, re-tokenizing only changed pages.
+
+    A page counts as changed when its content hash differs from the stored one; the
+    hash is only recomputed when mtime/size moved. Returns stats for logging.
+    """
+    t0 = time.perf_counter()
+    if html_files is None:
+        html_files = site_model.collect_html_files()
+    previous = {} if force else load_state(state_path)
+
+    pages = {}
+    changed = []
+    touched = False
+    for path in html_files:
+        rel = Path(path).relative_to(root).as_posix()
+        if not is_indexed(rel):
+            continue
+        st = path.stat()
+        entry = previous.get(rel)
+        if entry and entry['mtime_ns'] == st.st_mtime_ns and entry['size'] == st.st_size:
+            pages[rel] = entry
+            continue
+        digest = content_hash(path)
+        touched = True
+        if entry and entry['hash'] == digest:
+            # saved without edits: keep the terms, remember the new stat
+            pages[rel] = dict(entry, mtime_ns=st.st_mtime_ns, size=st.st_size)
+            continue
+        record = site_model.parse_page(path)
+        tf, doc = page_entry(rel, record)
+        pages[rel] = {'mtime_ns': st.st_mtime_ns, 'size': st.st_size, 'hash': digest,
+                      'tf': tf, 'doc': doc, 'content': site_content.content_item(rel, record, doc)}
+        changed.append(rel)
+
+    removed = sorted(previous.keys() - pages.keys())
+    manifest_path = out_dir / 'manifest.json'
+    content_path = out_dir / site_content.CONTENT_NAME
+    stats = {'pages': len(pages), 'changed': changed, 'removed': removed, 'shards_written': 0}
+    if changed or removed or not manifest_path.exists() or not content_path.exists():
+        manifest, shards = assemble({rel: (e['tf'], e['doc']) for rel, e in pages.items()})
+        _, stats['shards_written'] = _write_index(manifest, shards, out_dir)
+        payload = site_content.assemble(e['content'] for e in pages.values())
+        _write_if_changed(content_path, site_content.dump(payload))
+    if touched or removed or force or not previous:
+        save_state(pages, state_path)
+    stats['manifest'] = manifest_path
+    stats['seconds'] = time.perf_counter() - t0
+    return stats
+
+
+def update_tracked(force: bool = False) -> dict:
+    """update_index over every page, recorded in the run history as build_search_index."""
+    with run_history.track('build_search_index', 'force' if force else '') as run:
+        res = update_index(site_model.collect_html_files(), force=force)
+        run.update(files=res['pages'], changed=len(res['changed']))
+    return res
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser(description='Update the front-end search index.')
+    ap.add_argument('--force', action='store_true', help='re-tokenize every page')
+    args = ap.parse_args()
+    res = update_tracked(force=args.force)
+    print(f"{res['pages']} pages, {len(res['changed'])} re-tokenized, {len(res['removed'])} removed, "
+          f"{res['shards_written']} shard(s) written in {res['seconds'] * 1000:.0f} ms")
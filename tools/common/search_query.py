@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Search Query (reference engine)
+- Answers queries against the index written by search_index.py, with the same
+  tokenizer, shard selection and BM25 scoring as assets/js/universal-search.js
+- Shards are loaded lazily and kept, like the browser's fetch cache
+- Used by the search benchmark / relevance regression set and for debugging
+
+Run: python tools/common/search_query.py "query" [--limit 10]
+"""
+import json
+import math
+import argparse
+from pathlib import Path
+
+import search_index
+from search_index import OUT_DIR, TOKEN_RE, stem
+
+
+class SearchIndex:
+    def __init__(self, manifest: dict, load_shard):
+        self.manifest = manifest
+        self.docs = manifest['docs']
+        self.stop = set(manifest['stop'])
+        self.shard_set = set(manifest['shards'])
+        self._load_shard = load_shard
+        self.shards = {}
+        self.bytes_loaded = 0
+
+    @classmethod
+    def open(cls, out_dir: Path = OUT_DIR):
+        """Read a written index from disk (manifest now, shards on demand)."""
+        manifest = json.loads((out_dir / 'manifest.json').read_text(encoding='utf-8'))
+        return cls(manifest, lambda prefix: (out_dir / f'shard-{prefix}.json').read_bytes())
+
+    @classmethod
+    def from_build(cls, manifest: dict, shards: dict):
+        """Wrap the in-memory result of search_index.build_index (shards still serialized per load)."""
+        return cls(manifest, lambda prefix: search_index._dump({'terms': shards[prefix]}).encode('utf-8'))
+
+    def shard(self, prefix: str) -> dict:
+        if prefix not in self.shards:
+            data = self._load_shard(prefix)
+            self.bytes_loaded += len(data)
+            self.shards[prefix] = json.loads(data)['terms']
+        return self.shards[prefix]
+
+    def tokenize(self, text: str):
+        return [stem(t) for t in TOKEN_RE.findall(text.lower()) if len(t) > 1 and t not in self.stop]
+
+    def shards_for(self, term: str, prefix: bool):
+        if prefix:
+            return [s for s in self.manifest['shards'] if term.startswith(s) or s.startswith(term)]
+        for n in range(self.manifest['max_prefix'], 0, -1):
+            if term[:n] in self.shard_set:
+                return [term[:n]]
+        return []
+
+    def search(self, query: str, limit: int = 20):
+        """[(rel path, score)] best first - the same ranking universal-search.js shows."""
+        words = TOKEN_RE.findall(query.lower())
+        terms = self.tokenize(query)
+        if not terms:
+            return []
+
+        # the word being typed matches as a prefix, finished words exactly
+        partial = words[-1]
+        prefix_term = stem(partial) if len(partial) > 1 and partial not in self.stop else None
+        exact = terms[:-1] if prefix_term else terms
+
+        wanted = []
+        for t in exact:
+            wanted += self.shards_for(t, False)
+        if prefix_term:
+            wanted += self.shards_for(prefix_term, True)
+        lookup = {}
+        for prefix in dict.fromkeys(wanted):
+            lookup.update(self.shard(prefix))
+
+        groups = [[lookup[t]] if t in lookup else [] for t in exact]
+        if prefix_term:
+            groups.append([p for t, p in lookup.items() if t.startswith(prefix_term)])
+
+        k1, b = self.manifest['bm25']['k1'], self.manifest['bm25']['b']
+        n_docs = len(self.docs)
+        avg_len = self.manifest['avg_len'] or 1
+        scores = {}
+        matched = {}
+        for lists in groups:
+            best = {}
+            for postings in lists:
+                df = len(postings) / 2
+                idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+                doc = 0
+                for i in range(0, len(postings), 2):
+                    doc += postings[i]
+                    tf = postings[i + 1]
+                    length = self.docs[doc][4]
+                    score = idf * (tf * (k1 + 1)) / (tf + k1 * (1 - b + b * length / avg_len))
+                    if score > best.get(doc, 0):
+                        best[doc] = score
+            for doc, score in best.items():
+                scores[doc] = scores.get(doc, 0) + score
+                matched[doc] = matched.get(doc, 0) + 1
+
+        # pages matching every query term rank first; ties keep doc order (stable sort, as in JS)
+        ranked = sorted(((doc, score * matched[doc] / len(groups)) for doc, score in scores.items()),
+                        key=lambda item: -item[1])
+        return [(self.docs[doc][0], score) for doc, score in ranked[:limit]]
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser(description='Query the front-end search index.')
+    ap.add_argument('query')
+    ap.add_argument('--limit', type=int, default=10)
+    args = ap.parse_args()
+    index = SearchIndex.open()
+    for rel, score in index.search(args.query, args.limit):
+        print(f'{score:7.3f}  {rel}')
+    print(f'({len(index.shards)} shard(s), {index.bytes_loaded} bytes loaded)')
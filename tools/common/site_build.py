@@ -0,0 +1,434 @@
+#!/usr/bin/env python3
+"""
+Site Build
+- Copies the site into an output folder (default dist/) ready to deploy
+- Minifies HTML / CSS / JS (minify.py)
+- Fingerprints CSS, JS, images and fonts: name.<hash>.ext, where the hash is
+  taken after the file's own references were rewritten, so a changed image
+  also changes the stylesheet that points at it
+- Rewrites every reference the HTML parser (site_model) and the asset graph
+  found: tags, srcset, inline style url(), CSS url()/@import, JS imports
+- Assets that scripts mention as plain strings keep their names (the string
+  may be built or used in ways a rewrite can't see)
+- Images shown with <img> get resized variants + srcset/sizes
+  (image_pipeline.py; needs Pillow, otherwise copied as-is)
+- Above-the-fold rules of linked stylesheets are inlined and the sheets
+  load without blocking render (critical_css.py)
+- Incremental (per-file source hash + reference map) and parallel (process
+  pool, one dependency level at a time)
+- Safe output folder: never the project root (or above it) or inside a site
+  folder, and an existing non-empty folder must hold a previous build's
+  manifest; only files an earlier build wrote there are ever deleted
+Output: <out>/... + <out>/asset-manifest.json   State: tools/.cache/build-state.json
+Report: tools/site_manager/critical-css-report.json (bytes saved per page)
+
+Used by: python tools/site_manager/site_manager.py build [--out DIR] [--jobs N] [--force] [--no-critical]
+"""
+import os
+import re
+import json
+import time
+import shutil
+import hashlib
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+import site_model
+import asset_graph
+import minify
+import image_pipeline
+import critical_css
+from site_model import FileIndex
+
+# project root: two levels up from tools/common/site_build.py
+ROOT = Path(__file__).resolve().parents[2]
+OUT = ROOT / 'dist'
+STATE = ROOT / 'tools' / '.cache' / 'build-state.json'
+MANIFEST_NAME = 'asset-manifest.json'
+CRITICAL_REPORT = ROOT / 'tools' / 'site_manager' / 'critical-css-report.json'
+BUILD_VERSION = 2
+
+FINGERPRINT_EXTS = ('.css', '.js', '.mjs', '.png', '.jpg', '.jpeg', '.gif', '.svg', '.webp', '.avif',
+                    '.ico', '.woff', '.woff2', '.ttf', '.otf')
+EXCLUDE_EXTS = ('.py', '.pyc', '.bat', '.md', '.jsonl')
+HASH_CHARS = 10
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:HASH_CHARS]
+
+
+def fingerprinted(rel: str, digest: str) -> str:
+    stem, dot, ext = rel.rpartition('.')
+    return f'{stem}.{digest}.{ext}'
+
+
+def relative_url(from_rel: str, to_rel: str) -> str:
+    base = asset_graph.posix_dirname(from_rel) or '.'
+    return os.path.relpath(to_rel, base).replace(os.sep, '/')
+
+
+def rewrite_ref(ref: str, from_rel: str, target_out: str) -> str:
+    """ref with its path swapped for target_out (relative or root-absolute like the original)."""
+    path, tail = re.match(r'([^?#]*)(.*)', ref, re.S).groups()
+    new = '/' + target_out if path.startswith('/') else relative_url(from_rel, target_out)
+    return new + tail
+
+
+def replace_refs(text: str, mapping: dict) -> str:
+    """Replace each ref string where it stands alone as an attribute value / url() / import specifier."""
+    if not mapping:
+        return text
+    alternation = '|'.join(re.escape(r) for r in sorted(mapping, key=len, reverse=True))
+    pattern = re.compile(r'''(?<=["'(\s,=])(''' + alternation + r''')(?=["')\s,>])''')
+    return pattern.sub(lambda m: mapping[m.group(1)], text)
+
+
+# -----------------------------------------------------------------------------
+# WORKER
+# -----------------------------------------------------------------------------
+
+def build_file(task: dict) -> dict:
+    """Produce one output file. Runs in a worker process; returns its output name + hash."""
+    src = Path(task['src'])
+    data = src.read_bytes()
+    kind = task['kind']
+    critical = None
+    if kind in ('html', 'css', 'js'):
+        try:
+            text = data.decode('utf-8')
+        except UnicodeDecodeError:
+            text = None  # e.g. UTF-16 sources: copied byte for byte
+        if text is not None:
+            if kind == 'html':
+                text = image_pipeline.inject_srcset(text, task['srcset'])
+            text = replace_refs(text, task['mapping'])
+            if kind == 'html' and task['critical']:
+                out_dir = Path(task['out_dir'])
+                sheets = {href: ((out_dir / out_rel).read_text(encoding='utf-8'), out_rel)
+                          for href, (out_rel, _) in task['critical'].items()}
+                text, critical = critical_css.inline_critical(text, task['rel'], sheets)
+            if task['minify']:
+                text = {'html': minify.minify_html, 'css': minify.minify_css, 'js': minify.minify_js}[kind](text)
+            data = text.encode('utf-8')
+    digest = content_hash(data)
+    out_rel = fingerprinted(task['rel'], digest) if task['fingerprint'] else task['rel']
+    dest = Path(task['out_dir']) / out_rel
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dest.with_name(dest.name + '.tmp')
+    tmp.write_bytes(data)
+    os.replace(tmp, dest)
+    return {'rel': task['rel'], 'out': out_rel, 'hash': digest, 'bytes_in': src.stat().st_size,
+            'bytes_out': len(data), 'critical': critical}
+
+
+# -----------------------------------------------------------------------------
+# PLANNING
+# -----------------------------------------------------------------------------
+
+def file_kind(rel: str) -> str:
+    low = rel.lower()
+    if low.endswith(('.html', '.htm')):
+        return 'html'
+    if low.endswith(asset_graph.CSS_EXTS):
+        return 'css'
+    if low.endswith(asset_graph.JS_EXTS):
+        return 'js'
+    return 'copy'
+
+
+def site_files(index: FileIndex, out_dir: Path):
+    out_rel = None
+    try:
+        out_rel = out_dir.resolve().relative_to(index.root.resolve()).as_posix()
+    except ValueError:
+        pass
+    for rel in sorted(index.files):
+        parts = rel.split('/')
+        if any(p in site_model.SKIP_DIRS or p.startswith('.') for p in parts):
+            continue
+        if out_rel and (rel == out_rel or rel.startswith(out_rel + '/')):
+            continue
+        if rel.lower().endswith(EXCLUDE_EXTS):
+            continue
+        yield rel
+
+
+def plan_build(index: FileIndex, out_dir: Path):
+    """(files, deps, refs, pinned, pages): what to build, the rewritable local references of each
+    file, the files that must keep their names and, per page, its resizable <img> refs ('images')
+    and local stylesheet links ('sheets') as [(ref, target)]."""
+    site = site_model.load_site(site_model.collect_html_files(index))
+    graph = asset_graph.build_graph(index, site)
+    files = list(site_files(index, out_dir))
+    present = set(files)
+
+    refs = {}
+    pinned = set()
+    pages = {}
+    for rel in files:
+        kind = file_kind(rel)
+        if kind == 'html':
+            raw = graph.pages.get(rel, ())
+            # <a href> may point straight at an asset (PDF, image); links are never rewritten
+            pinned.update(t for t in (asset_graph.resolve_ref(rel, h) for h, _ in site[rel]['links']) if t)
+            assets = [(ref, tag, asset_graph.resolve_ref(rel, ref)) for ref, tag in site[rel]['assets']]
+            pages[rel] = {
+                'images': [(r, t) for r, tag, t in assets
+                           if tag == 'img' and t in present and image_pipeline.is_image(t)],
+                'sheets': [(r, t) for r, tag, t in assets
+                           if tag == 'link' and t in present and file_kind(t) == 'css'],
+            }
+        elif kind in ('css', 'js'):
+            raw = graph.refs.get(rel, ())
+        else:
+            continue
+        own = []
+        for ref, how in raw:
+            target = asset_graph.resolve_ref(rel, ref)
+            if how == 'string':
+                # plain strings in inline scripts: the page may build on them at runtime
+                if kind == 'html' and target:
+                    pinned.add(target)
+                continue
+            if target in present and target != rel:
+                own.append((ref, target))
+        refs[rel] = own
+
+    # strings inside script files resolve against every page that loads the script
+    for page in graph.pages:
+        for asset in graph.page_assets(page):
+            if file_kind(asset) != 'js':
+                continue
+            for ref, how in graph.refs.get(asset, ()):
+                target = asset_graph.resolve_ref(page, ref) if how == 'string' else None
+                if target:
+                    pinned.add(target)
+
+    deps = {rel: {t for _, t in refs.get(rel, ())} for rel in files}
+    return files, deps, refs, pinned, pages
+
+
+def levels(files, deps):
+    """[(group, in_cycle)] so every file's dependencies sit in an earlier group. Files caught in
+    a reference cycle are built together last and keep their names (nothing to point them at)."""
+    remaining = set(files)
+    done = set()
+    groups = []
+    while remaining:
+        ready = sorted(f for f in remaining if deps[f] <= done)
+        cycle = not ready
+        if cycle:
+            ready = sorted(remaining)
+        groups.append((ready, cycle))
+        done.update(ready)
+        remaining.difference_update(ready)
+    return groups
+
+
+def image_stage(pages: dict, out_dir: Path, pool, log) -> dict:
+    """Resize every <img> image (cached) and place the variants in out_dir.
+    Returns {image rel: {'width': original width, 'variants': [(width, output rel)]}}."""
+    rels = sorted({t for page in pages.values() for _, t in page['images']})
+    if not rels:
+        return {}
+    if not image_pipeline.available():
+        log(f'Images: Pillow not installed, {len(rels)} image(s) copied at full size (pip install Pillow)')
+        return {}
+    metas = image_pipeline.process(rels, ROOT, pool)
+    placed = {}
+    for rel, meta in metas.items():
+        out = []
+        for width, v in meta['variants'].items():
+            out_rel = fingerprinted(image_pipeline.variant_rel(rel, int(width)), v['hash'][:HASH_CHARS])
+            dest = out_dir / out_rel
+            if not dest.is_file():
+                dest.parent.mkdir(parents=True, exist_ok=True)
+                tmp = dest.with_name(dest.name + '.tmp')
+                shutil.copyfile(image_pipeline.CACHE_DIR / v['file'], tmp)
+                os.replace(tmp, dest)
+            out.append((int(width), out_rel))
+        placed[rel] = {'width': meta['width'], 'variants': out}
+    rendered = sum(1 for m in metas.values() if not m['cached'])
+    log(f"Images: {len(metas)} shown with <img>, {sum(len(p['variants']) for p in placed.values())} "
+        f"variant(s), {rendered} resized, {len(metas) - rendered} from cache")
+    return placed
+
+
+def page_srcsets(rel: str, shown, placed: dict, outputs: dict) -> dict:
+    """{img src as written in the page: srcset value} for the page's resized images."""
+    srcsets = {}
+    for src, target in shown:
+        info = placed.get(target)
+        if not info or not info['variants']:
+            continue
+        candidates = [(rewrite_ref(src, rel, out), w) for w, out in info['variants']]
+        candidates.append((rewrite_ref(src, rel, outputs.get(target, target)), info['width']))
+        srcsets[src] = image_pipeline.srcset_value(candidates)
+    return srcsets
+
+
+def page_sheets(shown, mapping: dict, outputs: dict, state: dict) -> dict:
+    """{stylesheet href as it reads after rewriting: [output rel, output hash]} for critical CSS."""
+    return {mapping.get(ref, ref): [outputs[target], state[target]['hash']]
+            for ref, target in shown if target in outputs}
+
+
+def write_critical_report(state: dict, log):
+    pages = {rel: e['critical'] for rel, e in sorted(state.items()) if e.get('critical', {}).get('blocking')}
+    totals = {k: sum(p[k] for p in pages.values()) for k in ('blocking', 'inlined', 'saved')}
+    totals['pages'] = len(pages)
+    totals['deferred'] = sum(p['deferred'] for p in pages.values())
+    CRITICAL_REPORT.write_text(json.dumps({'totals': totals, 'pages': pages}, indent=2) + '\n', encoding='utf-8')
+    if pages:
+        log(f"Critical CSS: {totals['deferred']} stylesheet link(s) deferred on {len(pages)} page(s), "
+            f"{totals['inlined'] / 1024:.0f} KB inlined, {totals['saved'] / 1024:.0f} KB less render-blocking CSS")
+
+
+# -----------------------------------------------------------------------------
+# STATE
+# -----------------------------------------------------------------------------
+
+def _settings(minify_on: bool, critical_on: bool) -> dict:
+    return {'version': BUILD_VERSION, 'minify': minify_on, 'critical': critical_on, 'hash_chars': HASH_CHARS,
+            'fold': critical_css.FOLD_ELEMENTS}
+
+
+def load_state(out_dir: Path, minify_on: bool, critical_on: bool) -> dict:
+    try:
+        data = json.loads(STATE.read_text(encoding='utf-8'))
+    except Exception:
+        return {}
+    if data.get('settings') != _settings(minify_on, critical_on) or data.get('out_dir') != str(out_dir):
+        return {}
+    return data.get('files', {})
+
+
+def previous_outputs(out_dir: Path) -> set:
+    """Every file the last build wrote into out_dir (kept whatever the settings were), for pruning."""
+    try:
+        data = json.loads(STATE.read_text(encoding='utf-8'))
+    except Exception:
+        return set()
+    return set(data.get('outputs', ())) if data.get('out_dir') == str(out_dir) else set()
+
+
+def save_state(files: dict, out_dir: Path, minify_on: bool, critical_on: bool, outputs=()):
+    STATE.parent.mkdir(parents=True, exist_ok=True)
+    tmp = STATE.with_suffix('.tmp')
+    data = {'settings': _settings(minify_on, critical_on), 'out_dir': str(out_dir), 'files': files,
+            'outputs': sorted(outputs)}
+    tmp.write_text(json.dumps(data, separators=(',', ':')), encoding='utf-8')
+    os.replace(tmp, STATE)
+
+
+# -----------------------------------------------------------------------------
+# BUILD
+# -----------------------------------------------------------------------------
+
+def check_out_dir(out_dir: Path):
+    """Raise ValueError for an output folder a build (and its pruning) must not touch."""
+    root = ROOT.resolve()
+    if out_dir == root or out_dir in root.parents:
+        raise ValueError(f'output folder {out_dir} is the project root or contains it')
+    try:
+        parts = out_dir.relative_to(root).parts
+    except ValueError:
+        parts = ()
+    if len(parts) > 1 and parts[0] not in site_model.SKIP_DIRS and not parts[0].startswith('.'):
+        raise ValueError(f'output folder {out_dir} is inside the site folder {parts[0]}/')
+    if out_dir.is_dir() and any(out_dir.iterdir()) and not (out_dir / MANIFEST_NAME).is_file():
+        raise ValueError(f'output folder {out_dir} is not empty and holds no {MANIFEST_NAME} from an earlier build')
+
+
+def build_site(out_dir: Path = OUT, jobs: int = 0, force: bool = False, minify_on: bool = True,
+               critical_on: bool = True, log=print) -> dict:
+    t0 = time.perf_counter()
+    out_dir = Path(out_dir).resolve()
+    check_out_dir(out_dir)
+    jobs = jobs or os.cpu_count() or 1
+    index = FileIndex(ROOT)
+    files, deps, refs, pinned, pages = plan_build(index, out_dir)
+    previous = {} if force else load_state(out_dir, minify_on, critical_on)
+
+    state = {}
+    outputs = {}   # rel -> output rel
+    built = 0
+    pool = ProcessPoolExecutor(max_workers=jobs) if jobs > 1 else None
+    try:
+        placed = image_stage(pages, out_dir, pool, log)
+        for group, in_cycle in levels(files, deps):
+            tasks = []
+            for rel in group:
+                src = ROOT / rel
+                st = src.stat()
+                kind = file_kind(rel)
+                mapping = {}
+                for ref, target in refs.get(rel, ()):
+                    if target in outputs and outputs[target] != target:
+                        mapping[ref] = rewrite_ref(ref, rel, outputs[target])
+                page = pages.get(rel, {})
+                srcset = page_srcsets(rel, page.get('images', ()), placed, outputs)
+                critical = page_sheets(page.get('sheets', ()), mapping, outputs, state) if critical_on else {}
+                fingerprint = rel.lower().endswith(FINGERPRINT_EXTS) and rel not in pinned and not in_cycle
+                key = {'mtime_ns': st.st_mtime_ns, 'size': st.st_size, 'mapping': mapping,
+                       'srcset': srcset, 'critical_css': critical, 'fingerprint': fingerprint}
+                prev = previous.get(rel)
+                if prev and all(prev.get(k) == v for k, v in key.items()) and (out_dir / prev['out']).is_file():
+                    state[rel] = prev
+                    outputs[rel] = prev['out']
+                    continue
+                tasks.append({'src': str(src), 'rel': rel, 'kind': kind, 'mapping': mapping, 'srcset': srcset,
+                              'critical': critical,
+                              'fingerprint': fingerprint, 'minify': minify_on, 'out_dir': str(out_dir),
+                              '_key': key})
+            payload = [{k: v for k, v in t.items() if k != '_key'} for t in tasks]
+            results = pool.map(build_file, payload, chunksize=8) if pool else map(build_file, payload)
+            for task, res in zip(tasks, results):
+                state[task['rel']] = dict(task['_key'], out=res['out'], hash=res['hash'],
+                                          bytes_in=res['bytes_in'], bytes_out=res['bytes_out'])
+                if res['critical']:
+                    state[task['rel']]['critical'] = res['critical']
+                outputs[task['rel']] = res['out']
+                built += 1
+    finally:
+        if pool:
+            pool.shutdown()
+
+    for rel, info in placed.items():
+        outputs.update((image_pipeline.variant_rel(rel, w), out) for w, out in info['variants'])
+    manifest = {rel: out for rel, out in sorted(outputs.items()) if out != rel}
+    (out_dir / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2) + '\n', encoding='utf-8')
+    written = set(outputs.values()) | {MANIFEST_NAME}
+    removed = prune(out_dir, previous_outputs(out_dir) - written)
+    save_state(state, out_dir, minify_on, critical_on, written)
+    if critical_on:
+        write_critical_report(state, log)
+
+    bytes_in = sum(e['bytes_in'] for e in state.values())
+    bytes_out = sum(e['bytes_out'] for e in state.values())
+    stats = {'out_dir': out_dir, 'files': len(state), 'built': built, 'skipped': len(state) - built,
+             'fingerprinted': len(manifest), 'removed': removed, 'bytes_in': bytes_in,
+             'bytes_out': bytes_out, 'seconds': time.perf_counter() - t0, 'jobs': jobs}
+    log(f"Built {built} of {len(state)} files ({stats['skipped']} unchanged, {removed} stale removed), "
+        f"{len(manifest)} fingerprinted, {bytes_in / 1024:.0f} KB -> {bytes_out / 1024:.0f} KB "
+        f"in {stats['seconds']:.2f}s with {jobs} job(s)")
+    return stats
+
+
+def prune(out_dir: Path, stale: set) -> int:
+    """Delete outputs of earlier builds (rels from the build state) that this build no longer produces."""
+    removed = 0
+    for rel in sorted(stale):
+        if rel.startswith('/') or '..' in rel.split('/'):
+            continue
+        path = out_dir / rel
+        if path.is_file():
+            path.unlink()
+            removed += 1
+        # drop folders the deletion left empty, never out_dir itself
+        parent = path.parent
+        while parent != out_dir and parent.is_dir() and not any(parent.iterdir()):
+            parent.rmdir()
+            parent = parent.parent
+    return removed
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Site Content (the universal-search "siteContent" dataset)
+- One entry per listed page: the home page, each top-level section
+  (<folder>/index.html) and every projects/<name>/ and games/projects/<name>/
+- Title: <meta name="search-title">, else the folder name
+  (git-account-info -> "Git Account Info")
+- Description: <meta name="description">, else the start of the page text
+- Keywords: <meta name="keywords"> plus the words of the page's folder name.
+  No terms are mined from the page text: universal-search.js substring-matches
+  keywords, so generic words would match short queries everywhere; the
+  full-text index already covers the page text
+- Breadcrumb path and type follow the folder: Home › Games › 2048, 'games'
+- Written next to the search index as one compact payload
+  {"fields": [...], "items": [[...], ...]} that universal-search.js fetches
+  the first time the search box gets focus
+Output: assets/search/content.json
+
+Used by search_index.update_index (Site Manager "Build Index", watcher rebuilds).
+"""
+import re
+import json
+
+CONTENT_NAME = 'content.json'
+CONTENT_VERSION = 2   # bump when an item's contents change; part of the search index settings
+FIELDS = ['title', 'path', 'url', 'type', 'description', 'keywords']
+LISTED_RE = re.compile(r'index\.html|[^/]+/index\.html|(?:projects|games/projects)/[^/]+/index\.html')
+
+
+def is_listed(rel: str) -> bool:
+    return bool(LISTED_RE.fullmatch(rel)) and not rel.startswith(('tools/', 'assets/'))
+
+
+def folder_title(slug: str) -> str:
+    return ' '.join(w[:1].upper() + w[1:] for w in re.split(r'[-_\s]+', slug) if w)
+
+
+def content_item(rel: str, record: dict, doc: list):
+    """[title, path, url, type, description, keywords] for a listed page, else None.
+
+    doc: the page's search_index doc entry [rel, title, type, snippet, length]; its type and
+    snippet are reused, so the two datasets can't disagree (and this module needn't import the index).
+    """
+    if not is_listed(rel):
+        return None
+    folders = rel.split('/')[:-1]
+    title = record.get('search_title') or (folder_title(folders[-1]) if folders else 'Home')
+    path = ['Home']
+    if folders:
+        path.append(folder_title(folders[0]))
+    if len(folders) > 1:
+        path.append(title)
+    url = '/'.join(folders) + '/' if folders else ''
+    kind = 'pages' if len(folders) <= 1 else doc[2]
+    description = doc[3]
+
+    keywords = list(record.get('keywords') or ())
+    seen = {k.lower() for k in keywords}
+    for word in (w.lower() for f in folders[-1:] for w in re.split(r'[-_\s]+', f) if w):
+        if word not in seen:
+            seen.add(word)
+            keywords.append(word)
+    return [title, ' › '.join(path), url, kind, description, keywords]
+
+
+def _order(item):
+    # projects and games first, then sections, home last (the order results are shown in)
+    title, _, url, kind, _, _ = item
+    return (kind == 'pages', url == '', title.lower())
+
+
+def assemble(items) -> dict:
+    return {'version': 1, 'fields': FIELDS, 'items': sorted((i for i in items if i), key=_order)}
+
+
+def dump(payload: dict) -> str:
+    return json.dumps(payload, ensure_ascii=False, separators=(',', ':'))
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Site Model
+- Shared single-pass parse of every HTML page in the workspace
+- Each page becomes one compact record: links, assets, ids, title, headings,
+  meta description / keywords / search-title, visible body text, plus every
+  other sub-resource ref
+  (srcset, poster, inline CSS url()/@import, inline module imports and asset
+  paths in inline scripts)
+- Records are cached on disk keyed by path + mtime + size, so a page is only
+  re-parsed when it changes
+- FileIndex: one walk of the tree into sets of paths, so "does this target
+  exist?" is a set lookup instead of a stat call per reference
+Cache: tools/.cache/site-model.json
+
+Used by link_checker, asset_usage_scanner and site_manager.build_search_index.
+Run directly to warm the cache: python tools/common/site_model.py
+"""
+import os
+import re
+import json
+from pathlib import Path
+from html.parser import HTMLParser
+
+# project root: two levels up from tools/common/site_model.py
+ROOT = Path(__file__).resolve().parents[2]
+CACHE_DIR = ROOT / 'tools' / '.cache'
+CACHE = CACHE_DIR / 'site-model.json'
+SKIP_DIRS = {'.venv', 'venv', 'node_modules', '.git', 'tools', 'dist'}
+# never walked by FileIndex (huge or not site content); lookups under them fall back to a stat
+INDEX_SKIP_DIRS = {'.git', '.venv', 'venv', 'node_modules', '__pycache__'}
+
+# bump when the record layout changes so stale caches are discarded
+CACHE_VERSION = 4
+
+HEADING_TAGS = ('h1', 'h2', 'h3')
+
+# sub-resources outside the classic img/script/link trio: (tag, attribute)
+RESOURCE_ATTRS = {
+    ('source', 'src'), ('audio', 'src'), ('video', 'src'), ('track', 'src'),
+    ('embed', 'src'), ('iframe', 'src'), ('input', 'src'), ('video', 'poster'),
+    ('object', 'data'),
+}
+SRCSET_TAGS = ('img', 'source')
+# content of these never shows up as page text
+NON_TEXT_TAGS = ('script', 'style', 'noscript', 'template', 'svg')
+
+# static file types that count as assets when they appear as string literals in JS
+ASSET_EXTS = ('.js', '.mjs', '.css', '.png', '.jpg', '.jpeg', '.gif', '.svg', '.webp',
+              '.avif', '.ico', '.json', '.woff', '.woff2', '.ttf', '.mp3', '.wav', '.mp4', '.pdf')
+
+CSS_COMMENT_RE = re.compile(r'/\*.*?\*/', re.DOTALL)
+CSS_URL_RE = re.compile(r'url\(\s*([\'"]?)(.*?)\1\s*\)', re.IGNORECASE | re.DOTALL)
+CSS_IMPORT_RE = re.compile(r'@import\s+([\'"])(.*?)\1', re.IGNORECASE)
+JS_IMPORT_RE = re.compile(
+    r'(?:\bimport\s*(?:[\w*{}\s,$]+\s*from\s*)?|\bexport\s*[\w*{}\s,$]+\s*from\s*|\bimport\s*\(\s*)'
+    r'([\'"])([^\'"\n]+)\1')
+JS_STRING_RE = re.compile(
+    r'([\'"`])([^\'"`\s<>()]+?(?:' + '|'.join(re.escape(e) for e in ASSET_EXTS) + r'))(?:[?#][^\'"`\s]*)?\1',
+    re.IGNORECASE)
+
+
+def css_refs(text: str):
+    """[(ref, kind)] for url() and @import in a stylesheet / style attribute."""
+    text = CSS_COMMENT_RE.sub('', text)
+    refs = [(m.group(2), 'css-import') for m in CSS_IMPORT_RE.finditer(text)]
+    refs += [(m.group(2).strip(), 'css-url') for m in CSS_URL_RE.finditer(text)]
+    return [(r, k) for r, k in refs if r]
+
+
+def js_refs(text: str):
+    """[(ref, kind)] for ES module imports ('import') and asset-looking string literals ('string')."""
+    refs = [(m.group(2), 'import') for m in JS_IMPORT_RE.finditer(text)]
+    imported = {r for r, _ in refs}
+    refs += [(m.group(2), 'string') for m in JS_STRING_RE.finditer(text) if m.group(2) not in imported]
+    return refs
+
+
+def srcset_refs(value: str):
+    # "a.png 1x, b.png 2x" -> ["a.png", "b.png"]
+    return [c.strip().split()[0] for c in value.split(',') if c.strip()]
+
+
+class PageParser(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.links = []     # (href, tag)
+        self.assets = []    # (src_or_href, tag)
+        self.ids = set()
+        self.title = None
+        self.headings = []
+        self.resources = []  # (ref, kind) sub-resources not covered by assets
+        self.description = None
+        self.keywords = []
+        self.search_title = None
+        self.text_parts = []
+        self._in_body = False
+        self._skip_depth = 0  # >0 while inside script/style/... (no visible text)
+        self._raw_tag = None  # 'style' / 'script' while inside an inline block
+        self._raw_parts = []
+        self._title_parts = None
+        self._heading_parts = None
+        self._heading_tag = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        # collect element ids for anchor checks
+        if attrs.get('id') is not None:
+            self.ids.add(attrs['id'])
+
+        # links
+        if tag == 'a':
+            href = attrs.get('href')
+            if href:
+                self.links.append((href, tag))
+
+        # assets: img/src, script/src, link/href (CSS)
+        if tag in ('img', 'script'):
+            src = attrs.get('src')
+            if src:
+                self.assets.append((src, tag))
+        elif tag == 'link':
+            href = attrs.get('href')
+            if href:
+                self.assets.append((href, tag))
+
+        # visible text bookkeeping
+        if tag == 'body':
+            self._in_body = True
+        elif tag in NON_TEXT_TAGS:
+            self._skip_depth += 1
+        if tag == 'meta':
+            name = (attrs.get('name') or '').lower()
+            content = ' '.join((attrs.get('content') or '').split())
+            if name == 'description' and self.description is None:
+                self.description = content or None
+            elif name == 'keywords' and not self.keywords:
+                self.keywords = [k.strip() for k in content.split(',') if k.strip()]
+            elif name == 'search-title' and self.search_title is None:
+                self.search_title = content or None  # label for the search dataset (site_content.py)
+
+        # everything else a browser would fetch for this page
+        for name, value in attrs.items():
+            if value and (tag, name) in RESOURCE_ATTRS:
+                self.resources.append((value, name))
+        if tag in SRCSET_TAGS and attrs.get('srcset'):
+            self.resources.extend((r, 'srcset') for r in srcset_refs(attrs['srcset']))
+        if attrs.get('style'):
+            self.resources.extend(css_refs(attrs['style']))
+        if tag == 'style' or (tag == 'script' and not attrs.get('src')):
+            self._raw_tag = tag
+            self._raw_parts = []
+
+        # text capture for <title> and h1-h3
+        if tag == 'title' and self.title is None:
+            self._title_parts = []
+        elif tag in HEADING_TAGS and self._heading_tag is None:
+            self._heading_tag = tag
+            self._heading_parts = []
+
+    def handle_endtag(self, tag):
+        if tag in NON_TEXT_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+        if tag == self._raw_tag:
+            text = ''.join(self._raw_parts)
+            self.resources.extend(css_refs(text) if tag == 'style' else js_refs(text))
+            self._raw_tag = None
+            self._raw_parts = []
+        if tag == 'title' and self._title_parts is not None:
+            self.title = ' '.join(''.join(self._title_parts).split())
+            self._title_parts = None
+        elif tag == self._heading_tag:
+            text = ' '.join(''.join(self._heading_parts).split())
+            if text:
+                self.headings.append(text)
+            self._heading_tag = None
+            self._heading_parts = None
+
+    def handle_data(self, data):
+        if self._raw_tag is not None:
+            self._raw_parts.append(data)
+        elif self._in_body and not self._skip_depth:
+            self.text_parts.append(data)
+        if self._title_parts is not None:
+            self._title_parts.append(data)
+        if self._heading_parts is not None:
+            self._heading_parts.append(data)
+
+
+class FileIndex:
+    """Snapshot of every file and directory under root as POSIX paths relative to root."""
+
+    def __init__(self, root: Path = None):
+        self.root = Path(root or ROOT)
+        self._prefix = str(self.root) + os.sep
+        self.files = set()
+        self.dirs = {'.'}
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            dirnames[:] = [d for d in dirnames if d not in INDEX_SKIP_DIRS]
+            rel_dir = os.path.relpath(dirpath, self.root).replace(os.sep, '/')
+            base = '' if rel_dir == '.' else rel_dir + '/'
+            for d in dirnames:
+                self.dirs.add(base + d)
+            for name in filenames:
+                self.files.add(base + name)
+
+    def relpath(self, path) -> str:
+        """POSIX path relative to root, or None when path is outside root (pure string op)."""
+        s = str(path)
+        if s == str(self.root):
+            return '.'
+        if not s.startswith(self._prefix):
+            return None
+        return s[len(self._prefix):].replace(os.sep, '/')
+
+    def exists(self, path) -> bool:
+        # path must be absolute and normalized (see link_checker.resolve_path)
+        rel = self.relpath(path)
+        if rel is None or any(part in INDEX_SKIP_DIRS for part in rel.split('/')):
+            return os.path.exists(path)
+        return rel in self.files or rel in self.dirs
+
+
+def collect_html_files(index: FileIndex = None):
+    """Site HTML pages (outside SKIP_DIRS), sorted by path for a stable report order."""
+    if index is not None:
+        rels = (r for r in index.files if r.endswith('.html'))
+        return [index.root / r for r in sorted(rels)
+                if not any(part in SKIP_DIRS for part in r.split('/'))]
+    files = []
+    for p in ROOT.rglob('*.html'):
+        rel_parts = p.relative_to(ROOT).parts
+        if any(part in SKIP_DIRS for part in rel_parts):
+            continue
+        files.append(p)
+    return sorted(files, key=lambda p: p.relative_to(ROOT).as_posix())
+
+
+def parse_page(html_path: Path) -> dict:
+    """Parse one HTML file into a compact, JSON-friendly record."""
+    text = html_path.read_text(encoding='utf-8', errors='ignore')
+    parser = PageParser()
+    parser.feed(text)
+    parser.close()
+    return {
+        'links': [list(l) for l in parser.links],
+        'assets': [list(a) for a in parser.assets],
+        'ids': sorted(parser.ids),
+        'title': parser.title,
+        'headings': parser.headings,
+        'description': parser.description,
+        'keywords': parser.keywords,
+        'search_title': parser.search_title,
+        'text': ' '.join(' '.join(parser.text_parts).split()),
+        'resources': [list(r) for r in parser.resources],
+    }
+
+
+def _stat_key(path: Path):
+    st = path.stat()
+    return st.st_mtime_ns, st.st_size
+
+
+def load_cache() -> dict:
+    try:
+        data = json.loads(CACHE.read_text(encoding='utf-8'))
+    except Exception:
+        return {}
+    if data.get('version') != CACHE_VERSION:
+        return {}
+    return data.get('pages', {})
+
+
+def save_cache(pages: dict):
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = CACHE.with_suffix('.tmp')
+    payload = {'version': CACHE_VERSION, 'pages': pages}
+    tmp.write_text(json.dumps(payload, separators=(',', ':')), encoding='utf-8')
+    os.replace(tmp, CACHE)
+
+
+def load_site(html_files=None, use_cache: bool = True) -> dict:
+    """Return {relative_posix_path: record} for every HTML page.
+
+    Unchanged pages (same mtime + size as the cached entry) are served from the
+    cache; everything else is parsed once and written back. Loading a subset of
+    pages leaves the other cached entries in place.
+    """
+    if html_files is None:
+        html_files = collect_html_files()
+    cached = load_cache() if use_cache else {}
+
+    pages = {}
+    dirty = False
+    for f in html_files:
+        rel = f.relative_to(ROOT).as_posix()
+        mtime_ns, size = _stat_key(f)
+        entry = cached.get(rel)
+        if entry and entry.get('mtime_ns') == mtime_ns and entry.get('size') == size:
+            pages[rel] = entry
+            continue
+        record = parse_page(f)
+        record['mtime_ns'] = mtime_ns
+        record['size'] = size
+        pages[rel] = record
+        dirty = True
+
+    if use_cache:
+        # a subset run keeps every other page's entry; only deleted files are evicted
+        merged = {rel: entry for rel, entry in cached.items() if rel in pages or (ROOT / rel).is_file()}
+        merged.update(pages)
+        if dirty or merged.keys() != cached.keys():
+            save_cache(merged)
+    return pages
+
+
+if __name__ == '__main__':
+    site = load_site()
+    print('Site model holds', len(site), 'HTML pages')
+    print('Cache written to', CACHE)
@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+Site Watcher
+- Notices created / modified / deleted HTML, CSS and JS files under ROOT
+- inotify (Linux, via ctypes) with a stat-polling fallback everywhere else
+- Bursts of saves are debounced into one batch: {relative path: kind}
+- affected_steps() maps a batch onto the incremental rebuild steps it needs
+- ReloadHub fans reload events out to live-reload (server-sent events) clients
+
+Used by site_manager's Preview tab ("Watch + Live Reload").
+Run: python tools/common/site_watcher.py   (print debounced batches)
+"""
+import os
+import sys
+import time
+import errno
+import struct
+import select
+import ctypes
+import ctypes.util
+import threading
+from pathlib import Path
+
+from site_model import SKIP_DIRS, INDEX_SKIP_DIRS
+
+# project root: two levels up from tools/common/site_watcher.py
+ROOT = Path(__file__).resolve().parents[2]
+
+WATCH_EXTS = ('.html', '.htm', '.css', '.js', '.mjs')
+IGNORE_DIRS = SKIP_DIRS | INDEX_SKIP_DIRS
+DEBOUNCE = 0.3         # seconds of quiet that close a batch
+POLL_INTERVAL = 1.0    # seconds between polling passes
+
+# inotify(7)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+EVENT_HEADER = struct.Struct('iIII')
+
+ALL_CHANGED = '*'  # batch key used when the watcher lost track (queue overflow)
+
+
+def is_watched(rel: str) -> bool:
+    parts = rel.split('/')
+    return rel.lower().endswith(WATCH_EXTS) and not any(p in IGNORE_DIRS for p in parts[:-1])
+
+
+def merge_kind(old, new):
+    """Fold two events for one path inside a batch."""
+    if old is None:
+        return new
+    if old == 'created' and new == 'modified':
+        return 'created'
+    if old == 'deleted' and new == 'created':
+        return 'modified'
+    return new
+
+
+def affected_steps(changes: dict):
+    """Incremental steps a batch needs, in run order: 'search', 'links', 'assets'."""
+    if ALL_CHANGED in changes:
+        return ['search', 'links', 'assets']
+    html = any(rel.lower().endswith(('.html', '.htm')) for rel in changes)
+    # adding/removing a stylesheet or script can make a link target appear or vanish
+    moved = any(kind != 'modified' for rel, kind in changes.items()
+                if not rel.lower().endswith(('.html', '.htm')))
+    steps = []
+    if html:
+        steps.append('search')
+    if html or moved:
+        steps.append('links')
+    steps.append('assets')
+    return steps
+
+
+def css_only(changes: dict) -> bool:
+    # stylesheets can be swapped in place; everything else needs a full reload
+    return bool(changes) and all(rel.lower().endswith('.css') and kind == 'modified'
+                                 for rel, kind in changes.items())
+
+
+class SiteWatcher:
+    """Call on_change({rel: 'created'|'modified'|'deleted'}) once per debounced burst of edits."""
+
+    def __init__(self, on_change, root: Path = ROOT, debounce: float = DEBOUNCE,
+                 interval: float = POLL_INTERVAL, backend: str = 'auto'):
+        self.root = Path(root)
+        self.on_change = on_change
+        self.debounce = debounce
+        self.interval = interval
+        self.backend = backend
+        self._pending = {}
+        self._last_event = 0.0
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._threads = []
+
+    # -- lifecycle -------------------------------------------------------------
+
+    def start(self):
+        if self.backend in ('auto', 'inotify'):
+            try:
+                source = InotifySource(self.root, self._emit)
+                self.backend = 'inotify'
+            except OSError:
+                if self.backend == 'inotify':
+                    raise
+                source = None
+        else:
+            source = None
+        if source is None:
+            source = PollingSource(self.root, self._emit, self.interval)
+            self.backend = 'polling'
+        self._source = source
+        for target in (lambda: source.run(self._stop), self._debounce_loop):
+            t = threading.Thread(target=target, daemon=True)
+            t.start()
+            self._threads.append(t)
+        return self
+
+    def stop(self):
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        for t in self._threads:
+            t.join(timeout=2)
+        self._source.close()
+
+    # -- batching --------------------------------------------------------------
+
+    def _emit(self, rel: str, kind: str):
+        if rel != ALL_CHANGED and not is_watched(rel):
+            return
+        with self._cond:
+            self._pending[rel] = merge_kind(self._pending.get(rel), kind)
+            self._last_event = time.monotonic()
+            self._cond.notify_all()
+
+    def _debounce_loop(self):
+        while not self._stop.is_set():
+            with self._cond:
+                while not self._pending and not self._stop.is_set():
+                    self._cond.wait()
+                quiet = time.monotonic() - self._last_event
+                if quiet < self.debounce:
+                    self._cond.wait(self.debounce - quiet)
+                    continue
+                batch, self._pending = self._pending, {}
+            if batch and not self._stop.is_set():
+                try:
+                    self.on_change(batch)
+                except Exception as e:  # a failing rebuild must not kill the watcher
+                    print(f'[watcher] on_change failed: {e}', file=sys.stderr)
+
+
+# -----------------------------------------------------------------------------
+# BACKENDS
+# -----------------------------------------------------------------------------
+
+def _walk_dirs(root: Path):
+    for dirpath, dirnames, _ in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d not in IGNORE_DIRS]
+        yield dirpath
+
+
+class InotifySource:
+    def __init__(self, root: Path, emit):
+        if not sys.platform.startswith('linux'):
+            raise OSError(errno.ENOSYS, 'inotify is Linux-only')
+        self.libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        self.root = root
+        self.emit = emit
+        self.wds = {}  # wd -> absolute dir path
+        for d in _walk_dirs(root):
+            self._add(d)
+
+    def _add(self, path: str):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+        if wd >= 0:
+            self.wds[wd] = path
+        elif ctypes.get_errno() == errno.ENOSPC:
+            raise OSError(errno.ENOSPC, 'inotify watch limit reached (fs.inotify.max_user_watches)')
+
+    def _rel(self, path: str) -> str:
+        return os.path.relpath(path, self.root).replace(os.sep, '/')
+
+    def run(self, stop: threading.Event):
+        while not stop.is_set():
+            ready, _, _ = select.select([self.fd], [], [], 0.5)
+            if not ready:
+                continue
+            data = os.read(self.fd, 64 * 1024)
+            offset = 0
+            while offset < len(data):
+                wd, mask, _cookie, length = EVENT_HEADER.unpack_from(data, offset)
+                offset += EVENT_HEADER.size
+                name = data[offset:offset + length].rstrip(b'\0').decode('utf-8', 'surrogateescape')
+                offset += length
+                self._handle(wd, mask, name)
+
+    def _handle(self, wd: int, mask: int, name: str):
+        if mask & IN_Q_OVERFLOW:
+            self.emit(ALL_CHANGED, 'modified')
+            return
+        if mask & IN_IGNORED:
+            self.wds.pop(wd, None)
+            return
+        parent = self.wds.get(wd)
+        if parent is None or not name:
+            return
+        path = os.path.join(parent, name)
+        if mask & IN_ISDIR:
+            if mask & (IN_CREATE | IN_MOVED_TO) and name not in IGNORE_DIRS:
+                # new folder (e.g. a scaffolded project): watch it and report what's already inside
+                for d in _walk_dirs(Path(path)):
+                    self._add(d)
+                    for f in os.listdir(d):
+                        self.emit(self._rel(os.path.join(d, f)), 'created')
+            elif mask & (IN_DELETE | IN_MOVED_FROM):
+                self.emit(ALL_CHANGED, 'modified')
+            return
+        if mask & (IN_CREATE | IN_MOVED_TO):
+            self.emit(self._rel(path), 'created')
+        elif mask & (IN_DELETE | IN_MOVED_FROM):
+            self.emit(self._rel(path), 'deleted')
+        elif mask & (IN_MODIFY | IN_CLOSE_WRITE):
+            self.emit(self._rel(path), 'modified')
+
+    def close(self):
+        try:
+            os.close(self.fd)
+        except OSError:
+            pass
+
+
+class PollingSource:
+    def __init__(self, root: Path, emit, interval: float):
+        self.root = root
+        self.emit = emit
+        self.interval = interval
+        self.snapshot = self._scan()
+
+    def _scan(self) -> dict:
+        snap = {}
+        for dirpath in _walk_dirs(self.root):
+            for f in os.listdir(dirpath):
+                if not f.lower().endswith(WATCH_EXTS):
+                    continue
+                full = os.path.join(dirpath, f)
+                try:
+                    st = os.stat(full)
+                except OSError:
+                    continue
+                snap[os.path.relpath(full, self.root).replace(os.sep, '/')] = (st.st_mtime_ns, st.st_size)
+        return snap
+
+    def run(self, stop: threading.Event):
+        while not stop.wait(self.interval):
+            current = self._scan()
+            for rel, key in current.items():
+                old = self.snapshot.get(rel)
+                if old is None:
+                    self.emit(rel, 'created')
+                elif old != key:
+                    self.emit(rel, 'modified')
+            for rel in self.snapshot.keys() - current.keys():
+                self.emit(rel, 'deleted')
+            self.snapshot = current
+
+    def close(self):
+        pass
+
+
+# -----------------------------------------------------------------------------
+# LIVE RELOAD
+# -----------------------------------------------------------------------------
+
+LIVE_RELOAD_PATH = '/__livereload'
+LIVE_RELOAD_SNIPPET = (
+    '<script>/* injected by the Site Manager preview server */(function(){'
+    "if(!window.EventSource)return;var es=new EventSource('" + LIVE_RELOAD_PATH + "');"
+    "es.addEventListener('reload',function(e){var d=JSON.parse(e.data||'{}');"
+    "if(d.css_only){document.querySelectorAll('link[rel=\"stylesheet\"]').forEach(function(l){"
+    "var u=new URL(l.href);u.searchParams.set('livereload',Date.now());l.href=u.href;});}"
+    'else{location.reload();}});})();</script>'
+)
+
+
+class ReloadHub:
+    """Thread-safe fan-out of reload events; subscribers are callables taking the event (None = closed)."""
+
+    def __init__(self):
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self, callback):
+        with self._lock:
+            self._subscribers.add(callback)
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            self._subscribers.discard(callback)
+
+    def publish(self, event):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            callback(event)
+        return len(subscribers)
+
+    def close(self):
+        self.publish(None)
+
+
+if __name__ == '__main__':
+    def show(batch):
+        print(time.strftime('%H:%M:%S'), affected_steps(batch), batch, flush=True)
+
+    watcher = SiteWatcher(show).start()
+    print(f'Watching {ROOT} ({watcher.backend}); Ctrl+C to stop')
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        watcher.stop()
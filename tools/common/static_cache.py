@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Static File Cache (preview server)
+- In-memory cache of site files, validated by one stat() per request
+  (mtime + size); changed files are re-read, unchanged ones never touch disk
+- Compressible files get gzip (and brotli, when the module is installed)
+  variants built once at load time
+- Content-hash ETags + Last-Modified, conditional requests (304) and single
+  byte-range requests (206/416), independent of the server engine
+- LRU-bounded; files over MAX_FILE_BYTES are streamed from disk instead
+- Optional html_snippet (live-reload client) injected into HTML pages at load
+
+Used by site_manager's preview server.
+"""
+import io
+import gzip
+import hashlib
+import mimetypes
+import threading
+from pathlib import Path
+from collections import OrderedDict
+from urllib.parse import unquote
+from email.utils import formatdate, parsedate_to_datetime
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+MAX_CACHE_BYTES = 128 * 1024 * 1024   # identity + compressed bytes held in memory
+MAX_FILE_BYTES = 16 * 1024 * 1024     # bigger files are served straight from disk
+MIN_COMPRESS_BYTES = 512
+COMPRESSIBLE = ('text/', 'application/javascript', 'application/json', 'application/xml',
+                'image/svg+xml', 'application/manifest+json')
+CACHE_CONTROL = 'no-cache'            # always revalidate: edits show up, unchanged files cost a 304
+
+
+class Entry:
+    __slots__ = ('path', 'stat_key', 'mtime_ns', 'size', 'ctype', 'etag', 'last_modified', 'data', 'variants')
+
+    def __init__(self, path: Path, st, ctype: str, data, etag: str):
+        self.path = path
+        self.stat_key = (st.st_mtime_ns, st.st_size)  # what the file on disk looked like when loaded
+        self.mtime_ns = st.st_mtime_ns
+        self.size = st.st_size if data is None else len(data)
+        self.ctype = ctype
+        self.etag = etag
+        self.last_modified = formatdate(st.st_mtime, usegmt=True)
+        self.data = data          # None when too large to hold in memory
+        self.variants = {}        # {'br' | 'gzip': bytes}
+
+    def nbytes(self) -> int:
+        return len(self.data or b'') + sum(len(v) for v in self.variants.values())
+
+
+def guess_type(path: Path) -> str:
+    ctype = mimetypes.guess_type(path.name)[0] or 'application/octet-stream'
+    if ctype.startswith('text/') or ctype in ('application/javascript', 'application/json'):
+        ctype += '; charset=utf-8'
+    return ctype
+
+
+def compress_variants(data: bytes, ctype: str) -> dict:
+    if len(data) < MIN_COMPRESS_BYTES or not ctype.startswith(COMPRESSIBLE):
+        return {}
+    variants = {}
+    gz = gzip.compress(data, compresslevel=9, mtime=0)
+    if len(gz) < len(data):
+        variants['gzip'] = gz
+    if brotli is not None:
+        br = brotli.compress(data, quality=11)
+        if len(br) < len(data):
+            variants['br'] = br
+    return variants
+
+
+def inject(html: bytes, snippet: bytes) -> bytes:
+    """Insert snippet before the last </body> (or append it)."""
+    at = html.lower().rfind(b'</body>')
+    if at < 0:
+        return html + snippet
+    return html[:at] + snippet + html[at:]
+
+
+class StaticFileCache:
+    def __init__(self, root: Path, max_bytes: int = MAX_CACHE_BYTES, html_snippet: str = None):
+        self.root = Path(root).resolve()
+        self.max_bytes = max_bytes
+        self.html_snippet = html_snippet.encode('utf-8') if html_snippet else None
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.loads = 0
+        self._lock = threading.Lock()
+
+    def get(self, path: Path):
+        """Current Entry for path, or None if it is not a readable file."""
+        path = Path(path)
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+        if not path.is_file():
+            return None
+        key = str(path)
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry and entry.stat_key == (st.st_mtime_ns, st.st_size):
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry
+        entry = self._load(path, st)
+        with self._lock:
+            old = self.entries.pop(key, None)
+            if old:
+                self.bytes -= old.nbytes()
+            self.entries[key] = entry
+            self.bytes += entry.nbytes()
+            self.loads += 1
+            while self.bytes > self.max_bytes and len(self.entries) > 1:
+                _, evicted = self.entries.popitem(last=False)
+                self.bytes -= evicted.nbytes()
+        return entry
+
+    def _load(self, path: Path, st) -> Entry:
+        ctype = guess_type(path)
+        if st.st_size > MAX_FILE_BYTES:
+            # weak validator from stat; contents stay on disk
+            return Entry(path, st, ctype, None, f'W/"{st.st_mtime_ns:x}-{st.st_size:x}"')
+        data = path.read_bytes()
+        if self.html_snippet and ctype.startswith('text/html'):
+            data = inject(data, self.html_snippet)
+        entry = Entry(path, st, ctype, data, '"' + hashlib.sha1(data).hexdigest()[:20] + '"')
+        entry.variants = compress_variants(data, ctype)
+        return entry
+
+    def stats(self) -> dict:
+        return {'files': len(self.entries), 'bytes': self.bytes, 'hits': self.hits, 'loads': self.loads}
+
+
+# -----------------------------------------------------------------------------
+# HTTP SEMANTICS
+# Engine-independent helpers: pick status, headers and body for one request.
+# -----------------------------------------------------------------------------
+
+def accepts(accept_encoding: str) -> set:
+    """Codings the client accepts (q > 0)."""
+    ok = set()
+    for part in (accept_encoding or '').split(','):
+        name, _, params = part.strip().partition(';')
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if name and q > 0:
+            ok.add(name.strip().lower())
+    return ok
+
+
+def not_modified(entry: Entry, headers) -> bool:
+    inm = headers.get('If-None-Match')
+    if inm is not None:
+        tags = [t.strip() for t in inm.split(',')]
+        # weak comparison, as RFC 9110 requires for If-None-Match
+        return '*' in tags or entry.etag.removeprefix('W/') in [t.removeprefix('W/') for t in tags]
+    ims = headers.get('If-Modified-Since')
+    if ims:
+        try:
+            return int(entry.mtime_ns // 1_000_000_000) <= parsedate_to_datetime(ims).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def parse_range(value: str, size: int):
+    """(start, end_inclusive) for a single 'bytes=' range; 'invalid' if unsatisfiable; None to ignore."""
+    if not value or not value.startswith('bytes=') or ',' in value:
+        return None  # absent, other units or multipart: serve the full body
+    first, _, last = value[6:].strip().partition('-')
+    try:
+        if first == '':
+            length = int(last)
+            if length <= 0:
+                return 'invalid'
+            return max(0, size - length), size - 1
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        return None
+    if start >= size or end < start:
+        return 'invalid'
+    return start, min(end, size - 1)
+
+
+class FileSlice:
+    """File-like view of [start, start+length) of a file on disk (for files not held in memory)."""
+
+    def __init__(self, path: Path, start: int, length: int):
+        self._fh = open(path, 'rb')
+        self._fh.seek(start)
+        self._left = length
+
+    def read(self, n: int = -1) -> bytes:
+        if self._left <= 0:
+            return b''
+        n = self._left if n is None or n < 0 else min(n, self._left)
+        data = self._fh.read(n)
+        self._left -= len(data)
+        return data
+
+    def close(self):
+        self._fh.close()
+
+
+def plan(entry: Entry, headers):
+    """(status, [(header, value)], body) for a GET of entry.
+
+    body is bytes (compressed variant / empty) or a (start, length) slice of the
+    identity file, so an engine can choose between memory and sendfile().
+    """
+    base = [
+        ('Content-Type', entry.ctype),
+        ('ETag', entry.etag),
+        ('Last-Modified', entry.last_modified),
+        ('Cache-Control', CACHE_CONTROL),
+        ('Accept-Ranges', 'bytes'),
+    ]
+    if entry.variants:
+        base.append(('Vary', 'Accept-Encoding'))
+    if not_modified(entry, headers):
+        return 304, base, b''
+
+    rng = None
+    if_range = headers.get('If-Range')
+    if if_range is None or if_range.strip() in (entry.etag, entry.last_modified):
+        rng = parse_range(headers.get('Range'), entry.size)
+    if rng == 'invalid':
+        return 416, base + [('Content-Range', f'bytes */{entry.size}'), ('Content-Length', '0')], b''
+    if rng:
+        start, end = rng
+        length = end - start + 1
+        return 206, base + [('Content-Range', f'bytes {start}-{end}/{entry.size}'),
+                            ('Content-Length', str(length))], (start, length)
+
+    ok = accepts(headers.get('Accept-Encoding'))
+    for coding in ('br', 'gzip'):
+        if coding in entry.variants and coding in ok:
+            data = entry.variants[coding]
+            return 200, base + [('Content-Encoding', coding), ('Content-Length', str(len(data)))], data
+    return 200, base + [('Content-Length', str(entry.size))], (0, entry.size)
+
+
+def respond(entry: Entry, headers):
+    """Like plan(), but body is a file-like object (for SimpleHTTPRequestHandler.copyfile)."""
+    status, hdrs, body = plan(entry, headers)
+    if isinstance(body, bytes):
+        return status, hdrs, io.BytesIO(body)
+    start, length = body
+    if entry.data is not None:
+        return status, hdrs, io.BytesIO(entry.data[start:start + length])
+    return status, hdrs, FileSlice(entry.path, start, length)
+
+
+def resolve(root: Path, url_path: str):
+    """Filesystem path for a URL path under root (None if it escapes root)."""
+    rel = unquote(url_path.split('?', 1)[0].split('#', 1)[0]).lstrip('/')
+    full = (Path(root) / rel).resolve()
+    try:
+        full.relative_to(Path(root).resolve())
+    except ValueError:
+        return None
+    return full
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Templating (compiled, stdlib only)
+- {{ name }}: a context value, HTML-escaped ({{ name|raw }} inserts it as-is)
+- {% include "partial" %}: another template of the same set, inlined
+- {% extends "base" %} + {% block name %}...{% endblock %}: the base's blocks
+  are replaced by the child's; a block the child doesn't define keeps the
+  base's content
+- Everything else is literal text, so CSS/JS braces need no escaping
+  (unlike str.format)
+- Includes and inheritance are resolved at compile time into one flat list
+  of literal chunks and variable slots; compiled templates are cached per
+  template id until the set is changed, so rendering is a single join
+
+Used by site_manager.py (Content tab preview, scaffold command).
+"""
+import re
+import html
+
+TAG_RE = re.compile(r'\{\{\s*([\w.]+)(\|raw)?\s*\}\}|\{%\s*(\w+)(?:\s+"?([\w./-]+)"?)?\s*%\}')
+
+
+class TemplateError(ValueError):
+    pass
+
+
+def _tokens(name: str, source: str):
+    """[('text', str) | ('var', name, raw) | ('tag', keyword, arg)]"""
+    out, pos = [], 0
+    for m in TAG_RE.finditer(source):
+        if m.start() > pos:
+            out.append(('text', source[pos:m.start()]))
+        if m.group(1):
+            out.append(('var', m.group(1), bool(m.group(2))))
+        else:
+            keyword, arg = m.group(3), m.group(4)
+            if keyword not in ('include', 'extends', 'block', 'endblock'):
+                raise TemplateError(f'{name}: unknown tag {{% {keyword} %}}')
+            if keyword != 'endblock' and not arg:
+                raise TemplateError(f'{name}: {{% {keyword} %}} needs a name')
+            out.append(('tag', keyword, arg))
+        pos = m.end()
+    if pos < len(source):
+        out.append(('text', source[pos:]))
+    return out
+
+
+def _tree(name: str, tokens):
+    """Nest blocks: [node] where node is a token or ('block', name, [node])."""
+    stack = [('root', None, [])]
+    for tok in tokens:
+        if tok[0] == 'tag' and tok[1] == 'block':
+            stack.append(('block', tok[2], []))
+        elif tok[0] == 'tag' and tok[1] == 'endblock':
+            if len(stack) == 1:
+                raise TemplateError(f'{name}: {{% endblock %}} without {{% block %}}')
+            block = stack.pop()
+            stack[-1][2].append(block)
+        else:
+            stack[-1][2].append(tok)
+    if len(stack) > 1:
+        raise TemplateError(f'{name}: {{% block {stack[-1][1]} %}} is never closed')
+    return stack[0][2]
+
+
+def _blocks(nodes, found=None):
+    found = {} if found is None else found
+    for node in nodes:
+        if node[0] == 'block':
+            found.setdefault(node[1], node[2])
+            _blocks(node[2], found)
+    return found
+
+
+class Template:
+    """A compiled template: literal chunks at even indexes, (variable, raw) slots at odd ones."""
+
+    def __init__(self, name: str, parts):
+        self.name = name
+        self.parts = parts
+        self.variables = sorted({p[0] for p in parts[1::2]})
+
+    def render(self, context: dict) -> str:
+        out = list(self.parts)
+        for i in range(1, len(out), 2):
+            key, raw = out[i]
+            try:
+                value = context[key]
+            except KeyError:
+                raise TemplateError(f'{self.name}: no value for {{{{ {key} }}}}') from None
+            out[i] = str(value) if raw else html.escape(str(value))
+        return ''.join(out)
+
+
+class TemplateSet:
+    """Named template sources; compile() parses each id once and caches the result."""
+
+    def __init__(self, sources=None):
+        self.sources = dict(sources or {})
+        self._compiled = {}
+
+    def add(self, name: str, source: str):
+        self.sources[name] = source
+        self._compiled.clear()  # includes/extends may point at it
+
+    def compile(self, name: str) -> Template:
+        tpl = self._compiled.get(name)
+        if tpl is None:
+            parts = ['']
+            self._emit(self._resolve(name, ()), parts, (name,))
+            tpl = self._compiled[name] = Template(name, parts)
+        return tpl
+
+    def render(self, name: str, **context) -> str:
+        return self.compile(name).render(context)
+
+    def _source(self, name: str, chain):
+        if name in chain[:-1]:
+            raise TemplateError(f'template cycle: {" -> ".join(chain)}')
+        try:
+            return self.sources[name]
+        except KeyError:
+            raise TemplateError(f'unknown template {name!r}' +
+                                (f' (from {chain[-2]})' if len(chain) > 1 else '')) from None
+
+    def _resolve(self, name: str, chain, overrides=None):
+        """Node tree of `name` after applying {% extends %} and the child blocks (overrides)."""
+        chain = chain + (name,)
+        nodes = _tree(name, _tokens(name, self._source(name, chain)))
+        parent = next((n[2] for n in nodes if n[0] == 'tag' and n[1] == 'extends'), None)
+        blocks = dict(_blocks(nodes), **(overrides or {}))
+        if parent is not None:
+            return self._resolve(parent, chain, blocks)
+        return self._fill(nodes, blocks)
+
+    def _fill(self, nodes, blocks):
+        out = []
+        for node in nodes:
+            if node[0] == 'block':
+                out.append(('block', node[1], self._fill(blocks.get(node[1], node[2]), blocks)))
+            else:
+                out.append(node)
+        return out
+
+    def _emit(self, nodes, parts, chain):
+        for node in nodes:
+            kind = node[0]
+            if kind == 'text':
+                parts[-1] += node[1]
+            elif kind == 'var':
+                parts.extend([(node[1], node[2]), ''])
+            elif kind == 'block':
+                self._emit(node[2], parts, chain)
+            elif node[1] == 'include':
+                self._emit(self._resolve(node[2], chain), parts, chain + (node[2],))
+            # a stray {% extends %} below the first one is ignored
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Tool Runner (background execution engine for tools_dashboard)
+- Each run is a child process (python -u, so output is not block-buffered)
+  watched by daemon threads: one per pipe reading stdout/stderr line by line,
+  one waiting for the exit
+- Everything is posted to one thread-safe queue as events the GUI drains
+  on its own thread: ('line', run, 'out'|'err', text) and ('done', run)
+- Several runs may be active at once; cancel() terminates a run (kill after
+  a grace period)
+- Per run: exit code, wall-clock time, and the child's CPU time (user + sys,
+  from os.wait4 on POSIX; None where that isn't available)
+- warm=True sends tools that warm_worker.py knows to one persistent worker
+  process instead (no interpreter start or imports per run); a run that
+  finds the worker busy starts cold as before. Run.mode says which it was
+
+Used by tools_dashboard.py.
+"""
+import os
+import sys
+import json
+import time
+import queue
+import itertools
+import threading
+import subprocess
+from pathlib import Path
+
+import warm_worker
+
+KILL_AFTER = 3.0  # seconds between terminate and kill on cancel
+
+
+class Run:
+    """One tool execution; fields are filled in by the runner threads."""
+
+    def __init__(self, run_id: int, key: str, cmd, cwd: Path, mode: str = 'cold'):
+        self.id = run_id
+        self.key = key
+        self.cmd = cmd
+        self.cwd = cwd
+        self.mode = mode        # 'cold' (own process) or 'warm' (persistent worker)
+        self.proc = None
+        self.started = time.perf_counter()
+        self.wall = None        # seconds, once finished
+        self.cpu = None         # child user + sys seconds, once finished (POSIX)
+        self.returncode = None
+        self.cancelled = False
+        self.lines = {'out': 0, 'err': 0}
+
+    @property
+    def running(self) -> bool:
+        return self.returncode is None
+
+    def status(self) -> str:
+        if self.running:
+            return 'cancelling' if self.cancelled else 'running'
+        if self.cancelled:
+            return 'cancelled'
+        return 'ok' if self.returncode == 0 else f'exit {self.returncode}'
+
+    def timing(self) -> str:
+        if self.wall is None:
+            return f'{time.perf_counter() - self.started:.1f}s'
+        cpu = f'{self.cpu:.2f}s' if self.cpu is not None else 'n/a'
+        return f'wall {self.wall:.2f}s, cpu {cpu}'
+
+
+class WarmWorker:
+    """Client side of warm_worker.py: one request in flight, replies read on a daemon thread."""
+
+    def __init__(self, events: queue.Queue):
+        self.events = events
+        self.proc = None
+        self.current = None       # Run in flight
+        self.ready = None         # the worker's ready message, once it arrived
+        self.lock = threading.Lock()
+
+    def supports(self, key: str) -> bool:
+        return key in warm_worker.WARM_TOOLS and not (self.ready and key in self.ready.get('failed', {}))
+
+    @property
+    def busy(self) -> bool:
+        return self.current is not None
+
+    def ensure_started(self):
+        with self.lock:
+            if self.proc is not None and self.proc.poll() is None:
+                return
+            env = dict(os.environ, PYTHONIOENCODING='utf-8')
+            self.proc = subprocess.Popen([sys.executable, '-u', warm_worker.__file__], cwd=str(warm_worker.ROOT),
+                                         env=env, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                         stderr=subprocess.DEVNULL, text=True, encoding='utf-8',
+                                         errors='replace', bufsize=1)
+            self.ready = None
+            self.started = time.perf_counter()
+            threading.Thread(target=self._read, args=(self.proc,), daemon=True).start()
+
+    def submit(self, run: Run, args):
+        self.ensure_started()
+        self.current = run
+        run.proc = self.proc
+        self.proc.stdin.write(json.dumps({'id': run.id, 'tool': run.key, 'argv': list(args)}) + '\n')
+        self.proc.stdin.flush()
+
+    def _read(self, proc):
+        for raw in proc.stdout:
+            try:
+                msg = json.loads(raw)
+            except ValueError:
+                continue
+            run = self.current
+            if msg.get('ready'):
+                self.ready = dict(msg, startup=time.perf_counter() - self.started)
+                self.events.put(('warm', self.ready))
+            elif run is None or msg.get('id') != run.id:
+                continue
+            elif 'stream' in msg:
+                run.lines[msg['stream']] += 1
+                self.events.put(('line', run, msg['stream'], msg['line']))
+            elif msg.get('done'):
+                self._finish(run, msg['code'], msg.get('cpu'))
+        # pipe closed: the worker exited or was killed (cancel)
+        with self.lock:
+            if self.proc is proc:
+                self.proc = None
+        if self.current is not None and self.current.proc is proc:
+            self._finish(self.current, proc.wait(), None)
+
+    def _finish(self, run: Run, code: int, cpu):
+        run.wall = time.perf_counter() - run.started
+        run.cpu = cpu
+        self.current = None
+        run.returncode = code
+        self.events.put(('done', run))
+
+    def stop(self):
+        if self.proc is not None:
+            self.proc.kill()
+
+
+class ToolRunner:
+    def __init__(self):
+        self.events = queue.Queue()
+        self.runs = {}
+        self._ids = itertools.count(1)
+        self.warm = WarmWorker(self.events)
+
+    def warm_up(self):
+        """Start the warm worker now, so the first warm run doesn't pay for its startup."""
+        self.warm.ensure_started()
+
+    def start(self, key: str, script: Path, args=(), cwd: Path = None, warm: bool = False) -> Run:
+        script = Path(script)
+        if not script.exists():
+            raise FileNotFoundError(f'Script not found: {script}')
+        if warm and self.warm.supports(key) and not self.warm.busy:
+            run = Run(next(self._ids), key, ['warm', key, *args], script.parent, mode='warm')
+            self.runs[run.id] = run
+            self.warm.submit(run, args)
+            return run
+        cmd = [sys.executable, '-u', str(script), *args]
+        run = Run(next(self._ids), key, cmd, Path(cwd or script.parent))
+        env = dict(os.environ, PYTHONUNBUFFERED='1', PYTHONIOENCODING='utf-8')
+        run.proc = subprocess.Popen(cmd, cwd=str(run.cwd), env=env, stdin=subprocess.DEVNULL,
+                                    stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                    text=True, encoding='utf-8', errors='replace', bufsize=1)
+        self.runs[run.id] = run
+        readers = [threading.Thread(target=self._read, args=(run, stream, name), daemon=True)
+                   for stream, name in ((run.proc.stdout, 'out'), (run.proc.stderr, 'err'))]
+        for t in readers:
+            t.start()
+        threading.Thread(target=self._wait, args=(run, readers), daemon=True).start()
+        return run
+
+    def _read(self, run: Run, stream, name: str):
+        for line in stream:
+            run.lines[name] += 1
+            self.events.put(('line', run, name, line.rstrip('\r\n')))
+        stream.close()
+
+    def _wait(self, run: Run, readers):
+        proc = run.proc
+        if hasattr(os, 'wait4'):
+            # reap it ourselves to get the child's resource usage
+            _, status, usage = os.wait4(proc.pid, 0)
+            run.cpu = usage.ru_utime + usage.ru_stime
+            proc.returncode = os.waitstatus_to_exitcode(status)
+        else:
+            proc.wait()
+        run.wall = time.perf_counter() - run.started
+        for t in readers:
+            t.join()   # the last lines arrive before 'done'
+        run.returncode = proc.returncode
+        self.events.put(('done', run))
+
+    def cancel(self, run_id: int) -> bool:
+        run = self.runs.get(run_id)
+        if run is None or not run.running:
+            return False
+        run.cancelled = True
+        try:
+            run.proc.terminate()
+        except OSError:
+            return False
+        timer = threading.Timer(KILL_AFTER, self._kill, args=(run,))
+        timer.daemon = True
+        timer.start()
+        return True
+
+    def _kill(self, run: Run):
+        if run.running:
+            try:
+                run.proc.kill()
+            except OSError:
+                pass
+
+    def active(self):
+        return [r for r in self.runs.values() if r.running]
+
+    def cancel_all(self):
+        for run in self.active():
+            self.cancel(run.id)
+
+    def shutdown(self):
+        self.cancel_all()
+        self.warm.stop()
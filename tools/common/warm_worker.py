@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Warm Worker (persistent tool process for tools_dashboard)
+- One long-lived python process imports the tool modules once (link_checker,
+  asset_usage_scanner, plus everything they import) and then runs their
+  main(argv) on request, so a repeated run skips interpreter startup and
+  imports
+- Local pipe protocol, one JSON object per line: requests on the worker's
+  stdin ({"id", "tool", "argv"}), replies on its stdout:
+  {"ready": true, "tools": [...], "import_ms"} once at startup,
+  {"id", "stream": "out"|"err", "line"} for everything the tool prints,
+  {"id", "done": true, "code", "cpu", "error"?} when main() returns
+- One request at a time; tools_dashboard falls back to a cold subprocess
+  while the worker is busy. Cancelling a warm run kills the worker (it is
+  restarted on the next request)
+
+Run: python tools/common/warm_worker.py   (started by tools_dashboard; speaks JSON lines on stdin/stdout)
+Used by tool_runner.py.
+"""
+import io
+import os
+import sys
+import json
+import time
+import threading
+import traceback
+import importlib.util
+from pathlib import Path
+
+# project root: two levels up from tools/common/warm_worker.py
+ROOT = Path(__file__).resolve().parents[2]
+TOOLS_DIR = ROOT / 'tools'
+
+# tool key -> script exposing main(argv=None)
+WARM_TOOLS = {
+    'link_checker': TOOLS_DIR / 'link_checker' / 'link_checker.py',
+    'asset_usage_scanner': TOOLS_DIR / 'asset_usage_scanner' / 'asset_usage_scanner.py',
+}
+
+
+class LineWriter(io.TextIOBase):
+    """sys.stdout/sys.stderr stand-in: every complete line becomes one protocol message."""
+
+    def __init__(self, send, stream: str):
+        self.send = send
+        self.stream = stream
+        self.request = None
+        self.buf = ''
+
+    def writable(self):
+        return True
+
+    def write(self, s):
+        self.buf += s
+        while '\n' in self.buf:
+            line, self.buf = self.buf.split('\n', 1)
+            self.send({'id': self.request, 'stream': self.stream, 'line': line})
+        return len(s)
+
+    def flush(self):
+        if self.buf:
+            self.send({'id': self.request, 'stream': self.stream, 'line': self.buf})
+            self.buf = ''
+
+
+def load_tool(key: str, script: Path):
+    spec = importlib.util.spec_from_file_location(key, script)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[key] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def serve(stdin=None, stdout=None):
+    # the protocol owns the real stdout; tools print into LineWriters
+    stdin = stdin or sys.stdin
+    proto = stdout or sys.stdout
+    lock = threading.Lock()
+
+    def send(msg):
+        with lock:
+            proto.write(json.dumps(msg) + '\n')
+            proto.flush()
+
+    out, err = LineWriter(send, 'out'), LineWriter(send, 'err')
+    os.environ['TOOLS_WARM_WORKER'] = '1'   # run_history marks these runs as warm
+    sys.stdout, sys.stderr = out, err   # before the imports: nothing may print onto the protocol
+
+    t0 = time.perf_counter()
+    modules, failed = {}, {}
+    for key, script in WARM_TOOLS.items():
+        try:
+            modules[key] = load_tool(key, script)
+        except Exception as e:
+            failed[key] = f'{type(e).__name__}: {e}'
+    send({'ready': True, 'tools': sorted(modules), 'failed': failed,
+          'import_ms': (time.perf_counter() - t0) * 1000})
+
+    for raw in stdin:
+        if not raw.strip():
+            continue
+        req = json.loads(raw)
+        out.request = err.request = req['id']
+        reply = {'id': req['id'], 'done': True, 'code': 0}
+        cpu0 = time.process_time()
+        module = modules.get(req['tool'])
+        cwd = os.getcwd()
+        try:
+            if module is None:
+                raise LookupError(f"{req['tool']} is not available in the warm worker")
+            # same cwd and argv[0] (argparse's prog name) as a cold run
+            os.chdir(WARM_TOOLS[req['tool']].parent)
+            sys.argv = [str(WARM_TOOLS[req['tool']]), *(req.get('argv') or [])]
+            code = module.main(sys.argv[1:])
+            reply['code'] = code if isinstance(code, int) else 0
+        except SystemExit as e:
+            reply['code'] = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        except Exception as e:
+            traceback.print_exc()
+            reply.update(code=1, error=f'{type(e).__name__}: {e}')
+        finally:
+            os.chdir(cwd)
+            out.flush()
+            err.flush()
+        reply['cpu'] = time.process_time() - cpu0
+        send(reply)
+
+
+if __name__ == '__main__':
+    serve(sys.stdin, sys.stdout)
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+External Link Validator (used by link_checker --external)
+- Validates unique http(s) URLs concurrently with asyncio (stdlib only)
+- One keep-alive connection per host; requests to a host are serialized and
+  spaced at least MIN_INTERVAL seconds apart (per-host rate limit)
+- HEAD first, falls back to GET when the server rejects HEAD; follows redirects
+- HTTP answers cached on disk with a TTL so re-runs only hit stale/new URLs
+Cache: tools/.cache/external-links.json
+
+Run against a local stub server: python tools/link_checker/external_links.py --stub
+"""
+import ssl
+import sys
+import json
+import time
+import asyncio
+import argparse
+import threading
+from pathlib import Path
+from urllib.parse import urlsplit, urljoin
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# project root: two levels up from tools/link_checker/external_links.py
+ROOT = Path(__file__).resolve().parents[2]
+CACHE = ROOT / 'tools' / '.cache' / 'external-links.json'
+
+DEFAULT_TTL = 24 * 3600       # seconds a cached result stays valid
+MIN_INTERVAL = 0.25           # seconds between two requests to the same host
+TIMEOUT = 10.0                # seconds per request (connect + response head)
+MAX_CONCURRENCY = 16          # requests in flight across all hosts
+MAX_REDIRECTS = 5
+MAX_DRAIN = 1 << 20           # bigger GET bodies close the connection instead of being read
+REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+USER_AGENT = 'finnworks-link-checker/1.0'
+
+
+def is_external(url: str) -> bool:
+    return url.startswith(('http://', 'https://'))
+
+
+def normalize(url: str) -> str:
+    # fragments never reach the server, so they don't make a URL unique
+    return url.split('#', 1)[0].strip()
+
+
+class HostConnection:
+    """A single pooled keep-alive connection to one scheme://host:port."""
+
+    def __init__(self, scheme: str, host: str, port: int, min_interval: float, timeout: float,
+                 sem: asyncio.Semaphore):
+        self.scheme = scheme
+        self.host = host
+        self.port = port
+        self.min_interval = min_interval
+        self.timeout = timeout
+        self.sem = sem  # shared cap on requests in flight across all hosts
+        self.lock = asyncio.Lock()
+        self.reader = None
+        self.writer = None
+        self.connections_opened = 0
+        self._last = 0.0
+
+    async def _connect(self):
+        ctx = ssl.create_default_context() if self.scheme == 'https' else None
+        self.reader, self.writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port, ssl=ctx,
+                                    server_hostname=self.host if ctx else None),
+            self.timeout)
+        self.connections_opened += 1
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except Exception:
+                pass
+        self.reader = self.writer = None
+
+    async def request(self, method: str, target: str):
+        """Send one request on the pooled connection; returns (status, headers)."""
+        loop = asyncio.get_running_loop()
+        async with self.lock:
+            wait = self._last + self.min_interval - loop.time()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            await self.sem.acquire()
+            try:
+                for attempt in (0, 1):
+                    reused = self.writer is not None
+                    if not reused:
+                        await self._connect()
+                    try:
+                        return await asyncio.wait_for(self._roundtrip(method, target), self.timeout)
+                    except (ConnectionError, asyncio.IncompleteReadError):
+                        # idle keep-alive connections may have been dropped by the server
+                        await self.close()
+                        if not reused or attempt:
+                            raise
+                    except BaseException:
+                        await self.close()
+                        raise
+            finally:
+                self.sem.release()
+                self._last = loop.time()
+
+    async def _roundtrip(self, method: str, target: str):
+        host_header = self.host if self.port in (80, 443) else f'{self.host}:{self.port}'
+        self.writer.write((
+            f'{method} {target} HTTP/1.1\r\n'
+            f'Host: {host_header}\r\n'
+            f'User-Agent: {USER_AGENT}\r\n'
+            'Accept: */*\r\n'
+            'Connection: keep-alive\r\n\r\n'
+        ).encode('latin-1'))
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionResetError('connection closed before response')
+        parts = status_line.decode('latin-1').split(None, 2)
+        if len(parts) < 2 or not parts[0].startswith('HTTP/') or not parts[1].isdigit():
+            # reported as this link's error (ValueError), not an abort of the whole run
+            raise ValueError(f'malformed status line {status_line[:80]!r}')
+        status = int(parts[1])
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        keep_alive = headers.get('connection', '').lower() != 'close'
+        if method == 'HEAD' or status in (204, 304) or status < 200:
+            pass
+        elif 'chunked' in headers.get('transfer-encoding', '').lower():
+            keep_alive = keep_alive and await self._drain_chunked()
+        elif 'content-length' in headers:
+            length = int(headers['content-length'])
+            if length <= MAX_DRAIN:
+                await self.reader.readexactly(length)
+            else:
+                keep_alive = False
+        else:
+            # body delimited by connection close
+            keep_alive = False
+        if not keep_alive:
+            await self.close()
+        return status, headers
+
+    async def _drain_chunked(self) -> bool:
+        total = 0
+        while True:
+            size = int((await self.reader.readline()).split(b';', 1)[0].strip() or b'0', 16)
+            if size == 0:
+                # trailers until blank line
+                while (await self.reader.readline()) not in (b'\r\n', b'\n', b''):
+                    pass
+                return True
+            total += size
+            if total > MAX_DRAIN:
+                return False
+            await self.reader.readexactly(size + 2)
+
+
+class ExternalChecker:
+    def __init__(self, min_interval=MIN_INTERVAL, timeout=TIMEOUT,
+                 max_concurrency=MAX_CONCURRENCY, max_redirects=MAX_REDIRECTS):
+        self.min_interval = min_interval
+        self.timeout = timeout
+        self.max_redirects = max_redirects
+        self.pools = {}
+        self.sem = asyncio.Semaphore(max_concurrency)
+
+    def _pool(self, parts):
+        scheme = parts.scheme.lower()
+        port = parts.port or (443 if scheme == 'https' else 80)
+        key = (scheme, parts.hostname, port)
+        if key not in self.pools:
+            self.pools[key] = HostConnection(scheme, parts.hostname, port,
+                                             self.min_interval, self.timeout, self.sem)
+        return self.pools[key]
+
+    async def check(self, url: str) -> dict:
+        current = url
+        try:
+            for _ in range(self.max_redirects + 1):
+                parts = urlsplit(current)
+                if parts.scheme.lower() not in ('http', 'https') or not parts.hostname:
+                    return {'status': None, 'ok': False, 'error': f'unsupported URL: {current}'}
+                target = (parts.path or '/') + (f'?{parts.query}' if parts.query else '')
+                pool = self._pool(parts)
+                status, headers = await pool.request('HEAD', target)
+                if status >= 400:
+                    # plenty of servers mishandle HEAD - GET is authoritative
+                    status, headers = await pool.request('GET', target)
+                if status in REDIRECT_STATUSES and headers.get('location'):
+                    current = urljoin(current, headers['location'])
+                    continue
+                result = {'status': status, 'ok': status < 400, 'error': None}
+                if current != url:
+                    result['final_url'] = current
+                return result
+            return {'status': None, 'ok': False, 'error': 'too many redirects'}
+        except asyncio.TimeoutError:
+            return {'status': None, 'ok': False, 'error': 'timeout'}
+        except (OSError, ValueError, asyncio.IncompleteReadError) as e:
+            return {'status': None, 'ok': False, 'error': f'{type(e).__name__}: {e}'}
+
+    async def check_all(self, urls):
+        try:
+            results = await asyncio.gather(*(self.check(u) for u in urls))
+        finally:
+            for pool in self.pools.values():
+                await pool.close()
+        return dict(zip(urls, results))
+
+
+def load_cache(path: Path = CACHE) -> dict:
+    try:
+        return json.loads(path.read_text(encoding='utf-8'))
+    except Exception:
+        return {}
+
+
+def save_cache(cache: dict, path: Path = CACHE):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix('.tmp')
+    tmp.write_text(json.dumps(cache, separators=(',', ':')), encoding='utf-8')
+    tmp.replace(path)
+
+
+def check_external(urls, ttl: float = DEFAULT_TTL, cache_path: Path = CACHE, **checker_opts) -> dict:
+    """Validate urls, reusing cached results younger than ttl seconds.
+
+    Returns {url: {'status', 'ok', 'error', 'checked_at'[, 'final_url']}}.
+    """
+    urls = sorted({normalize(u) for u in urls if is_external(u)})
+    cache = load_cache(cache_path) if cache_path else {}
+    now = time.time()
+    stale = [u for u in urls if now - cache.get(u, {}).get('checked_at', 0) > ttl]
+
+    if stale:
+        async def run():
+            return await ExternalChecker(**checker_opts).check_all(stale)
+        fresh = asyncio.run(run())
+        for url, result in fresh.items():
+            result['checked_at'] = now
+            if result['status'] is not None:
+                # only real HTTP answers are cached; DNS/network failures retry next run
+                cache[url] = result
+        if cache_path:
+            save_cache(cache, cache_path)
+        return {u: fresh.get(u) or cache[u] for u in urls}
+
+    return {u: cache[u] for u in urls}
+
+
+# -----------------------------------------------------------------------------
+# STUB SERVER
+# Local HTTP server with known answers, for checking the validator offline.
+# -----------------------------------------------------------------------------
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'   # keep-alive, so connection reuse is observable
+    connections = 0
+
+    def setup(self):
+        StubHandler.connections += 1
+        super().setup()
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, location=None, body=b''):
+        self.send_response(status)
+        if location:
+            self.send_header('Location', location)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if self.command == 'GET':
+            self.wfile.write(body)
+
+    def do_HEAD(self):
+        if self.path == '/no-head':
+            return self._reply(405)
+        self.do_GET()
+
+    def do_GET(self):
+        routes = {
+            '/ok': (200, None), '/no-head': (200, None), '/missing': (404, None),
+            '/redirect': (301, '/ok'), '/loop': (302, '/loop'),
+        }
+        status, location = routes.get(self.path.split('?')[0], (404, None))
+        self._reply(status, location, b'stub body\n')
+
+
+def run_stub_check() -> int:
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f'http://127.0.0.1:{server.server_address[1]}'
+    expected = {
+        '/ok': True, '/ok?page=2': True, '/no-head': True, '/redirect': True,
+        '/missing': False, '/loop': False,
+    }
+    try:
+        results = check_external([base + p for p in expected], cache_path=None, min_interval=0.01)
+    finally:
+        server.shutdown()
+
+    failures = 0
+    for path, want in expected.items():
+        res = results[base + path]
+        mark = 'PASS' if res['ok'] == want else 'FAIL'
+        failures += mark == 'FAIL'
+        print(f"{mark} {path:<12} status={res['status']} error={res['error']}")
+    print('Requests answered over', StubHandler.connections, 'connection(s)')
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser(description='Validate external URLs (or the local stub server).')
+    ap.add_argument('urls', nargs='*')
+    ap.add_argument('--stub', action='store_true', help='validate against a local stub HTTP server')
+    ap.add_argument('--ttl', type=float, default=DEFAULT_TTL / 3600, help='cache TTL in hours')
+    args = ap.parse_args()
+    if args.stub:
+        sys.exit(run_stub_check())
+    for url, res in check_external(args.urls, ttl=args.ttl * 3600).items():
+        print('OK ' if res['ok'] else 'BAD', res['status'], url, res['error'] or '')
@@ -7,50 +7,42 @@ Link Checker
 Output: tools/link_checker/link-report.json + concise console summary
 
 Run: python tools/link_checker/link_checker.py
+     python tools/link_checker/link_checker.py --incremental   (re-check only what changed)
+     python tools/link_checker/link_checker.py --jobs 8        (parse + check across 8 processes)
+     python tools/link_checker/link_checker.py --external      (also validate http(s) links, cached)
+     python tools/link_checker/link_checker.py --format jsonl.gz   (stream results as gzipped JSON Lines)
+     python tools/link_checker/link_checker.py --out /tmp/links.json   (report elsewhere, e.g. a dry run)
 """
 import os
 import re
+import sys
 import json
+import argparse
 from pathlib import Path
-from html.parser import HTMLParser
+from concurrent.futures import ProcessPoolExecutor
+
+# shared helpers live in tools/common
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'common'))
+import site_model  # noqa: E402
+import report_writer  # noqa: E402
+import run_history  # noqa: E402
+from site_model import SKIP_DIRS, collect_html_files  # noqa: E402,F401
 
 # project root: go two levels up from tools/<tool_name>/script.py
 ROOT = Path(__file__).resolve().parents[2]
 OUT = Path(__file__).resolve().parent / 'link-report.json'
-SKIP_DIRS = {'.venv', 'venv', 'node_modules', '.git', 'tools'}
+# per-file results + reverse dependency map used by --incremental
+STORE = ROOT / 'tools' / '.cache' / 'link-results.json'
+STORE_VERSION = 1
+# upper bound on files handed to a worker process per task in --jobs mode
+BATCH_SIZE = 64
 
 ABS_URL_SCHEMES = (
     'http://', 'https://', 'mailto:', 'tel:', 'data:', 'javascript:'
 )
 
-class LinkAssetParser(HTMLParser):
-    def __init__(self):
-        super().__init__()
-        self.links = []  # (href, tag)
-        self.assets = [] # (src_or_href, tag)
-        self.ids = set()
-
-    def handle_starttag(self, tag, attrs):
-        attrs = dict(attrs)
-        # collect element ids for anchor checks
-        if 'id' in attrs:
-            self.ids.add(attrs['id'])
-
-        # links
-        if tag == 'a':
-            href = attrs.get('href')
-            if href:
-                self.links.append((href, tag))
-
-        # assets: img/src, script/src, link/href (CSS)
-        if tag in ('img', 'script'):
-            src = attrs.get('src')
-            if src:
-                self.assets.append((src, tag))
-        elif tag == 'link':
-            href = attrs.get('href')
-            if href:
-                self.assets.append((href, tag))
+# the parser now lives in site_model; keep the old name importable
+LinkAssetParser = site_model.PageParser
 
 
 def is_abs_url(url: str) -> bool:
@@ -58,34 +50,35 @@ def is_abs_url(url: str) -> bool:
 
 
 def resolve_path(base_file: Path, url: str) -> Path:
-    # strip query/hash
+    # strip query/hash; normpath keeps this a pure string op (no syscalls per link)
     clean = url.split('#')[0].split('?')[0]
     if clean.startswith('/'):
-        return (ROOT / clean.lstrip('/')).resolve()
-    return (base_file.parent / clean).resolve()
+        return Path(os.path.normpath(os.path.join(ROOT, clean.lstrip('/'))))
+    return Path(os.path.normpath(os.path.join(base_file.parent, clean)))
 
 
-def collect_html_files():
-    files = []
-    for p in ROOT.rglob('*.html'):
-        rel_parts = p.relative_to(ROOT).parts
-        if any(part in SKIP_DIRS for part in rel_parts):
-            continue
-        files.append(p)
-    return files
+def target_key(path: Path) -> str:
+    # store targets relative to ROOT where possible so the store is portable
+    try:
+        return path.relative_to(ROOT).as_posix()
+    except ValueError:
+        return path.as_posix()
 
 
-def check_file(html_path: Path):
-    text = html_path.read_text(encoding='utf-8', errors='ignore')
-    parser = LinkAssetParser()
-    parser.feed(text)
+def check_file(html_path: Path, record: dict = None, targets: dict = None, index=None):
+    # record: parsed page from site_model (parsed here when not supplied)
+    # targets: optional dict filled with {target_key: exists} for every local ref
+    # index: site_model.FileIndex answering existence without a stat per ref
+    if record is None:
+        record = site_model.parse_page(html_path)
+    ids = set(record['ids'])
 
     broken_links = []
     missing_anchors = []
     broken_assets = []
 
     # links
-    for href, tag in parser.links:
+    for href, tag in record['links']:
         if not href or href.strip() == '':
             broken_links.append({'href': href, 'reason': 'empty'})
             continue
@@ -94,17 +87,20 @@ def check_file(html_path: Path):
             continue
         if href.startswith('#'):
             anchor = href[1:]
-            if anchor and anchor not in parser.ids:
+            if anchor and anchor not in ids:
                 missing_anchors.append({'anchor': anchor, 'reason': 'same-page id not found'})
             continue
         # cross-page + optional anchor
         target_file = href.split('#', 1)[0]
         tp = resolve_path(html_path, target_file)
-        if not tp.exists():
+        exists = index.exists(tp) if index is not None else tp.exists()
+        if targets is not None:
+            targets[target_key(tp)] = exists
+        if not exists:
             broken_links.append({'href': href, 'reason': 'target file missing'})
 
     # assets
-    for ref, tag in parser.assets:
+    for ref, tag in record['assets']:
         if not ref or ref.strip() == '':
             broken_assets.append({'ref': ref, 'tag': tag, 'reason': 'empty'})
             continue
@@ -112,7 +108,10 @@ def check_file(html_path: Path):
             # external asset — skip
             continue
         tp = resolve_path(html_path, ref)
-        if not tp.exists():
+        exists = index.exists(tp) if index is not None else tp.exists()
+        if targets is not None:
+            targets[target_key(tp)] = exists
+        if not exists:
             broken_assets.append({'ref': ref, 'tag': tag, 'reason': 'target asset missing'})
 
     return {
@@ -123,38 +122,280 @@ def check_file(html_path: Path):
     }
 
 
-def main():
-    html_files = collect_html_files()
-    results = []
-    total_links = total_assets = 0
-    broken_links_count = missing_anchors_count = broken_assets_count = 0
-
-    for f in html_files:
-        res = check_file(f)
-        results.append(res)
-        total_links += len(res['broken_links']) + len(res['missing_anchors'])  # links + anchors for context
-        total_assets += len(res['broken_assets'])
-        broken_links_count += len(res['broken_links'])
-        missing_anchors_count += len(res['missing_anchors'])
-        broken_assets_count += len(res['broken_assets'])
-
-    report = {
-        'summary': {
-            'html_files_scanned': len(html_files),
-            'broken_links': broken_links_count,
-            'missing_anchors': missing_anchors_count,
-            'broken_assets': broken_assets_count,
-        },
+_WORKER_INDEX = None
+
+
+def _init_worker(root: str, index=None):
+    # worker processes may be spawned fresh (Windows) - point them at the parent's ROOT + index
+    global ROOT, _WORKER_INDEX
+    ROOT = Path(root)
+    site_model.ROOT = ROOT
+    _WORKER_INDEX = index
+
+
+def _check_batch(paths, index=None):
+    index = index if index is not None else _WORKER_INDEX
+    out = []
+    for p in paths:
+        seen = {}
+        out.append((check_file(Path(p), targets=seen, index=index), seen))
+    return out
+
+
+def iter_check_many(html_files, jobs: int = 1, batch_size: int = None, index=None):
+    """Parse + check files, fanned out over `jobs` processes in batches.
+
+    Yields (result, {target_key: exists}) in the same order as html_files, batch by
+    batch as workers finish, so the merged report is identical whatever the job count.
+    """
+    html_files = list(html_files)
+    if jobs <= 1 or len(html_files) < 2:
+        for p in html_files:
+            yield from _check_batch([p], index)
+        return
+    if batch_size is None:
+        # ~4 batches per worker keeps the pool busy without drowning it in tiny tasks
+        batch_size = max(1, min(BATCH_SIZE, -(-len(html_files) // (jobs * 4))))
+    batches = [html_files[i:i + batch_size] for i in range(0, len(html_files), batch_size)]
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(str(ROOT), index)) as pool:
+        for chunk in pool.map(_check_batch, batches):
+            yield from chunk
+
+
+def check_many(html_files, jobs: int = 1, batch_size: int = None, index=None):
+    """List form of iter_check_many: [(result, {target_key: exists}), ...]."""
+    return list(iter_check_many(html_files, jobs, batch_size, index))
+
+
+def new_summary():
+    return {
+        'html_files_scanned': 0,
+        'broken_links': 0,
+        'missing_anchors': 0,
+        'broken_assets': 0,
+    }
+
+
+def add_to_summary(summary, res):
+    summary['html_files_scanned'] += 1
+    for key in ('broken_links', 'missing_anchors', 'broken_assets', 'broken_external'):
+        if key in res:
+            summary[key] = summary.get(key, 0) + len(res[key])
+
+
+def build_report(results):
+    results = list(results)
+    summary = new_summary()
+    for res in results:
+        add_to_summary(summary, res)
+    return {
+        'summary': summary,
         'details': results,
     }
 
-    OUT.write_text(json.dumps(report, indent=2), encoding='utf-8')
 
-    print('Scanned', len(html_files), 'HTML files')
-    print('Broken links:', broken_links_count,
-          '| Missing anchors:', missing_anchors_count,
-          '| Broken assets:', broken_assets_count)
-    print('Report written to', OUT)
+def external_annotator(site: dict, ttl_hours: float):
+    """Validate every external http(s) link/asset up front.
+
+    Returns (annotate, urls_checked); annotate(result) adds 'broken_external' to
+    one page result so results can still be streamed one by one.
+    """
+    # imported lazily: only --external needs asyncio/ssl
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+    import external_links
+
+    refs = {}
+    for rel, record in site.items():
+        for ref, _ in record['links'] + record['assets']:
+            if ref and external_links.is_external(ref):
+                refs.setdefault(rel, []).append(ref)
+    urls = {external_links.normalize(r) for page_refs in refs.values() for r in page_refs}
+    results = external_links.check_external(urls, ttl=ttl_hours * 3600)
+
+    def annotate(res):
+        broken = []
+        for ref in refs.get(res['file'], ()):
+            ext = results[external_links.normalize(ref)]
+            if not ext['ok']:
+                broken.append({'href': ref, 'status': ext['status'],
+                               'reason': ext['error'] or f"HTTP {ext['status']}"})
+        res['broken_external'] = broken
+        return res
+
+    return annotate, len(urls)
+
+
+def write_report(report, out: Path = OUT):
+    out.write_text(json.dumps(report, indent=2), encoding='utf-8')
+    print_summary(report['summary'], out)
+
+
+def stream_report(results, out: Path, extra: dict = None):
+    """Write results as JSON Lines as they are produced; returns the summary."""
+    summary = new_summary()
+    with report_writer.ReportWriter(out, 'link_checker') as writer:
+        for res in results:
+            add_to_summary(summary, res)
+            writer.write(res)
+        summary.update(extra or {})
+        writer.summary = summary
+    return summary
+
+
+def print_summary(summary, out: Path):
+    print('Scanned', summary['html_files_scanned'], 'HTML files')
+    print('Broken links:', summary['broken_links'],
+          '| Missing anchors:', summary['missing_anchors'],
+          '| Broken assets:', summary['broken_assets'])
+    if 'broken_external' in summary:
+        print('External URLs checked:', summary['external_urls_checked'],
+              '| Broken external:', summary['broken_external'])
+    print('Report written to', out)
+
+
+def load_store():
+    empty = {'pages': {}, 'targets': {}, 'deps': {}}
+    try:
+        data = json.loads(STORE.read_text(encoding='utf-8'))
+    except Exception:
+        return empty
+    if data.get('version') != STORE_VERSION:
+        return empty
+    return data
+
+
+def save_store(store):
+    STORE.parent.mkdir(parents=True, exist_ok=True)
+    store['version'] = STORE_VERSION
+    tmp = STORE.with_suffix('.tmp')
+    tmp.write_text(json.dumps(store, separators=(',', ':')), encoding='utf-8')
+    os.replace(tmp, STORE)
+
+
+def run_incremental(html_files, jobs: int = 1, index=None, force: bool = False, out: Path = OUT):
+    """Re-check only edited/new pages and pages whose link targets appeared or vanished.
+
+    Store layout (tools/.cache/link-results.json):
+      pages:   {page: {mtime_ns, size, result, targets: [target, ...]}}
+      targets: {target: exists}        existence seen on the last run
+      deps:    {target: [page, ...]}   reverse map: which pages point at a target
+      report:  the report path the stored results last went to
+    Returns (results, number_of_pages_rechecked), or (None, 0) when nothing changed
+    and the report at `out` is current (unless force is set).
+    """
+    store = load_store()
+    pages = store['pages']
+    targets = store['targets']
+    deps = {k: set(v) for k, v in store['deps'].items()}
+    current = {f.relative_to(ROOT).as_posix(): f for f in html_files}
+
+    # 1) new or edited pages
+    dirty = set()
+    stats = {}
+    for rel, f in current.items():
+        st = f.stat()
+        stats[rel] = (st.st_mtime_ns, st.st_size)
+        entry = pages.get(rel)
+        if not entry or (entry['mtime_ns'], entry['size']) != stats[rel]:
+            dirty.add(rel)
+
+    # 2) pages pointing at targets that were added, removed or renamed since last run
+    for key, existed in targets.items():
+        target = ROOT / key
+        exists = index.exists(target) if index is not None else target.exists()
+        if exists != existed:
+            dirty.update(p for p in deps.get(key, ()) if p in current)
+
+    removed = set(pages) - set(current)
+    # a run that reported elsewhere (--out) consumed the changes without updating `out`
+    current_report = store.get('report') == str(out)
+    if not dirty and not removed and current_report and out.exists() and not force:
+        return None, 0
+
+    # unlink stale dependency edges before re-checking
+    for rel in dirty | removed:
+        old = pages.pop(rel, None)
+        for key in (old or {}).get('targets', ()):
+            dependents = deps.get(key)
+            if dependents:
+                dependents.discard(rel)
+
+    dirty_order = [rel for rel in current if rel in dirty]
+    checked = check_many([current[rel] for rel in dirty_order], jobs, index=index)
+    for rel, (result, seen) in zip(dirty_order, checked):
+        pages[rel] = {
+            'mtime_ns': stats[rel][0],
+            'size': stats[rel][1],
+            'result': result,
+            'targets': sorted(seen),
+        }
+        for key, exists in seen.items():
+            deps.setdefault(key, set()).add(rel)
+            targets[key] = exists
+
+    # drop targets nobody points at any more
+    deps = {k: v for k, v in deps.items() if v}
+    store['targets'] = {k: targets[k] for k in deps if k in targets}
+    store['deps'] = {k: sorted(v) for k, v in deps.items()}
+    store['pages'] = pages
+    store['report'] = str(out)
+    save_store(store)
+
+    return [pages[rel]['result'] for rel in current], len(dirty)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description='Validate local links and assets in all HTML pages.')
+    ap.add_argument('--incremental', action='store_true',
+                    help='re-check only changed pages and pages whose targets changed')
+    ap.add_argument('--jobs', type=int, default=1, metavar='N',
+                    help='worker processes for parsing/checking (0 = one per CPU core)')
+    ap.add_argument('--external', action='store_true',
+                    help='also validate external http(s) links (async, cached on disk)')
+    ap.add_argument('--ttl', type=float, default=24, metavar='HOURS',
+                    help='how long cached external results stay valid (default 24)')
+    ap.add_argument('--format', choices=report_writer.FORMATS, default='json',
+                    help='json (default) or streamed JSON Lines, optionally gzipped')
+    ap.add_argument('--out', type=Path, default=OUT, metavar='PATH',
+                    help='report path (default tools/link_checker/link-report.json)')
+    args = ap.parse_args(argv)
+    variant = ' '.join(flag for flag, on in (('incremental', args.incremental), ('external', args.external),
+                                             (f'jobs={args.jobs}', args.jobs != 1)) if on)
+    with run_history.track('link_checker', variant) as run:
+        jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+        out = report_writer.report_path(args.out, args.format)
+
+        # one walk of the tree answers every existence check (and lists the pages)
+        index = site_model.FileIndex()
+        html_files = collect_html_files(index)
+        run['files'] = len(html_files)
+
+        if args.incremental:
+            # external results expire by TTL, so --external always rebuilds the report
+            results, rechecked = run_incremental(html_files, jobs, index, force=args.external, out=out)
+            if results is None:
+                print('No changes in', len(html_files), 'HTML files since last run; report unchanged:', out)
+                run['variant'] = f'{variant} unchanged'   # near-zero runs get a baseline of their own
+                return
+            print('Re-checked', rechecked, 'of', len(html_files), 'HTML files')
+            run['rechecked'] = rechecked
+        elif jobs > 1:
+            results = (res for res, _ in iter_check_many(html_files, jobs, index=index))
+        else:
+            site = site_model.load_site(html_files)
+            results = (check_file(f, site[f.relative_to(ROOT).as_posix()], index=index) for f in html_files)
+
+        extra = {}
+        if args.external:
+            annotate, extra['external_urls_checked'] = external_annotator(site_model.load_site(html_files), args.ttl)
+            results = map(annotate, results)
+
+        if report_writer.is_stream(out):
+            print_summary(stream_report(results, out, extra), out)
+        else:
+            report = build_report(results)
+            report['summary'].update(extra)
+            write_report(report, out)
 
 
 if __name__ == '__main__':
@@ -6,18 +6,36 @@ Site Manager (GUI)
 - Self-contained: tkinter + stdlib only
 
 Run: python tools/site_manager/site_manager.py
+     python tools/site_manager/site_manager.py build [--out DIR] [--jobs N] [--force] [--no-minify]
+                                                     [--no-critical]
+     python tools/site_manager/site_manager.py scaffold MANIFEST.json [--jobs N] [--overwrite] [--dry-run] [--json]
 """
 import os
 import sys
 import json
+import time
+import queue
+import argparse
 import threading
 import webbrowser
 import subprocess
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
 import tkinter as tk
 from tkinter import ttk, messagebox
 
+# shared helpers live in tools/common
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'common'))
+import site_model  # noqa: E402
+import search_index  # noqa: E402
+import static_cache  # noqa: E402
+import async_server  # noqa: E402
+import site_watcher  # noqa: E402
+import site_build  # noqa: E402
+import templating  # noqa: E402
+import deploy_pipeline  # noqa: E402
+
 # -----------------------------------------------------------------------------
 # CONFIG & PATHS
 # This section sets up project root and common directories.
@@ -36,57 +54,64 @@ def safe_write(path: Path, content: str):
     path.write_text(content, encoding='utf-8')
 
 
+def atomic_write(path: Path, content: str):
+    # temp file in the same folder + rename: readers never see a half-written file
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f'.{path.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+    try:
+        tmp.write_text(content, encoding='utf-8')
+        os.replace(tmp, path)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+
+
 def list_html_files():
-    skip = {'.venv', 'venv', 'node_modules', '.git', 'tools'}
-    files = []
-    for p in ROOT.rglob('*.html'):
-        if any(part in skip for part in p.relative_to(ROOT).parts):
-            continue
-        files.append(p)
-    return files
+    return site_model.collect_html_files()
 
 # -----------------------------------------------------------------------------
 # TEMPLATES
 # This section defines minimal HTML templates for new content.
 # -----------------------------------------------------------------------------
-BASE_TEMPLATE = """<!DOCTYPE html>
-<html lang=\"en\">
+# Shared layout + partials; every HTML template extends "layout" (see tools/common/templating.py)
+LAYOUT_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
 <head>
-  <meta charset=\"UTF-8\">
-  <meta name=\"viewport\" content=\"width=device-width, initial-scale=1.0\">
-  <title>{title}</title>
-  <link rel=\"stylesheet\" href=\"{prefix}assets/css/universal-search.css\">
-  <script src=\"{prefix}assets/js/theme-manager.js\"></script>
-  <script src=\"{prefix}assets/js/universal-search.js\" defer></script>
-  <style>body{font-family:Segoe UI,Roboto,Arial,sans-serif;padding:20px;}</style>
-</head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{{ title }}</title>
+{% block head %}{% endblock %}{% include "site-assets" %}{% block styles %}{% endblock %}</head>
 <body>
-  <header>
-    <h1>{title}</h1>
-    <p>Generated by Site Manager</p>
-    <hr>
-  </header>
-  <main>
-    <section>
-      <h2>Section Title</h2>
-      <p>Edit this content in your editor.</p>
-    </section>
-  </main>
-</body>
+{% block body %}{% endblock %}</body>
 </html>
 """
 
+# theme + universal search, linked relative to the page ({{ prefix }} = path back to the site root)
+SITE_ASSETS_PARTIAL = """    <link rel="stylesheet" href="{{ prefix }}assets/css/universal-search.css">
+    <script src="{{ prefix }}assets/js/theme-manager.js"></script>
+    <script src="{{ prefix }}assets/js/universal-search.js" defer></script>
+"""
+
+BASE_TEMPLATE = """{% extends "layout" %}
+{% block styles %}    <style>body{font-family:Segoe UI,Roboto,Arial,sans-serif;padding:20px;}</style>
+{% endblock %}
+{% block body %}    <header>
+        <h1>{{ title }}</h1>
+        <p>Generated by Site Manager</p>
+        <hr>
+    </header>
+    <main>
+        <section>
+            <h2>Section Title</h2>
+            <p>Edit this content in your editor.</p>
+        </section>
+    </main>
+{% endblock %}
+"""
+
 # Additional templates for user-friendly scaffolding
-PAGE_LANDING_TEMPLATE = """<!DOCTYPE html>
-<html lang=\"en\">
-<head>
-    <meta charset=\"UTF-8\">
-    <meta name=\"viewport\" content=\"width=device-width, initial-scale=1.0\">
-    <title>{title}</title>
-    <link rel=\"stylesheet\" href=\"{prefix}assets/css/universal-search.css\">
-    <script src=\"{prefix}assets/js/theme-manager.js\"></script>
-    <script src=\"{prefix}assets/js/universal-search.js\" defer></script>
-    <style>
+PAGE_LANDING_TEMPLATE = """{% extends "layout" %}
+{% block styles %}    <style>
         :root{--bg:#0b1b2b;--fg:#eaf2fb;--accent:#4fb0ff}
         body{margin:0;font-family:Segoe UI,Roboto,Arial,sans-serif;background:var(--bg);color:var(--fg)}
         .hero{padding:80px 24px;text-align:center}
@@ -96,47 +121,59 @@ PAGE_LANDING_TEMPLATE = """<!DOCTYPE html>
         .cta a{display:inline-block;padding:12px 18px;background:var(--accent);color:#001b2b;text-decoration:none;border-radius:6px}
         main{background:#fff;color:#222;border-radius:12px;margin:24px;padding:24px}
     </style>
-    </head>
-<body>
-    <div class=\"hero\">
-        <h1>{title}</h1>
+{% endblock %}
+{% block body %}    <div class="hero">
+        <h1>{{ title }}</h1>
         <p>A friendly landing page with a clear call to action.</p>
-        <div class=\"cta\"><a href=\"#get-started\">Get Started</a></div>
+        <div class="cta"><a href="#get-started">Get Started</a></div>
     </div>
     <main>
-        <h2 id=\"get-started\">Next steps</h2>
+        <h2 id="get-started">Next steps</h2>
         <p>Replace this content with your own sections, images, and links.</p>
     </main>
-</body>
-</html>
+{% endblock %}
 """
 
-PROJECT_APP_INDEX = """<!DOCTYPE html>
-<html lang=\"en\">
-<head>
-    <meta charset=\"UTF-8\">
-    <meta name=\"viewport\" content=\"width=device-width, initial-scale=1.0\">
-    <title>{title}</title>
-    <link rel=\"stylesheet\" href=\"styles.css\">
-    <link rel=\"stylesheet\" href=\"{prefix}assets/css/universal-search.css\">
-    <script src=\"{prefix}assets/js/theme-manager.js\"></script>
-    <script src=\"{prefix}assets/js/universal-search.js\" defer></script>
-</head>
-<body>
-    <header>
-        <h1>{title}</h1>
-        <p>Project starter with JS + CSS files you can edit.</p>
+# Projects: own styles.css before the site assets, header + main.js around the content
+PROJECT_LAYOUT = """{% extends "layout" %}
+{% block head %}    <link rel="stylesheet" href="styles.css">
+{% endblock %}
+{% block body %}    <header>
+        <h1>{{ title }}</h1>
+        <p>{% block tagline %}{% endblock %}</p>
         <hr>
     </header>
-    <main>
+{% block content %}{% endblock %}    <script src="main.js"></script>
+{% endblock %}
+"""
+
+PROJECT_APP_INDEX = """{% extends "project-layout" %}
+{% block tagline %}Project starter with JS + CSS files you can edit.{% endblock %}
+{% block content %}    <main>
         <section>
             <h2>Welcome</h2>
             <p>Your app JavaScript lives in <strong>main.js</strong>. Styles live in <strong>styles.css</strong>.</p>
         </section>
     </main>
-    <script src=\"main.js\"></script>
-</body>
-</html>
+{% endblock %}
+"""
+
+PROJECT_GAME_INDEX = """{% extends "project-layout" %}
+{% block tagline %}Game starter with a canvas and a simple update loop.{% endblock %}
+{% block content %}    <canvas id="game" width="640" height="360" style="border:1px solid #999"></canvas>
+{% endblock %}
+"""
+
+PROJECT_FORM_INDEX = """{% extends "project-layout" %}
+{% block tagline %}Form tool starter with a simple submit handler.{% endblock %}
+{% block content %}    <main>
+        <form id="tool-form">
+            <label>Value <input name="value" required></label>
+            <button type="submit">Run</button>
+        </form>
+        <pre id="out"></pre>
+    </main>
+{% endblock %}
 """
 
 PROJECT_APP_MAIN_JS = """// App Starter
@@ -153,29 +190,6 @@ body{font-family:Segoe UI,Roboto,Arial,sans-serif;padding:20px}
 h1{margin:0 0 8px}
 """
 
-PROJECT_GAME_INDEX = """<!DOCTYPE html>
-<html lang=\"en\">
-<head>
-    <meta charset=\"UTF-8\">
-    <meta name=\"viewport\" content=\"width=device-width, initial-scale=1.0\">
-    <title>{title}</title>
-    <link rel=\"stylesheet\" href=\"styles.css\">
-    <link rel=\"stylesheet\" href=\"{prefix}assets/css/universal-search.css\">
-    <script src=\"{prefix}assets/js/theme-manager.js\"></script>
-    <script src=\"{prefix}assets/js/universal-search.js\" defer></script>
-</head>
-<body>
-    <header>
-        <h1>{title}</h1>
-        <p>Game starter with a canvas and a simple update loop.</p>
-        <hr>
-    </header>
-    <canvas id=\"game\" width=\"640\" height=\"360\" style=\"border:1px solid #999\"></canvas>
-    <script src=\"main.js\"></script>
-</body>
-</html>
-"""
-
 PROJECT_GAME_MAIN_JS = """// Game Starter
 const canvas = document.getElementById('game');
 const ctx = canvas.getContext('2d');
@@ -198,35 +212,6 @@ body{font-family:Segoe UI,Roboto,Arial,sans-serif;padding:20px}
 canvas{display:block;margin-top:12px}
 """
 
-PROJECT_FORM_INDEX = """<!DOCTYPE html>
-<html lang=\"en\">
-<head>
-    <meta charset=\"UTF-8\">
-    <meta name=\"viewport\" content=\"width=device-width, initial-scale=1.0\">
-    <title>{title}</title>
-    <link rel=\"stylesheet\" href=\"styles.css\">
-    <link rel=\"stylesheet\" href=\"{prefix}assets/css/universal-search.css\">
-    <script src=\"{prefix}assets/js/theme-manager.js\"></script>
-    <script src=\"{prefix}assets/js/universal-search.js\" defer></script>
-</head>
-<body>
-    <header>
-        <h1>{title}</h1>
-        <p>Form tool starter with a simple submit handler.</p>
-        <hr>
-    </header>
-    <main>
-        <form id=\"tool-form\">
-            <label>Value <input name=\"value\" required></label>
-            <button type=\"submit\">Run</button>
-        </form>
-        <pre id=\"out\"></pre>
-    </main>
-    <script src=\"main.js\"></script>
-</body>
-</html>
-"""
-
 PROJECT_FORM_MAIN_JS = """// Form Tool Starter
 document.getElementById('tool-form').addEventListener('submit', (e) => {
     e.preventDefault();
@@ -241,51 +226,254 @@ label{display:block;margin:8px 0}
 pre{background:#f5f5f5;border:1px solid #ddd;padding:12px;border-radius:8px}
 """
 
+# Compiled once per template id on first use (the Content tab preview re-renders on every keystroke)
+TEMPLATES = templating.TemplateSet({
+    'layout': LAYOUT_TEMPLATE,
+    'site-assets': SITE_ASSETS_PARTIAL,
+    'project-layout': PROJECT_LAYOUT,
+    'page/basic': BASE_TEMPLATE,
+    'page/landing': PAGE_LANDING_TEMPLATE,
+    'project/app': PROJECT_APP_INDEX,
+    'project/app.js': PROJECT_APP_MAIN_JS,
+    'project/app.css': PROJECT_APP_STYLES_CSS,
+    'project/app.txt': 'App starter. Edit main.js and styles.css to build your feature.',
+    'project/game': PROJECT_GAME_INDEX,
+    'project/game.js': PROJECT_GAME_MAIN_JS,
+    'project/game.css': PROJECT_GAME_STYLES_CSS,
+    'project/game.txt': 'Edit main.js and styles.css. Open index.html in a browser to preview your game.',
+    'project/form': PROJECT_FORM_INDEX,
+    'project/form.js': PROJECT_FORM_MAIN_JS,
+    'project/form.css': PROJECT_FORM_STYLES_CSS,
+    'project/form.txt': 'Form tool starter. Update the form and JS to process inputs.',
+})
+
+# (kind, template) -> { file created: template id }
+TEMPLATE_FILES = {
+    ('page', 'basic-page'): {'index.html': 'page/basic'},
+    ('page', 'landing-page'): {'index.html': 'page/landing'},
+    ('project', 'app-starter'): {'index.html': 'project/app', 'main.js': 'project/app.js',
+                                 'styles.css': 'project/app.css', 'README.txt': 'project/app.txt'},
+    ('project', 'game-starter'): {'index.html': 'project/game', 'main.js': 'project/game.js',
+                                  'styles.css': 'project/game.css', 'README.txt': 'project/game.txt'},
+    ('project', 'form-tool'): {'index.html': 'project/form', 'main.js': 'project/form.js',
+                               'styles.css': 'project/form.css', 'README.txt': 'project/form.txt'},
+}
+
+# -----------------------------------------------------------------------------
+# SCAFFOLDING
+# This section renders templates into files; used by the Content tab and the
+# headless `scaffold` command (many pages/projects from one manifest).
+# -----------------------------------------------------------------------------
+TEMPLATE_IDS = {
+    'project': ['app-starter', 'game-starter', 'form-tool'],
+    'page': ['basic-page', 'landing-page'],
+}
+INVALID_NAME_CHARS = ' \\/:*?"<>|'
+# top-level folders a page must not land in (or, with overwrite, replace files of)
+RESERVED_PAGE_NAMES = {'assets', 'tools', 'projects', 'games'}
+SCAFFOLD_JOBS = 8
+
+
+def scaffold_target(kind: str, name: str):
+    """(folder, asset prefix, route) for a new project or page."""
+    if kind == 'project':
+        return PROJECTS / name, '../../', f'projects/{name}/'
+    # Pages live at /<name>/, assets live at /assets/... → use '../'
+    return ROOT / name, '../', f'{name}/'
+
+
+def render_template_files(kind: str, tpl_id: str, title: str, prefix: str):
+    # Returns { relative_path: file_contents }; unknown ids fall back to the kind's first template
+    files = TEMPLATE_FILES.get((kind, tpl_id)) or TEMPLATE_FILES[(kind, TEMPLATE_IDS[kind][0])]
+    context = {'title': title, 'prefix': prefix}
+    return {rel: TEMPLATES.render(tpl, **context) for rel, tpl in files.items()}
+
+
+def check_item(item: dict):
+    """Normalized copy of one manifest entry, or raise ValueError."""
+    kind = (item.get('kind') or item.get('type') or 'project').strip()
+    name = (item.get('name') or '').strip()
+    if kind not in TEMPLATE_IDS:
+        raise ValueError(f'unknown kind {kind!r} (expected project or page)')
+    if not name:
+        raise ValueError('name is required')
+    if any(c in name for c in INVALID_NAME_CHARS):
+        raise ValueError(f'name {name!r} contains invalid characters')
+    if name.startswith('.'):
+        # '.' is the site root itself, '..' its parent; dot folders are hidden (.git)
+        raise ValueError(f'name {name!r} may not start with "."')
+    if kind == 'page' and name.lower() in RESERVED_PAGE_NAMES:
+        raise ValueError(f'name {name!r} is a reserved top-level folder')
+    folder = scaffold_target(kind, name)[0]
+    if folder.resolve().parent != (PROJECTS if kind == 'project' else ROOT).resolve():
+        raise ValueError(f'name {name!r} does not name a folder directly inside {folder.parent.name}/')
+    tpl_id = (item.get('template') or TEMPLATE_IDS[kind][0]).strip()
+    if tpl_id not in TEMPLATE_IDS[kind]:
+        raise ValueError(f'unknown {kind} template {tpl_id!r} (one of {", ".join(TEMPLATE_IDS[kind])})')
+    title = (item.get('title') or '').strip() or name
+    return {'kind': kind, 'name': name, 'template': tpl_id, 'title': title}
+
+
+def load_scaffold_manifest(path: Path):
+    """Items from a JSON manifest: a list of entries, or {"defaults": {...}, "items": [...]}."""
+    data = json.loads(Path(path).read_text(encoding='utf-8'))
+    if isinstance(data, list):
+        return data
+    defaults = data.get('defaults') or {}
+    return [dict(defaults, **item) for item in data.get('items', [])]
+
+
+def _write_scaffold_file(path: Path, content: str, overwrite: bool, dry_run: bool) -> dict:
+    t0 = time.perf_counter()
+    exists = path.exists()
+    if exists and not overwrite:
+        status = 'skipped'
+    else:
+        status = 'overwritten' if exists else 'created'
+        if not dry_run:
+            atomic_write(path, content)
+    return {'path': path.relative_to(ROOT).as_posix(), 'status': status, 'bytes': len(content.encode('utf-8')),
+            'ms': (time.perf_counter() - t0) * 1000}
+
+
+def scaffold(items, jobs: int = SCAFFOLD_JOBS, overwrite: bool = False, dry_run: bool = False) -> dict:
+    """Render every item's template up front, then write all files concurrently (atomic writes).
+
+    items: [{'kind': 'project'|'page', 'name', 'template'?, 'title'?}]. Invalid items and
+    files claimed by two items are reported as errors; the rest still gets written.
+    Returns {'files': [{'path', 'status', 'bytes', 'ms'}], 'errors': [...], 'render_ms', 'write_ms', ...}.
+    """
+    t0 = time.perf_counter()
+    errors, writes, owners = [], [], {}
+    for n, raw in enumerate(items):
+        try:
+            item = check_item(raw)
+            base, prefix, _ = scaffold_target(item['kind'], item['name'])
+            files = render_template_files(item['kind'], item['template'], item['title'], prefix)
+        except (ValueError, KeyError, IndexError) as e:
+            errors.append({'item': n, 'name': raw.get('name'), 'error': f'{type(e).__name__}: {e}'})
+            continue
+        paths = {base / rel: content for rel, content in files.items()}
+        clash = next((p for p in paths if p in owners), None)
+        if clash is not None:
+            errors.append({'item': n, 'name': item['name'],
+                           'error': f'{clash.relative_to(ROOT).as_posix()} is also produced by item {owners[clash]}'})
+            continue
+        for path, content in paths.items():
+            owners[path] = n
+            writes.append((path, content))
+    t1 = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        files = list(pool.map(lambda w: _write_scaffold_file(w[0], w[1], overwrite, dry_run), writes))
+    t2 = time.perf_counter()
+    counts = {status: sum(1 for f in files if f['status'] == status)
+              for status in ('created', 'overwritten', 'skipped')}
+    return dict(counts, files=files, errors=errors, items=len(items), dry_run=dry_run,
+                render_ms=(t1 - t0) * 1000, write_ms=(t2 - t1) * 1000, seconds=t2 - t0)
+
 # -----------------------------------------------------------------------------
 # SEARCH INDEX
-# This section builds a simple search index (titles + headings) for front-end.
+# This section builds the inverted full-text index used by front-end search.
 # -----------------------------------------------------------------------------
 
-def build_search_index():
-    import re
-    title_re = re.compile(r"<title>(.*?)</title>", re.IGNORECASE|re.DOTALL)
-    h_re = re.compile(r"<(h[1-3])[^>]*>(.*?)</\1>", re.IGNORECASE|re.DOTALL)
-
-    items = []
-    for f in list_html_files():
-        rel = f.relative_to(ROOT).as_posix()
-        text = f.read_text(encoding='utf-8', errors='ignore')
-        title_m = title_re.search(text)
-        title = (title_m.group(1).strip() if title_m else rel)
-        headings = [m.group(2).strip() for m in h_re.finditer(text)]
-        items.append({
-            'path': rel,
-            'title': title,
-            'headings': headings[:20],
-        })
-
-    out = TOOLS / 'site_manager' / 'search-index.json'
-    safe_write(out, json.dumps({'items': items}, indent=2))
-    return out
+def build_search_index(force=False):
+    # only pages whose content hash changed are re-tokenized; format lives in common/search_index.py
+    return search_index.update_tracked(force=force)
 
 # -----------------------------------------------------------------------------
 # PREVIEW SERVER
 # This section starts a local HTTP server in a background thread.
 # -----------------------------------------------------------------------------
 class RootHandler(SimpleHTTPRequestHandler):
+    # keep-alive like a production host; every response below carries a Content-Length
+    protocol_version = 'HTTP/1.1'
+    # headers and body go out in separate writes; without TCP_NODELAY keep-alive stalls on delayed ACKs
+    disable_nagle_algorithm = True
+    cache = None  # static_cache.StaticFileCache, shared by all handler threads
+    hub = None    # site_watcher.ReloadHub when live reload is on
+
+    def do_GET(self):
+        if self.hub is not None and self.path.split('?', 1)[0] == site_watcher.LIVE_RELOAD_PATH:
+            return self.serve_reload_events()
+        return super().do_GET()
+
+    def serve_reload_events(self):
+        # server-sent events: no Content-Length, the stream ends with the connection
+        events = queue.Queue()
+        self.close_connection = True
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        self.hub.subscribe(events.put)
+        try:
+            self.wfile.write(b'retry: 1000\n\n')
+            while True:
+                try:
+                    event = events.get(timeout=15)
+                except queue.Empty:
+                    self.wfile.write(b': ping\n\n')
+                    continue
+                if event is None:
+                    break
+                self.wfile.write(f'event: reload\ndata: {json.dumps(event)}\n\n'.encode())
+        except OSError:
+            pass
+        finally:
+            self.hub.unsubscribe(events.put)
+
     def translate_path(self, path):
         # Serve from site ROOT instead of current working directory
         full = (ROOT / path.lstrip('/')).resolve()
         return str(full)
 
+    def send_head(self):
+        path = static_cache.resolve(ROOT, self.path)
+        if path is None:
+            self.send_error(404, 'File not found')
+            return None
+        if path.is_dir():
+            if not self.path.split('?', 1)[0].endswith('/') or not (path / 'index.html').is_file():
+                # trailing-slash redirect / directory listing
+                return super().send_head()
+            path = path / 'index.html'
+        entry = self.cache.get(path)
+        if entry is None:
+            self.send_error(404, 'File not found')
+            return None
+        status, headers, body = static_cache.respond(entry, self.headers)
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        return body
+
 _server = None
 _server_thread = None
 
 
-def start_server(port=8000):
+SERVER_ENGINES = ('threaded', 'asyncio')
+
+
+def start_server(port=8000, engine='threaded', live_reload=False):
+    """Serve ROOT on 127.0.0.1:port. engine: 'threaded' (thread per connection) or 'asyncio'.
+
+    live_reload injects an SSE client into every page; reload_hub.publish() then refreshes them.
+    """
     global _server, _server_thread
     if _server:
         return True
+    snippet = site_watcher.LIVE_RELOAD_SNIPPET if live_reload else None
+    if RootHandler.cache is None or RootHandler.cache.html_snippet != (snippet and snippet.encode('utf-8')):
+        RootHandler.cache = static_cache.StaticFileCache(ROOT, html_snippet=snippet)
+    RootHandler.hub = reload_hub if live_reload else None
+    if engine == 'asyncio':
+        # one event loop thread; shares the file cache with the threaded handler
+        _server = async_server.AsyncStaticServer(ROOT, port=port, cache=RootHandler.cache,
+                                                 hub=RootHandler.hub).start_in_thread()
+        _server_thread = _server.thread
+        return True
     _server = ThreadingHTTPServer(('127.0.0.1', port), RootHandler)
     _server_thread = threading.Thread(target=_server.serve_forever, daemon=True)
     _server_thread.start()
@@ -299,12 +487,73 @@ def stop_server():
             _server.shutdown()
         except Exception:
             pass
+        # ends open event streams on the threaded engine (asyncio closes its own)
+        reload_hub.close()
         _server = None
     return True
 
+# -----------------------------------------------------------------------------
+# WATCH + LIVE RELOAD
+# This section reruns the incremental steps a batch of saved files needs.
+# -----------------------------------------------------------------------------
+reload_hub = site_watcher.ReloadHub()
+_watcher = None
+
+
+def run_tool(script: Path, *args):
+    proc = subprocess.run([sys.executable, str(script), *args], cwd=str(ROOT),
+                          capture_output=True, text=True)
+    lines = (proc.stdout or proc.stderr).strip().splitlines()
+    return proc.returncode, lines
+
+
+def on_site_changed(changes, log=print):
+    """Run the steps affected by one debounced batch, reloading open pages as soon as they're current."""
+    steps = site_watcher.affected_steps(changes)
+    names = ', '.join(sorted(changes)) if len(changes) <= 3 else f'{len(changes)} files'
+    log(f'Changed: {names} -> {" + ".join(steps)}')
+    if 'search' in steps:
+        res = build_search_index()
+        log(f"  search index: {len(res['changed'])} page(s) re-tokenized in {res['seconds'] * 1000:.0f} ms")
+    # pages only need the search index to be current; reports can follow
+    clients = reload_hub.publish({'paths': sorted(changes), 'css_only': site_watcher.css_only(changes)})
+    log(f'  reload sent to {clients} page(s)')
+    if 'links' in steps:
+        code, lines = run_tool(TOOLS / 'link_checker' / 'link_checker.py', '--incremental')
+        log('  links: ' + (lines[-2] if code == 0 and len(lines) > 1 else '\n'.join(lines[-3:])))
+    if 'assets' in steps:
+        code, lines = run_tool(TOOLS / 'asset_usage_scanner' / 'asset_usage_scanner.py')
+        summary = [ln for ln in lines if ln.startswith(('Unused', 'Over budget'))]
+        log('  assets: ' + ('; '.join(ln[:120] for ln in summary) if code == 0 else '\n'.join(lines[-3:])))
+
+
+def start_watcher(log=print):
+    global _watcher
+    if _watcher is None:
+        _watcher = site_watcher.SiteWatcher(lambda changes: on_site_changed(changes, log)).start()
+    return _watcher
+
+
+def stop_watcher():
+    global _watcher
+    if _watcher is not None:
+        _watcher.stop()
+        _watcher = None
+
+# -----------------------------------------------------------------------------
+# BUILD
+# This section produces the minified, fingerprinted copy of the site (dist/).
+# -----------------------------------------------------------------------------
+
+def build_site(out_dir=None, jobs=0, force=False, minify=True, critical=True, log=print):
+    # incremental + parallel; see common/site_build.py
+    return site_build.build_site(Path(out_dir) if out_dir else site_build.OUT, jobs=jobs, force=force,
+                                 minify_on=minify, critical_on=critical, log=log)
+
 # -----------------------------------------------------------------------------
 # DEPLOY (GIT)
-# This section runs git commands to commit and push changes.
+# This section runs git commands; commit + push goes through deploy_pipeline,
+# which checks only what changed since the last deploy first.
 # -----------------------------------------------------------------------------
 
 def run_git(args):
@@ -392,38 +641,20 @@ class SiteManagerApp(tk.Tk):
         return frame
 
     def create_content(self):
-        kind = self.kind_var.get().strip()
-        name = self.name_var.get().strip()
-        title = self.title_var.get().strip() or name or 'New Page'
-        if not name:
-            messagebox.showerror('Error', 'Name is required')
-            return
-        if any(c in name for c in ' \\/:*?"<>|'):
-            messagebox.showerror('Error', 'Name contains invalid characters')
+        item = {'kind': self.kind_var.get().strip(), 'name': self.name_var.get().strip(),
+                'template': self.template_var.get().strip(), 'title': self.title_var.get().strip()}
+        try:
+            check_item(item)
+        except ValueError as e:
+            messagebox.showerror('Error', str(e))
             return
 
-        if kind == 'project':
-            base = PROJECTS / name
-            prefix = '../../'
-        else:
-            base = ROOT / name
-            # Pages live at /<name>/, assets live at /assets/... → use '../'
-            prefix = '../'
-
-        # Render selected template
-        tpl_id = self.template_var.get().strip() or ('app-starter' if kind == 'project' else 'basic-page')
-        files_map = self._render_template_files(kind, tpl_id, title, prefix)
-
-        base.mkdir(parents=True, exist_ok=True)
-        created = []
-        skipped = []
-        for rel, content in files_map.items():
-            path = base / rel
-            if path.exists():
-                skipped.append(path.relative_to(ROOT).as_posix())
-                continue
-            safe_write(path, content)
-            created.append(path.relative_to(ROOT).as_posix())
+        res = scaffold([item])
+        if res['errors']:
+            messagebox.showerror('Error', res['errors'][0]['error'])
+            return
+        created = [f['path'] for f in res['files'] if f['status'] == 'created']
+        skipped = [f['path'] for f in res['files'] if f['status'] == 'skipped']
 
         if created:
             self.content_log.insert('end', 'Created files:\n' + '\n'.join(f'- {p}' for p in created) + '\n')
@@ -439,7 +670,12 @@ class SiteManagerApp(tk.Tk):
         if not name:
             messagebox.showinfo('Info', 'Enter a Name first.')
             return
-        base = (PROJECTS / name) if kind == 'project' else (ROOT / name)
+        try:
+            check_item({'kind': kind, 'name': name})
+        except ValueError as e:
+            messagebox.showerror('Error', str(e))
+            return
+        base = scaffold_target(kind, name)[0]
         base.mkdir(parents=True, exist_ok=True)
         try:
             if os.name == 'nt':
@@ -454,10 +690,7 @@ class SiteManagerApp(tk.Tk):
     def _refresh_templates(self):
         kind = self.kind_var.get().strip()
         # Available templates by kind
-        if kind == 'project':
-            options = ['app-starter', 'game-starter', 'form-tool']
-        else:
-            options = ['basic-page', 'landing-page']
+        options = TEMPLATE_IDS['project' if kind == 'project' else 'page']
         self.template_combo['values'] = options
         # Set default
         self.template_var.set(options[0])
@@ -469,19 +702,10 @@ class SiteManagerApp(tk.Tk):
         title = (self.title_var.get().strip() or name)
         tpl_id = self.template_var.get().strip()
 
-        if kind == 'project':
-            base = PROJECTS / name
-            prefix = '../../'
-            route = f'projects/{name}/'
-            url = f'http://127.0.0.1:8000/{route}'
-        else:
-            base = ROOT / name
-            # Pages live at /<name>/, assets live at /assets/... → use '../'
-            prefix = '../'
-            route = f'{name}/'
-            url = f'http://127.0.0.1:8000/{route}'
+        base, prefix, route = scaffold_target(kind, name)
+        url = f'http://127.0.0.1:8000/{route}'
 
-        files_map = self._render_template_files(kind, tpl_id, title, prefix)
+        files_map = render_template_files(kind, tpl_id, title, prefix)
         files_list = '\n'.join(f'- {route}{rel}' for rel in files_map.keys())
 
         # Update description text
@@ -510,55 +734,25 @@ class SiteManagerApp(tk.Tk):
         }
         return descriptions.get((kind, tpl_id), 'Template description')
 
-    def _render_template_files(self, kind: str, tpl_id: str, title: str, prefix: str):
-        # Returns { relative_path: file_contents }
-        if kind == 'page':
-            if tpl_id == 'landing-page':
-                return {
-                    'index.html': PAGE_LANDING_TEMPLATE.format(title=title, prefix=prefix)
-                }
-            # default
-            return {'index.html': BASE_TEMPLATE.format(title=title, prefix=prefix)}
-
-        # kind == 'project'
-        if tpl_id == 'game-starter':
-            return {
-                'index.html': PROJECT_GAME_INDEX.format(title=title, prefix=prefix),
-                'main.js': PROJECT_GAME_MAIN_JS,
-                'styles.css': PROJECT_GAME_STYLES_CSS,
-                'README.txt': 'Edit main.js and styles.css. Open index.html in a browser to preview your game.'
-            }
-        if tpl_id == 'form-tool':
-            return {
-                'index.html': PROJECT_FORM_INDEX.format(title=title, prefix=prefix),
-                'main.js': PROJECT_FORM_MAIN_JS,
-                'styles.css': PROJECT_FORM_STYLES_CSS,
-                'README.txt': 'Form tool starter. Update the form and JS to process inputs.'
-            }
-        # default app-starter
-        return {
-            'index.html': PROJECT_APP_INDEX.format(title=title, prefix=prefix),
-            'main.js': PROJECT_APP_MAIN_JS,
-            'styles.css': PROJECT_APP_STYLES_CSS,
-            'README.txt': 'App starter. Edit main.js and styles.css to build your feature.'
-        }
-
     # -------------------- Search Index Tab -------------------
     # // this section builds a simple index used by front-end search
     def _build_search_tab(self, nb):
         frame = ttk.Frame(nb)
         nb.add(frame, text='Search Index')
-        ttk.Label(frame, text='Build front-end search index (titles + headings)', font=('Segoe UI', 12, 'bold')).pack(anchor='w', padx=12, pady=(12, 6))
+        ttk.Label(frame, text='Build front-end search index (full text, sharded)', font=('Segoe UI', 12, 'bold')).pack(anchor='w', padx=12, pady=(12, 6))
         ttk.Button(frame, text='Build Index', command=self.on_build_index).pack(anchor='w', padx=12)
 
         self.search_log = tk.Text(frame, height=18, wrap='word', font=('Consolas', 10))
         self.search_log.pack(fill='both', expand=True, padx=12, pady=(6, 12))
-        self.search_log.insert('end', 'Click Build Index to generate tools/site_manager/search-index.json\n')
+        self.search_log.insert('end', 'Click Build Index to generate assets/search/ (manifest.json + shard-*.json)\n')
         return frame
 
     def on_build_index(self):
-        out = build_search_index()
-        self.search_log.insert('end', f'Wrote: {out.relative_to(ROOT)}\n')
+        res = build_search_index()
+        self.search_log.insert('end', f"Updated {res['manifest'].relative_to(ROOT).as_posix()}: "
+                                      f"{len(res['changed'])}/{res['pages']} pages re-tokenized, "
+                                      f"{len(res['removed'])} removed, {res['shards_written']} shard(s) "
+                                      f"written in {res['seconds'] * 1000:.0f} ms\n")
         self.search_log.see('end')
 
     # ---------------------- Preview Tab ----------------------
@@ -573,6 +767,12 @@ class SiteManagerApp(tk.Tk):
         ttk.Button(btns, text='Start Server', command=self.on_start_server).pack(side='left')
         ttk.Button(btns, text='Open Home', command=self.on_open_home).pack(side='left', padx=6)
         ttk.Button(btns, text='Stop Server', command=self.on_stop_server).pack(side='left', padx=6)
+        ttk.Label(btns, text='Engine:').pack(side='left', padx=(12, 4))
+        self.server_engine = tk.StringVar(value=SERVER_ENGINES[0])
+        ttk.Combobox(btns, textvariable=self.server_engine, values=SERVER_ENGINES,
+                     state='readonly', width=10).pack(side='left')
+        self.live_reload = tk.BooleanVar(value=True)
+        ttk.Checkbutton(btns, text='Watch + Live Reload', variable=self.live_reload).pack(side='left', padx=(12, 0))
 
         self.preview_log = tk.Text(frame, height=18, wrap='word', font=('Consolas', 10))
         self.preview_log.pack(fill='both', expand=True, padx=12, pady=(6, 12))
@@ -580,20 +780,35 @@ class SiteManagerApp(tk.Tk):
         return frame
 
     def on_start_server(self):
-        started = start_server(8000)
-        self.preview_log.insert('end', 'Server started on http://127.0.0.1:8000/\n' if started else 'Server already running\n')
+        engine = self.server_engine.get()
+        live = self.live_reload.get()
+        try:
+            started = start_server(8000, engine, live_reload=live)
+        except OSError as e:
+            self.preview_log.insert('end', f'Could not start server on port 8000: {e}\n')
+            self.preview_log.see('end')
+            return
+        self.preview_log.insert('end', f'Server started on http://127.0.0.1:8000/ ({engine})\n' if started else 'Server already running\n')
+        if live:
+            watcher = start_watcher(self.log_preview)
+            self.preview_log.insert('end', f'Watching HTML/CSS/JS ({watcher.backend}); saved pages reload automatically\n')
         self.preview_log.see('end')
 
+    def log_preview(self, line):
+        # called from the watcher thread; Tk widgets belong to the main thread
+        self.after(0, lambda: (self.preview_log.insert('end', line + '\n'), self.preview_log.see('end')))
+
     def on_open_home(self):
         webbrowser.open('http://127.0.0.1:8000/')
 
     def on_stop_server(self):
+        stop_watcher()
         stop_server()
         self.preview_log.insert('end', 'Server stopped\n')
         self.preview_log.see('end')
 
     # ----------------------- Deploy Tab ----------------------
-    # // this section runs git commands to commit and push
+    # // this section checks the changes since the last deploy, then commits and pushes
     def _build_deploy_tab(self, nb):
         frame = ttk.Frame(nb)
         nb.add(frame, text='Deploy')
@@ -604,15 +819,21 @@ class SiteManagerApp(tk.Tk):
         ttk.Label(form, text='Commit Message').grid(row=0, column=0, sticky='w')
         self.commit_var = tk.StringVar(value='Site Manager update')
         ttk.Entry(form, textvariable=self.commit_var, width=40).grid(row=0, column=1, sticky='w')
+        self.force_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(form, text='Push even with new breakage', variable=self.force_var).grid(row=0, column=2, sticky='w', padx=(12, 0))
 
         btns = ttk.Frame(frame)
         btns.pack(anchor='w', padx=12, pady=8)
         ttk.Button(btns, text='Git Status', command=self.on_git_status).pack(side='left')
-        ttk.Button(btns, text='Commit & Push', command=self.on_git_push).pack(side='left', padx=6)
+        ttk.Button(btns, text='Check Changes', command=lambda: self.on_git_push(dry_run=True)).pack(side='left', padx=6)
+        self.push_btn = ttk.Button(btns, text='Commit & Push', command=self.on_git_push)
+        self.push_btn.pack(side='left', padx=6)
+        ttk.Button(btns, text='Build Site', command=self.on_build_site).pack(side='left', padx=6)
 
         self.deploy_log = tk.Text(frame, height=18, wrap='word', font=('Consolas', 10))
         self.deploy_log.pack(fill='both', expand=True, padx=12, pady=(6, 12))
         self.deploy_log.insert('end', 'Ensure git is installed and remote is configured.\n')
+        self._deploying = False
         return frame
 
     def on_git_status(self):
@@ -620,21 +841,89 @@ class SiteManagerApp(tk.Tk):
         self.deploy_log.insert('end', proc.stdout + (proc.stderr or ''))
         self.deploy_log.see('end')
 
-    def on_git_push(self):
-        msg = self.commit_var.get().strip() or 'Site Manager update'
-        steps = [
-            ['add', '-A'],
-            ['commit', '-m', msg],
-            ['push']
-        ]
-        for args in steps:
-            proc = run_git(args)
-            self.deploy_log.insert('end', f"$ git {' '.join(args)}\n" + proc.stdout + (proc.stderr or '') + '\n')
+    def on_build_site(self):
+        try:
+            stats = build_site(log=lambda line: self.deploy_log.insert('end', line + '\n'))
+        except ValueError as e:
+            self.deploy_log.insert('end', f'Build refused: {e}\n')
+            self.deploy_log.see('end')
+            return
+        self.deploy_log.insert('end', f"Output: {stats['out_dir']} (+ {site_build.MANIFEST_NAME})\n")
         self.deploy_log.see('end')
 
+    def log_deploy(self, line):
+        # called from the deploy thread
+        self.after(0, lambda: (self.deploy_log.insert('end', line + '\n'), self.deploy_log.see('end')))
+
+    def on_git_push(self, dry_run=False):
+        if self._deploying:
+            return
+        msg = self.commit_var.get().strip() or 'Site Manager update'
+        force = self.force_var.get()
+        self._deploying = True
+        self.push_btn.state(['disabled'])
+
+        def work():
+            # checks + git run off the Tk thread; log lines are marshalled back with after()
+            try:
+                deploy_pipeline.deploy(msg, dry_run=dry_run, force=force, log=self.log_deploy)
+            except Exception as e:
+                self.log_deploy(f'Deploy failed: {e}')
+            finally:
+                self.after(0, self._deploy_done)
+
+        threading.Thread(target=work, daemon=True).start()
+
+    def _deploy_done(self):
+        self._deploying = False
+        self.push_btn.state(['!disabled'])
+
 # -----------------------------------------------------------------------------
 # ENTRY POINT
 # -----------------------------------------------------------------------------
-if __name__ == '__main__':
+def main(argv=None):
+    ap = argparse.ArgumentParser(description='Site Manager (no command opens the GUI).')
+    sub = ap.add_subparsers(dest='command')
+    b = sub.add_parser('build', help='minify + fingerprint the site into an output folder')
+    b.add_argument('--out', default=None, help=f'output folder (default: {site_build.OUT.name}/)')
+    b.add_argument('--jobs', type=int, default=0, help='worker processes (0 = one per CPU core)')
+    b.add_argument('--force', action='store_true', help='rebuild every file')
+    b.add_argument('--no-minify', action='store_true')
+    b.add_argument('--no-critical', action='store_true', help="don't inline critical CSS / defer stylesheets")
+    s = sub.add_parser('scaffold', help='create many pages/projects from a JSON manifest')
+    s.add_argument('manifest', help='[{"kind": "project", "name": ..., "template": ..., "title": ...}, ...] '
+                                    'or {"defaults": {...}, "items": [...]}')
+    s.add_argument('--jobs', type=int, default=SCAFFOLD_JOBS, help='concurrent file writers')
+    s.add_argument('--overwrite', action='store_true', help='replace files that already exist')
+    s.add_argument('--dry-run', action='store_true', help='render and report, write nothing')
+    s.add_argument('--json', action='store_true', help='print the full result as JSON')
+    args = ap.parse_args(argv)
+
+    if args.command == 'build':
+        try:
+            build_site(args.out, args.jobs, args.force, not args.no_minify, not args.no_critical)
+        except ValueError as e:
+            print(f'error: {e}', file=sys.stderr)
+            return 2
+        return 0
+    if args.command == 'scaffold':
+        res = scaffold(load_scaffold_manifest(args.manifest), args.jobs, args.overwrite, args.dry_run)
+        if args.json:
+            print(json.dumps(res, indent=2))
+        else:
+            for f in res['files']:
+                print(f"{f['status']:<11} {f['path']}  ({f['bytes']} B, {f['ms']:.2f} ms)")
+            for e in res['errors']:
+                print(f"error       item {e['item']} ({e['name']}): {e['error']}")
+            print(f"{res['items']} items: {res['created']} created, {res['overwritten']} overwritten, "
+                  f"{res['skipped']} skipped, {len(res['errors'])} errors"
+                  f"{' (dry run)' if res['dry_run'] else ''} - render {res['render_ms']:.1f} ms, "
+                  f"write {res['write_ms']:.1f} ms")
+        return 1 if res['errors'] else 0
     app = SiteManagerApp()
     app.mainloop()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
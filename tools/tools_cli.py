@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Tools CLI (one entry point for the site tools, for scripts and CI)
+- Subcommands: check-links, scan-assets, build-index, serve, build, deploy
+- Each subsystem is imported only when its subcommand runs, so --help and
+  argument errors cost an interpreter start and argparse, nothing more
+- stdout carries exactly one JSON object per command (serve: one when it
+  starts, one when it stops); the tools' own progress output goes to stderr
+- Exit status: 0 ok, 1 the command ran but found problems (broken links,
+  --strict asset findings, a deploy blocked by new breakage), 2 usage or
+  internal error (including a failed git step)
+
+Run: python tools/tools_cli.py --help
+     python tools/tools_cli.py check-links [--incremental] [--jobs N] [--external]
+     python tools/tools_cli.py scan-assets [--budget KB] [--strict]
+     python tools/tools_cli.py build-index [--force]
+     python tools/tools_cli.py serve [--port 8000]
+     python tools/tools_cli.py build [--out DIR] [--jobs N] [--force] [--no-minify] [--no-critical]
+     python tools/tools_cli.py deploy [--message MSG] [--dry-run] [--force] [--no-push]
+"""
+import os
+import sys
+import time
+import argparse
+
+# project root: one level up from tools/tools_cli.py
+# (os.path rather than pathlib here: everything heavier than argparse is imported per command)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+COMMON = os.path.join(ROOT, 'tools', 'common')
+
+
+def _common():
+    # shared helpers live in tools/common; added to the path on first use only
+    if COMMON not in sys.path:
+        sys.path.insert(0, COMMON)
+
+
+def _tool(key: str):
+    """Import tools/<key>/<key>.py as a module (the scripts aren't a package)."""
+    _common()
+    import warm_worker
+    module = sys.modules.get(key)
+    return module if module is not None else warm_worker.load_tool(key, warm_worker.WARM_TOOLS[key])
+
+
+def _read_json(path):
+    import json
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+# -----------------------------------------------------------------------------
+# COMMANDS
+# Each returns (ok, result dict); anything a tool prints is already on stderr.
+# -----------------------------------------------------------------------------
+
+def cmd_check_links(args):
+    link_checker = _tool('link_checker')
+    argv = ['--jobs', str(args.jobs), '--ttl', str(args.ttl)]
+    argv += ['--incremental'] if args.incremental else []
+    argv += ['--external'] if args.external else []
+    link_checker.main(argv)
+    summary = _read_json(link_checker.OUT)['summary']
+    problems = sum(summary.get(k, 0) for k in ('broken_links', 'missing_anchors', 'broken_assets',
+                                                'broken_external'))
+    return problems == 0, {'summary': summary, 'problems': problems, 'report': link_checker.OUT}
+
+
+def cmd_scan_assets(args):
+    scanner = _tool('asset_usage_scanner')
+    scanner.main(['--budget', str(args.budget)])
+    data = _read_json(scanner.OUT)
+    result = {key: data[key] for key in ('assets_found', 'unused_js', 'unused_css', 'unused_images',
+                                         'budget_bytes', 'over_budget', 'site_weight')}
+    result['used_assets_count'] = len(data['used_assets'])
+    result['report'] = scanner.OUT
+    findings = len(data['unused_js']) + len(data['unused_css']) + len(data['unused_images']) \
+        + len(data['over_budget'])
+    return not (args.strict and findings), result
+
+
+def cmd_build_index(args):
+    _common()
+    import search_index
+    return True, search_index.update_tracked(force=args.force)
+
+
+def cmd_build(args):
+    _common()
+    import site_build
+    from pathlib import Path
+    out = Path(args.out) if args.out else site_build.OUT
+    stats = site_build.build_site(out, jobs=args.jobs, force=args.force, minify_on=not args.no_minify,
+                                  critical_on=not args.no_critical, log=lambda line: print(line, file=sys.stderr))
+    return True, stats
+
+
+def cmd_serve(args):
+    _common()
+    import async_server
+    server = async_server.AsyncStaticServer(port=args.port).start_in_thread()   # raises if the port is taken
+    # announce the address right away; the final result follows on Ctrl+C
+    emit({'command': 'serve', 'ok': True, 'url': f'http://127.0.0.1:{server.port}/', 'root': server.root,
+          'engine': 'asyncio'}, args.pretty, args.stdout)
+    try:
+        while server.thread.is_alive():
+            server.thread.join(0.5)   # a timed join keeps Ctrl+C responsive
+    except KeyboardInterrupt:
+        server.shutdown()
+    return True, {'stopped': True, 'requests': server.requests}
+
+
+def cmd_deploy(args):
+    _common()
+    import deploy_pipeline
+    result = deploy_pipeline.deploy(args.message, dry_run=args.dry_run, force=args.force, push=not args.no_push,
+                                    log=lambda line: print(line, file=sys.stderr))
+    return result['deployed'] or (args.dry_run and not result['blockers']), result
+
+# -----------------------------------------------------------------------------
+# ENTRY POINT
+# -----------------------------------------------------------------------------
+
+def emit(payload: dict, pretty: bool = False, stream=None):
+    import json
+    print(json.dumps(payload, indent=2 if pretty else None, default=str), file=stream or sys.stdout, flush=True)
+
+
+def build_parser():
+    ap = argparse.ArgumentParser(prog='tools', description='Site tools; every command prints one JSON result.')
+    ap.add_argument('--pretty', action='store_true', help='indent the JSON output')
+    sub = ap.add_subparsers(dest='command', metavar='COMMAND', required=True)
+
+    p = sub.add_parser('check-links', help='validate local links, anchors and assets in every page')
+    p.add_argument('--incremental', action='store_true', help='re-check only pages affected by changes')
+    p.add_argument('--jobs', type=int, default=1, metavar='N', help='worker processes (0 = one per CPU core)')
+    p.add_argument('--external', action='store_true', help='also validate external http(s) links')
+    p.add_argument('--ttl', type=float, default=24, metavar='HOURS', help='cache lifetime of external results')
+    p.set_defaults(func=cmd_check_links)
+
+    p = sub.add_parser('scan-assets', help='asset usage, unused files and page weights')
+    p.add_argument('--budget', type=float, default=500, metavar='KB', help='per-page transfer budget')
+    p.add_argument('--strict', action='store_true', help='exit 1 on unused assets or pages over budget')
+    p.set_defaults(func=cmd_scan_assets)
+
+    p = sub.add_parser('build-index', help='update the front-end search index (assets/search/)')
+    p.add_argument('--force', action='store_true', help='re-tokenize every page')
+    p.set_defaults(func=cmd_build_index)
+
+    p = sub.add_parser('serve', help='preview server (asyncio engine) until Ctrl+C')
+    p.add_argument('--port', type=int, default=8000)
+    p.set_defaults(func=cmd_serve)
+
+    p = sub.add_parser('build', help='minified, fingerprinted copy of the site')
+    p.add_argument('--out', default=None, help='output folder (default: dist/)')
+    p.add_argument('--jobs', type=int, default=0, help='worker processes (0 = one per CPU core)')
+    p.add_argument('--force', action='store_true', help='rebuild every file')
+    p.add_argument('--no-minify', action='store_true')
+    p.add_argument('--no-critical', action='store_true', help="don't inline critical CSS")
+    p.set_defaults(func=cmd_build)
+
+    p = sub.add_parser('deploy', help='check the changes since the last deploy, then commit and push')
+    p.add_argument('--message', default='Site tools deploy', help='commit message')
+    p.add_argument('--dry-run', action='store_true', help='run the affected checks only')
+    p.add_argument('--force', action='store_true', help='push even with new breakage')
+    p.add_argument('--no-push', action='store_true', help='commit and record the deploy without pushing')
+    p.set_defaults(func=cmd_deploy)
+    return ap
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.stdout = sys.stdout   # the JSON channel; tool output is redirected to stderr below
+    t0 = time.perf_counter()
+    import contextlib
+    try:
+        with contextlib.redirect_stdout(sys.stderr):
+            ok, result = args.func(args)
+    except Exception as e:
+        emit({'command': args.command, 'ok': False, 'error': f'{type(e).__name__}: {e}',
+              'seconds': time.perf_counter() - t0}, args.pretty)
+        return 2
+    emit(dict(result, command=args.command, ok=ok, seconds=time.perf_counter() - t0), args.pretty)
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -3,6 +3,12 @@
 Tools Dashboard (GUI)
 - Central launcher for project tools
 - Buttons to run and view reports for each tool
+- Tools run in the background (several at once, each cancellable); their
+  output streams into the log line by line, with wall/CPU time per run
+- "Warm runner": link checker and asset scanner run inside one persistent
+  worker that imported them once; the log compares warm and cold latency
+- Run History: duration / files / bytes read / peak RSS per run from
+  tools/.cache/run-history.sqlite, charted per tool, slow runs flagged
 - Uses standard library only (tkinter + subprocess)
 
 Run: python tools/tools_dashboard.py
@@ -10,11 +16,20 @@ Run: python tools/tools_dashboard.py
 import os
 import sys
 import json
+import time
+import queue
 import subprocess
+from itertools import islice
 from pathlib import Path
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 
+# shared helpers live in tools/common
+sys.path.insert(0, str(Path(__file__).resolve().parent / 'common'))
+import report_writer  # noqa: E402
+import tool_runner  # noqa: E402
+import run_history  # noqa: E402
+
 # -----------------------------------------------------------------------------
 # CONFIG & PATHS
 # This section sets up paths to tool scripts and report files.
@@ -26,12 +41,14 @@ TOOLS = {
     'asset_usage_scanner': {
         'script': TOOLS_DIR / 'asset_usage_scanner' / 'asset_usage_scanner.py',
         'report': TOOLS_DIR / 'asset_usage_scanner' / 'asset-usage.json',
-        'description': 'Scan HTML for referenced JS/CSS assets and list unused assets.'
+        'description': 'Scan HTML for referenced JS/CSS assets and list unused assets.',
+        'warm': True,
     },
     'link_checker': {
         'script': TOOLS_DIR / 'link_checker' / 'link_checker.py',
         'report': TOOLS_DIR / 'link_checker' / 'link-report.json',
-        'description': 'Validate local links and assets in all HTML pages.'
+        'description': 'Validate local links and assets in all HTML pages.',
+        'warm': True,
     },
     'site_manager': {
         'script': TOOLS_DIR / 'site_manager' / 'site_manager.py',
@@ -40,16 +57,28 @@ TOOLS = {
     },
 }
 
+# records shown per page when paging through a streamed (JSON Lines) report
+REPORT_PAGE_SIZE = 25
+# how often the GUI drains the runner's event queue (ms) and the most lines it inserts per tick
+POLL_MS = 50
+MAX_LINES_PER_TICK = 500
+# runs shown in the Run History chart/table
+HISTORY_RUNS = 50
+
 # -----------------------------------------------------------------------------
 # UTILITIES
 # This section includes helpers to run scripts and open/view reports.
 # -----------------------------------------------------------------------------
 
-def run_script(path: Path, cwd: Path = None) -> subprocess.CompletedProcess:
-    if not path.exists():
-        raise FileNotFoundError(f'Script not found: {path}')
-    cmd = [sys.executable, str(path)]
-    return subprocess.run(cmd, cwd=str(cwd or path.parent), capture_output=True, text=True)
+def latest_report(path: Path):
+    # a tool may have written .json, .jsonl or .jsonl.gz - show whichever is newest
+    if path is None:
+        return None
+    candidates = [report_writer.report_path(path, fmt) for fmt in report_writer.FORMATS]
+    existing = [p for p in candidates if p.exists()]
+    if not existing:
+        return None
+    return max(existing, key=lambda p: p.stat().st_mtime)
 
 
 def read_json(path: Path):
@@ -70,8 +99,15 @@ class ToolsDashboard(tk.Tk):
         self.title('Project Tools Dashboard')
         self.geometry('900x600')
         self.minsize(800, 520)
+        self.report_pages = None  # lazy iterator over the streamed report being viewed
+        self.runner = tool_runner.ToolRunner()
+        self.warm_var = tk.BooleanVar(value=True)
+        self.latency = {}  # tool -> {'cold': wall s, 'warm': wall s} of the latest run of each kind
 
         self.create_widgets()
+        self.runner.warm_up()
+        self.protocol('WM_DELETE_WINDOW', self.on_close)
+        self.after(POLL_MS, self.drain_events)
 
     def create_widgets(self):
         # Header
@@ -79,6 +115,7 @@ class ToolsDashboard(tk.Tk):
         header.pack(fill='x', padx=10, pady=(10, 5))
         ttk.Label(header, text='Tools Dashboard', font=('Segoe UI', 16, 'bold')).pack(side='left')
         ttk.Button(header, text='Open tools folder', command=self.open_tools_folder).pack(side='right')
+        ttk.Checkbutton(header, text='Warm runner', variable=self.warm_var).pack(side='right', padx=10)
 
         # Main content frame: left panel (tools) + right panel (log/output)
         main = ttk.Frame(self)
@@ -104,15 +141,27 @@ class ToolsDashboard(tk.Tk):
         right = ttk.LabelFrame(main, text='Output / Logs')
         right.pack(side='left', fill='both', expand=True)
 
+        runs = ttk.Frame(right)
+        runs.pack(fill='x')
+        self.runs_view = ttk.Treeview(runs, columns=('tool', 'status', 'time'), show='headings', height=4)
+        for col, width in (('tool', 160), ('status', 90), ('time', 200)):
+            self.runs_view.heading(col, text=col.title())
+            self.runs_view.column(col, width=width, anchor='w')
+        self.runs_view.pack(side='left', fill='x', expand=True)
+        ttk.Button(runs, text='Cancel', command=self.cancel_selected).pack(side='left', padx=6, anchor='n')
+
         self.text = tk.Text(right, wrap='word', font=('Consolas', 10))
         self.text.pack(fill='both', expand=True)
+        self.text.tag_configure('stderr', foreground='#b00020')
         self.text.insert('end', 'Welcome to the Tools Dashboard.\nUse the buttons on the left to run tools and view their reports.\n')
 
         # Footer
         footer = ttk.Frame(self)
         footer.pack(fill='x', padx=10, pady=(0, 10))
         ttk.Button(footer, text='Refresh', command=self.refresh).pack(side='left')
-        ttk.Button(footer, text='Exit', command=self.destroy).pack(side='right')
+        ttk.Button(footer, text='Next Report Page', command=self.next_report_page).pack(side='left', padx=6)
+        ttk.Button(footer, text='Run History', command=self.open_history).pack(side='left')
+        ttk.Button(footer, text='Exit', command=self.on_close).pack(side='right')
 
     # ------------------------------------------------------------------
     # Actions
@@ -130,25 +179,91 @@ class ToolsDashboard(tk.Tk):
         if not cfg:
             messagebox.showerror('Error', f'Tool not found: {key}')
             return
-        self.append_log(f'Running {key} ...')
         try:
-            proc = run_script(cfg['script'])
-            if proc.returncode == 0:
-                self.append_log(proc.stdout.strip() or '[no output]')
-            else:
-                self.append_log(proc.stdout.strip())
-                self.append_log(proc.stderr.strip())
-                messagebox.showerror('Error', f'{key} failed (exit {proc.returncode})')
+            run = self.runner.start(key, cfg['script'], warm=self.warm_var.get() and cfg.get('warm', False))
         except Exception as e:
             messagebox.showerror('Error', str(e))
             self.append_log(f'Error: {e}')
+            return
+        self.append_log(f'[{key} #{run.id}] started ({run.mode})')
+        self.runs_view.insert('', 0, iid=str(run.id), values=(f'{key} ({run.mode})', run.status(), ''))
+
+    def cancel_selected(self):
+        selected = self.runs_view.selection()
+        if not selected:
+            messagebox.showinfo('Cancel', 'Select a running tool first.')
+            return
+        for iid in selected:
+            if self.runner.cancel(int(iid)):
+                run = self.runner.runs[int(iid)]
+                self.runs_view.set(iid, 'status', run.status())
+
+    def drain_events(self):
+        # runner threads never touch widgets; lines reach the Text widget here, on the Tk thread
+        for _ in range(MAX_LINES_PER_TICK):
+            try:
+                event = self.runner.events.get_nowait()
+            except queue.Empty:
+                break
+            if event[0] == 'line':
+                _, run, stream, line = event
+                self.text.insert('end', f'[{run.key} #{run.id}] {line}\n', 'stderr' if stream == 'err' else ())
+            elif event[0] == 'warm':
+                info = event[1]
+                self.text.insert('end', f"Warm runner ready in {info['startup']:.2f}s "
+                                        f"(imports {info['import_ms']:.0f} ms): {', '.join(info['tools'])}\n")
+            else:
+                self.finish_run(event[1])
+        else:
+            self.text.see('end')
+            self.after(0, self.drain_events)  # backlog left: keep going without waiting
+            return
+        self.text.see('end')
+        for run in self.runner.active():
+            self.runs_view.set(str(run.id), 'time', run.timing())
+        self.after(POLL_MS, self.drain_events)
+
+    def finish_run(self, run):
+        self.runs_view.item(str(run.id), values=(f'{run.key} ({run.mode})', run.status(), run.timing()))
+        if not (run.lines['out'] or run.lines['err']):
+            self.append_log(f'[{run.key} #{run.id}] [no output]')
+        self.append_log(f'[{run.key} #{run.id}] {run.status()} ({run.mode}, {run.timing()})')
+        if run.returncode == 0:
+            last = run_history.runs(run.key, 1)
+            if last and last[0]['slow']:
+                self.append_log(f"[{run.key} #{run.id}] slower than usual: {last[0]['duration']:.2f}s vs "
+                                f"baseline {last[0]['baseline']:.2f}s (see Run History)")
+        if run.returncode == 0 and TOOLS.get(run.key, {}).get('warm'):
+            seen = self.latency.setdefault(run.key, {})
+            seen[run.mode] = run.wall
+            if 'cold' in seen and 'warm' in seen:
+                self.append_log(f"[{run.key}] cold {seen['cold']:.2f}s vs warm {seen['warm']:.2f}s: "
+                                f"warm saves {seen['cold'] - seen['warm']:.2f}s per run")
+        if not run.cancelled and run.returncode != 0:
+            messagebox.showerror('Error', f'{run.key} failed (exit {run.returncode})')
+
+    def open_history(self):
+        HistoryWindow(self)
+
+    def on_close(self):
+        active = self.runner.active()
+        if active and not messagebox.askyesno('Exit', f'{len(active)} tool run(s) still active. Cancel them and exit?'):
+            return
+        self.runner.shutdown()
+        self.destroy()
 
     def view_report(self, key: str):
         cfg = TOOLS.get(key)
         if not cfg:
             messagebox.showerror('Error', f'Tool not found: {key}')
             return
-        data = read_json(cfg['report'])
+        path = latest_report(cfg['report'])
+        if path is not None and report_writer.is_stream(path):
+            self.text.insert('end', f'\n--- {key} report ({path.name}) ---\n')
+            self.report_pages = report_writer.iter_report(path)
+            self.next_report_page()
+            return
+        data = read_json(path) if path is not None else None
         if data is None:
             messagebox.showinfo('Report', 'Report missing or invalid JSON. Try running the tool first.')
             return
@@ -160,10 +275,124 @@ class ToolsDashboard(tk.Tk):
             self.text.insert('end', '[Unable to render JSON]\n')
         self.text.see('end')
 
+    def next_report_page(self):
+        if self.report_pages is None:
+            self.append_log('No streamed report open. Use View Report first.')
+            return
+        try:
+            page = list(islice(self.report_pages, REPORT_PAGE_SIZE))
+        except Exception as e:
+            self.report_pages = None
+            self.append_log(f'[Unable to read report: {e}]')
+            return
+        for obj in page:
+            if '_report' in obj:
+                continue
+            if '_summary' in obj:
+                self.text.insert('end', 'Summary:\n' + json.dumps(obj['_summary'], indent=2) + '\n')
+                continue
+            self.text.insert('end', json.dumps(obj, indent=2) + '\n')
+        if len(page) < REPORT_PAGE_SIZE:
+            self.report_pages = None
+            self.text.insert('end', '--- end of report ---\n')
+        else:
+            self.text.insert('end', '[more records - click Next Report Page]\n')
+        self.text.see('end')
+
     def refresh(self):
         self.text.insert('end', '\nRefreshed.\n')
         self.text.see('end')
 
+class HistoryWindow(tk.Toplevel):
+    """Per-tool run history: duration chart (baseline dashed, slow runs red) and the recorded runs."""
+
+    METRICS = {'duration (s)': 'duration', 'files': 'files', 'bytes read (KB)': 'bytes_read',
+               'peak RSS (MB)': 'peak_rss'}
+    SCALE = {'bytes_read': 1024, 'peak_rss': 1048576}
+
+    def __init__(self, master):
+        super().__init__(master)
+        self.title('Run History')
+        self.geometry('820x560')
+        tools = run_history.tools()
+
+        bar = ttk.Frame(self)
+        bar.pack(fill='x', padx=10, pady=8)
+        ttk.Label(bar, text='Tool').pack(side='left')
+        self.tool_var = tk.StringVar(value=tools[0] if tools else '')
+        box = ttk.Combobox(bar, textvariable=self.tool_var, values=tools, state='readonly', width=28)
+        box.pack(side='left', padx=6)
+        box.bind('<<ComboboxSelected>>', lambda e: self.refresh())
+        ttk.Label(bar, text='Chart').pack(side='left', padx=(12, 0))
+        self.metric_var = tk.StringVar(value='duration (s)')
+        metric = ttk.Combobox(bar, textvariable=self.metric_var, values=list(self.METRICS), state='readonly',
+                              width=16)
+        metric.pack(side='left', padx=6)
+        metric.bind('<<ComboboxSelected>>', lambda e: self.refresh())
+        ttk.Button(bar, text='Reload', command=self.refresh).pack(side='right')
+
+        self.canvas = tk.Canvas(self, height=220, background='white')
+        self.canvas.pack(fill='x', padx=10)
+        self.canvas.bind('<Configure>', lambda e: self.draw())
+
+        cols = ('when', 'variant', 'duration', 'files', 'read', 'rss', 'status')
+        self.table = ttk.Treeview(self, columns=cols, show='headings')
+        for col, width in zip(cols, (150, 110, 80, 60, 90, 80, 200)):
+            self.table.heading(col, text=col.title())
+            self.table.column(col, width=width, anchor='w')
+        self.table.tag_configure('slow', foreground='#b00020')
+        self.table.pack(fill='both', expand=True, padx=10, pady=10)
+        self.runs = []
+        self.refresh()
+
+    def refresh(self):
+        self.runs = run_history.runs(self.tool_var.get(), HISTORY_RUNS) if self.tool_var.get() else []
+        self.table.delete(*self.table.get_children())
+        for run in reversed(self.runs):
+            status = 'ok' if run['exit_code'] == 0 else f"exit {run['exit_code']}"
+            if run['slow']:
+                status = f"SLOW (baseline {run['baseline']:.3f}s)"
+            self.table.insert('', 'end', tags=('slow',) if run['slow'] else (), values=(
+                time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(run['started'])),
+                run['variant'] + (' warm' if run['warm'] else ''), f"{run['duration']:.3f}s",
+                '' if run['files'] is None else run['files'],
+                '' if run['bytes_read'] is None else f"{run['bytes_read'] / 1024:.0f} KB",
+                '' if run['peak_rss'] is None else f"{run['peak_rss'] / 1048576:.1f} MB", status))
+        self.draw()
+
+    def draw(self):
+        c = self.canvas
+        c.delete('all')
+        key = self.METRICS[self.metric_var.get()]
+        points = [(i, run[key] / self.SCALE.get(key, 1), run) for i, run in enumerate(self.runs)
+                  if run[key] is not None]
+        w, h, pad = c.winfo_width(), c.winfo_height(), 30
+        if not points or w < 2 * pad:
+            c.create_text(w // 2, h // 2, text='No runs recorded for this tool yet.')
+            return
+        values = [v for _, v, _ in points]
+        if key == 'duration':
+            values += [r['baseline'] for r in self.runs if r['baseline'] is not None]
+        top = max(values) * 1.1 or 1
+        step = (w - 2 * pad) / max(1, len(self.runs) - 1)
+
+        def xy(i, v):
+            return pad + i * step, h - pad - (h - 2 * pad) * v / top
+
+        c.create_line(pad, h - pad, w - pad, h - pad, fill='#999')
+        c.create_text(pad, pad / 2, text=f'{top:.3g}', anchor='w', fill='#666')
+        c.create_text(pad, h - pad / 2, text='0', anchor='w', fill='#666')
+        if key == 'duration':
+            base = [xy(i, r['baseline']) for i, r in enumerate(self.runs) if r['baseline'] is not None]
+            if len(base) > 1:
+                c.create_line(*[v for p in base for v in p], fill='#888', dash=(4, 3))
+        if len(points) > 1:
+            c.create_line(*[v for i, val, _ in points for v in xy(i, val)], fill='#4f7cff', width=2)
+        for i, val, run in points:
+            x, y = xy(i, val)
+            color = '#b00020' if run['slow'] else ('#e08a00' if run['exit_code'] else '#4f7cff')
+            c.create_oval(x - 3, y - 3, x + 3, y + 3, fill=color, outline=color)
+
 # -----------------------------------------------------------------------------
 # ENTRY POINT
 # -----------------------------------------------------------------------------